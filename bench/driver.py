@@ -0,0 +1,244 @@
+"""
+Headless Benchmark der kompletten Fetch-Pipeline gegen den Offline-Mock (bench/mock_skool.py).
+
+Macht das, was data.html + electron-fetcher im Fetcher-Loop tun, nur ohne Browser:
+    GET /api/fetch-tasks -> Tasks in Batches parallel gegen den Mock holen
+    -> gzip-NDJSON an /api/fetch-result/stream -> Pacing beachten -> neu planen,
+bis keine Tasks mehr kommen. Am Ende: Zeiten für Plan/Fetch/Ingest, Tasks/s, Extrahiertes.
+
+    python bench/driver.py --members 10000 --posts 500
+    python bench/driver.py --members 100000 --latency-ms 30 --p429 0.01 --json report.json
+    python bench/driver.py --app-url http://localhost:3000 --mock-url http://localhost:8765
+
+Ohne --app-url wird die App in einem Temp-Verzeichnis gestartet (frische app.db, wird danach gelöscht;
+--keep-db behält sie, z.B. als Quelle für mock_skool.py --replay).
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import mock_skool  # noqa: E402
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'myversion')
+MAX_CONCURRENCY = 8  # wie executeFetchBatch in main.js
+
+
+def task_url(task: dict, base: str, build_id: str) -> str | None:
+    """Python-Gegenstück zu taskUrl() in electron-fetcher/main.js, mit base statt skool.com/api2."""
+    next_ = f'{base}/_next/data/{build_id}/'
+    slug = task.get('communitySlug', '')
+    t = task.get('type')
+    if t == 'members':
+        return f"{next_}{slug}/-/members.json?t=active&p={task['pageParam']}&group={slug}"
+    if t == 'posts':
+        return f"{next_}{slug}.json?s=newest&p={task['pageParam']}"
+    if t == 'profile':
+        return f"{next_}@{task['userName']}.json?group={slug}"
+    if t == 'comments':
+        if not task.get('groupSkoolId'):
+            return None
+        url = f"{base}/posts/{task['postSkoolHexId']}/comments?group-id={task['groupSkoolId']}&limit=25"
+        return url + (f"&after={quote(str(task['cursor']))}" if task.get('cursor') else '&pinned=true')
+    if t == 'likes':
+        if not task.get('groupSkoolId'):
+            return None
+        return f"{base}/posts/{task['postSkoolHexId']}/vote-users?group-id={task['groupSkoolId']}"
+    if t == 'leaderboard':
+        return f"{next_}{slug}.json?tab=leaderboard&p={task['pageParam']}&group={slug}"
+    if t == 'community_about':
+        return f"{next_}{slug}/about.json?group={slug}"
+    return None
+
+
+def fetch_one(task: dict, base: str, build_id: str) -> bytes:
+    """Holt einen Task und liefert die fertige NDJSON-Zeile (data unverändert eingebettet)."""
+    started = time.perf_counter()
+    url = task_url(task, base, build_id)
+    ok, error, body = False, '', b'{}'
+    if url is None:
+        error = f"cannot build url for {task.get('type')}"
+    else:
+        try:
+            with urllib.request.urlopen(url, timeout=30) as res:
+                body, ok = res.read(), True
+        except urllib.error.HTTPError as e:
+            error = f'HTTP {e.code}'
+        except OSError as e:
+            error = str(e)
+    latency_ms = round((time.perf_counter() - started) * 1000)
+    head = json.dumps({'task': task, 'ok': ok, 'error': error, 'latency_ms': latency_ms})
+    return head[:-1].encode() + b', "data": ' + body + b'}\n'
+
+
+class Api:
+    def __init__(self, base: str):
+        self.base = base.rstrip('/')
+
+    def request(self, method: str, path: str, body: bytes = None, headers: dict = None):
+        req = urllib.request.Request(self.base + path, data=body, method=method, headers=headers or {})
+        with urllib.request.urlopen(req, timeout=600) as res:
+            return json.loads(res.read() or b'null')
+
+    def get(self, path: str):
+        return self.request('GET', path)
+
+    def post_json(self, path: str, payload):
+        return self.request('POST', path, json.dumps(payload).encode(), {'Content-Type': 'application/json'})
+
+
+def start_app(workdir: str) -> tuple[subprocess.Popen, str]:
+    """Startet myversion/app.py mit cwd=workdir (-> eigene app.db) auf einem freien Port."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+    code = (f"import sys; sys.path.insert(0, {os.path.abspath(APP_DIR)!r}); "
+            f"from app import app; app.run(port={port}, debug=False, threaded=True, use_reloader=False)")
+    log = open(os.path.join(workdir, 'app.log'), 'w')
+    proc = subprocess.Popen([sys.executable, '-c', code], cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+    base = f'http://127.0.0.1:{port}'
+    for _ in range(100):
+        try:
+            Api(base).get('/api/fetch-pacing')
+            return proc, base
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError(f'app did not start, see {workdir}/app.log')
+
+
+def run(api: Api, mock_base: str, build_id: str, args) -> dict:
+    timings = Counter()
+    by_type = Counter()
+    errors = Counter()
+    extracted = Counter()
+    rounds = 0
+    tasks_done = 0
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENCY) as pool:
+        while rounds < args.max_rounds and tasks_done < args.max_tasks:
+            t0 = time.perf_counter()
+            tasks = api.get('/api/fetch-tasks')
+            timings['plan'] += time.perf_counter() - t0
+            if not tasks:
+                break
+            rounds += 1
+            tasks = tasks[:args.max_tasks - tasks_done]
+            pacing = api.get('/api/fetch-pacing')
+            pos = 0
+            while pos < len(tasks):
+                concurrency = min(MAX_CONCURRENCY, args.concurrency or pacing.get('concurrency') or 1)
+                batch = tasks[pos:pos + max(args.batch_size, concurrency)]
+                pos += len(batch)
+
+                t0 = time.perf_counter()
+                lines = list(pool.map(lambda t: fetch_one(t, mock_base, build_id), batch)) if concurrency > 1 \
+                    else [fetch_one(t, mock_base, build_id) for t in batch]
+                timings['fetch'] += time.perf_counter() - t0
+
+                t0 = time.perf_counter()
+                result = api.request('POST', '/api/fetch-result/stream', gzip.compress(b''.join(lines), 1),
+                                     {'Content-Type': 'application/x-ndjson', 'Content-Encoding': 'gzip'})
+                timings['ingest'] += time.perf_counter() - t0
+
+                tasks_done += len(batch)
+                by_type.update(t['type'] for t in batch)
+                extracted.update({k: v for k, v in result['extracted'].items() if isinstance(v, int)})
+                errors.update(json.loads(l)['error'] for l in lines if b'"ok": false' in l[:2048])
+                pacing = result.get('pacing') or pacing
+                delay = pacing.get('delay_ms', 0) / 1000.0 * args.pacing_scale
+                if delay > 0:
+                    time.sleep(delay)
+                    timings['pacing_wait'] += delay
+            if args.verbose:
+                print(f'[bench] round {rounds}: {len(tasks)} tasks, {tasks_done} total, '
+                      f'{time.perf_counter() - started:.1f}s', file=sys.stderr)
+
+    wall = time.perf_counter() - started
+    return {
+        'rounds': rounds,
+        'tasks': tasks_done,
+        'by_type': dict(by_type),
+        'errors': dict(errors),
+        'extracted': dict(extracted),
+        'wall_s': round(wall, 3),
+        'plan_s': round(timings['plan'], 3),
+        'fetch_s': round(timings['fetch'], 3),
+        'ingest_s': round(timings['ingest'], 3),
+        'pacing_wait_s': round(timings['pacing_wait'], 3),
+        'tasks_per_s': round(tasks_done / wall, 1) if wall else 0,
+        'ingest_tasks_per_s': round(tasks_done / timings['ingest'], 1) if timings['ingest'] else 0,
+        'completed': rounds < args.max_rounds and tasks_done < args.max_tasks,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless fetch pipeline benchmark')
+    parser.add_argument('--app-url', help='laufende App verwenden statt eine frische zu starten')
+    parser.add_argument('--mock-url', help='laufenden Mock verwenden statt ihn in-process zu starten')
+    parser.add_argument('--community', default='bench')
+    parser.add_argument('--concurrency', type=int, default=0, help='0 = Empfehlung aus /api/fetch-pacing')
+    parser.add_argument('--batch-size', type=int, default=50)
+    parser.add_argument('--pacing-scale', type=float, default=0.0,
+                        help='Faktor auf delay_ms des Pacers (0 = ignorieren, 1 = wie im Fetcher)')
+    parser.add_argument('--max-rounds', type=int, default=1000)
+    parser.add_argument('--max-tasks', type=int, default=10 ** 9)
+    parser.add_argument('--keep-db', action='store_true')
+    parser.add_argument('--json', metavar='PATH', help='Report zusätzlich als JSON schreiben')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    mock_skool.add_mock_args(parser)
+    args = parser.parse_args()
+
+    mock = None
+    if args.mock_url:
+        mock_base = args.mock_url.rstrip('/')
+    else:
+        mock = mock_skool.mock_from_args(args)
+        _, mock_base = mock_skool.start_in_thread(mock)
+
+    proc, workdir = None, None
+    if args.app_url:
+        api = Api(args.app_url)
+    else:
+        workdir = tempfile.mkdtemp(prefix='skool-bench-')
+        proc, base = start_app(workdir)
+        api = Api(base)
+
+    try:
+        api.post_json('/api/test/set-community', {'slug': args.community})
+        report = run(api, mock_base, args.build_id, args)
+        if mock:
+            report['mock'] = dict(mock.stats)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+        if workdir:
+            if args.keep_db:
+                print(f'[bench] database kept in {workdir}/app.db', file=sys.stderr)
+            else:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
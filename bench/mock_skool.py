@@ -0,0 +1,495 @@
+"""
+Offline Skool stand-in für Benchmarks der Fetch-Pipeline (Plan -> Fetch -> Ingest -> Extract).
+
+Bedient die URLs, die electron-fetcher/main.js (taskUrl) baut:
+    /_next/data/<buildId>/<slug>/-/members.json?p=N      members
+    /_next/data/<buildId>/<slug>.json?s=newest&p=N       posts
+    /_next/data/<buildId>/<slug>.json?tab=leaderboard    leaderboard
+    /_next/data/<buildId>/@<userName>.json?group=<slug>  profile
+    /_next/data/<buildId>/<slug>/about.json              community_about
+    /posts/<postId>/comments?limit=25[&after=<cursor>]   comments (api2)
+    /posts/<postId>/vote-users                           likes (api2)
+    /<slug>                                              HTML mit __NEXT_DATA__ (buildId)
+
+Antworten werden aus den Shapes in myversion/schemas/current/*_schema.txt erzeugt (alle Felder
+vorhanden, mit Defaults) und mit deterministischen Daten gefüllt. Mit --replay <app.db> kommen
+sie stattdessen aus gespeicherten fetch.raw_data (Fallback: Generator).
+
+    python bench/mock_skool.py --members 10000 --posts 500 --latency-ms 50 --p429 0.01
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'myversion', 'schemas', 'current')
+
+MEMBERS_PER_PAGE = 30
+POSTS_PER_PAGE = 20          # fetch_and_extract_routes._extract_pagination rechnet mit 20
+COMMENTS_PER_PAGE = 25       # limit=25 in main.js
+LEADERBOARD_SIZE = 100
+DAY = 86400
+
+
+# =============================================================================
+# Schema -> Skeleton
+# =============================================================================
+
+_SCALARS = {'string': '', 'integer': 0, 'number': 0.0, 'boolean': False, 'null': None}
+
+
+def parse_schema(text: str):
+    """
+    Liest das Pseudo-JSON der *_schema.txt ("key": string / { ... } / [ ... ]).
+    Ergebnis: dict für Objekte, ('list', item) für Arrays, Typname für Skalare.
+    """
+    lines = [l.strip() for l in text.splitlines() if l.strip()]
+    pos = 0
+
+    def value(token: str):
+        nonlocal pos
+        if token == '{':
+            obj = {}
+            while lines[pos] != '}':
+                m = re.match(r'"(.*?)":\s*(.*)$', lines[pos])
+                pos += 1
+                obj[m.group(1)] = value(m.group(2).strip())
+            pos += 1
+            return obj
+        if token == '[':
+            items = []
+            while lines[pos] != ']':
+                tok = lines[pos]
+                pos += 1
+                items.append(value(tok))
+            pos += 1
+            return ('list', items[0] if items else 'null')
+        return token
+
+    first = lines[pos]
+    pos += 1
+    return value(first)
+
+
+def fill(node, overrides=None):
+    """Skeleton -> Daten mit Defaults; Arrays bleiben leer. overrides werden tief gemerged."""
+    if isinstance(node, dict):
+        out = {k: fill(v) for k, v in node.items()}
+    elif isinstance(node, tuple):
+        out = []
+    else:
+        out = _SCALARS.get(node, None)
+    if overrides is None:
+        return out
+    if isinstance(out, dict) and isinstance(overrides, dict):
+        for k, v in overrides.items():
+            out[k] = fill(node.get(k, 'null'), v) if isinstance(v, dict) and isinstance(node.get(k), dict) else v
+        return out
+    return overrides
+
+
+def item_of(node, *path):
+    """Skeleton eines Array-Elements entlang path, z.B. item_of(s, 'pageProps', 'users')."""
+    for key in path:
+        node = node[key] if isinstance(node, dict) else {}
+    return node[1] if isinstance(node, tuple) else {}
+
+
+_schemas = {}
+
+
+def schema(name: str):
+    if name not in _schemas:
+        path = os.path.join(SCHEMA_DIR, f'{name}_schema.txt')
+        with open(path, encoding='utf-8') as f:
+            _schemas[name] = parse_schema(f.read())
+    return _schemas[name]
+
+
+# =============================================================================
+# Deterministische Community
+# =============================================================================
+
+def _hex(*parts) -> str:
+    return hashlib.md5(':'.join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _iso(ts: float) -> str:
+    return time.strftime('%Y-%m-%dT%H:%M:%S.000Z', time.gmtime(ts))
+
+
+class MockCommunity:
+    """Alle Werte ergeben sich aus (seed, slug, index) - keine Listen im Speicher außer ID-Lookups."""
+
+    def __init__(self, slug: str, members: int, posts: int, comments_per_post: int,
+                 likes_per_post: int, other_communities: int, seed: int):
+        self.slug = slug
+        self.members = members
+        self.posts = posts
+        self.comments_per_post = comments_per_post
+        self.likes_per_post = likes_per_post
+        self.other_communities = other_communities
+        self.seed = seed
+        self.group_id = _hex(seed, slug, 'group')
+        self.now = int(time.time())
+        self._post_index = {self.post_id(j): j for j in range(posts)}
+
+    def member_id(self, i: int) -> str:
+        return _hex(self.seed, self.slug, 'member', i)
+
+    def member_name(self, i: int) -> str:
+        return f'{self.slug}-member-{i}'
+
+    def post_id(self, j: int) -> str:
+        return _hex(self.seed, self.slug, 'post', j)
+
+    def post_index(self, post_id: str):
+        return self._post_index.get(post_id)
+
+    def member_index(self, name: str):
+        prefix = f'{self.slug}-member-'
+        if name.startswith(prefix) and name[len(prefix):].isdigit():
+            i = int(name[len(prefix):])
+            return i if i < self.members else None
+        return None
+
+    def comment_count(self, j: int) -> int:
+        # Ein paar große Threads, viele kleine
+        return self.comments_per_post * 3 if j % 10 == 0 else (j * 7) % (self.comments_per_post + 1)
+
+    def like_count(self, j: int) -> int:
+        return (j * 13) % (self.likes_per_post + 1)
+
+    # --- Responses ------------------------------------------------------------
+
+    def _user(self, i: int, snake: bool = False) -> dict:
+        first, last = f'First{i}', f'Last{i}'
+        if snake:
+            return {'id': self.member_id(i), 'name': self.member_name(i), 'first_name': first, 'last_name': last,
+                    'email': f'{self.member_name(i)}@bench.invalid'}
+        return {'id': self.member_id(i), 'name': self.member_name(i), 'firstName': first, 'lastName': last,
+                'email': f'{self.member_name(i)}@bench.invalid'}
+
+    def members_page(self, page: int) -> dict:
+        s = schema('members_v1')
+        user_skel = item_of(s, 'pageProps', 'users')
+        total_pages = max(1, -(-self.members // MEMBERS_PER_PAGE))
+        users = []
+        for i in range((page - 1) * MEMBERS_PER_PAGE, min(page * MEMBERS_PER_PAGE, self.members)):
+            joined = self.now - (i % 720) * DAY
+            users.append(fill(user_skel, {
+                **self._user(i),
+                'createdAt': _iso(joined), 'updatedAt': _iso(joined),
+                'metadata': {'bio': f'bench member {i}', 'lastOffline': self.now - (i * 3571) % (200 * DAY)},
+                'member': {'id': _hex(self.seed, self.slug, 'm', i), 'role': 'admin' if i == 0 else 'member',
+                           'groupId': self.group_id, 'userId': self.member_id(i), 'createdAt': _iso(joined)},
+            }))
+        return fill(s, {'pageProps': {'users': users, 'page': page, 'totalPages': total_pages,
+                                      'total': self.members}})
+
+    def posts_page(self, page: int) -> dict:
+        s = schema('community_v1')
+        tree_skel = item_of(s, 'pageProps', 'postTrees')
+        trees = []
+        for j in range((page - 1) * POSTS_PER_PAGE, min(page * POSTS_PER_PAGE, self.posts)):
+            created = self.now - j * 3 * 3600  # neueste zuerst
+            author = (j * 31) % max(1, self.members)
+            trees.append(fill(tree_skel, {'post': {
+                'id': self.post_id(j), 'name': f'bench-post-{j}', 'postType': 'generic',
+                'groupId': self.group_id, 'userId': self.member_id(author),
+                'createdAt': _iso(created), 'updatedAt': _iso(created),
+                'metadata': {'title': f'Bench post {j}', 'comments': self.comment_count(j), 'upvotes': self.like_count(j)},
+                'user': self._user(author),
+            }}))
+        return fill(s, {'pageProps': {'postTrees': trees, 'total': self.posts}})
+
+    def leaderboard_page(self) -> dict:
+        s = schema('leaderboards_v1')
+        entry_skel = item_of(s, 'pageProps', 'allTime', 'users')
+        users = [fill(entry_skel, {'userId': self.member_id(i), 'rank': i + 1, 'points': 10000 - i * 37})
+                 for i in range(min(LEADERBOARD_SIZE, self.members))]
+        # Extractor liest leaderboardsData (nicht im Schema-Sample enthalten)
+        return fill(s, {'pageProps': {'allTime': {'users': users, 'limit': LEADERBOARD_SIZE},
+                                      'leaderboardsData': {'users': users, 'limit': LEADERBOARD_SIZE}}})
+
+    def profile(self, i: int) -> dict:
+        s = schema('profile_fetch')
+        group_skel = item_of(s, 'pageProps', 'currentUser', 'profileData', 'groupsMemberOf')
+        groups = [fill(group_skel, {'id': _hex(self.seed, 'other', g), 'name': f'other-community-{g}'})
+                  for g in {(i * k) % self.other_communities for k in (1, 7, 13)}] if self.other_communities else []
+        return fill(s, {'pageProps': {'currentUser': {
+            **self._user(i),
+            'metadata': {'bio': f'bench member {i}', 'lastOffline': self.now - (i * 3571) % (200 * DAY)},
+            'profileData': {'member': {'id': _hex(self.seed, self.slug, 'm', i), 'role': 'member'},
+                            'totalPosts': i % 50, 'totalFollowers': i % 17, 'totalFollowing': i % 11,
+                            'groupsMemberOf': groups},
+        }}})
+
+    def comments(self, j: int, after: int) -> dict:
+        s = schema('comments_v1')
+        node_skel = item_of(s, 'post_tree', 'children')
+        total = self.comment_count(j)
+        children = []
+        for k in range(after, min(after + COMMENTS_PER_PAGE, total)):
+            author = (j * 17 + k * 5) % max(1, self.members)
+            created = self.now - j * 3 * 3600 + k * 60
+            children.append(fill(node_skel, {'post': {
+                'id': _hex(self.seed, self.slug, 'comment', j, k), 'post_type': 'comment',
+                'group_id': self.group_id, 'user_id': self.member_id(author),
+                'parent_id': self.post_id(j), 'root_id': self.post_id(j),
+                'created_at': _iso(created), 'updated_at': _iso(created),
+                'metadata': {'content': f'comment {k}', 'upvotes': k % 3},
+                'user': self._user(author, snake=True),
+            }}))
+        return fill(s, {'post_tree': {'children': children}, 'last': after + len(children)})
+
+    def likes(self, j: int) -> dict:
+        s = schema('like_page_v1')
+        user_skel = item_of(s, 'users')
+        users = [fill(user_skel, self._user((j * 11 + k * 3) % max(1, self.members), snake=True))
+                 for k in range(self.like_count(j))]
+        return fill(s, {'users': users, 'total_upvote_users': len(users)})
+
+    def about(self, slug: str) -> dict:
+        return fill(schema('about_page_v1'), {'pageProps': {'currentGroup': {
+            'id': _hex(self.seed, 'other', slug), 'name': slug, 'metadata': {'displayName': slug.replace('-', ' ').title()},
+        }}})
+
+
+# =============================================================================
+# Replay aus fetch.raw_data
+# =============================================================================
+
+class ReplayStore:
+    """Index (type, slug, key) -> fetch.id über alle ok-Fetches; raw_data wird erst bei Bedarf gelesen."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._local = threading.local()
+        conn = sqlite3.connect(db_path)
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(fetch)")}
+        cursor_col = 'cursor' if 'cursor' in cols else "''"
+        self.index = {}
+        for fid, ftype, slug, page, user_id, post_id, cursor in conn.execute(
+                f"""SELECT id, type, community_slug, page_param, user_skool_id, post_skool_id, {cursor_col}
+                    FROM fetch WHERE status = 'ok' ORDER BY id"""):
+            if ftype in ('members', 'posts', 'leaderboard'):
+                key = page
+            elif ftype == 'profile':
+                key = user_id
+            elif ftype == 'comments':
+                key = (post_id, cursor or '')
+            elif ftype == 'likes':
+                key = post_id
+            else:
+                key = None
+            self.index[(ftype, slug, key)] = fid  # ORDER BY id -> neuester gewinnt
+        self.user_ids = {name: sid for sid, name in conn.execute("SELECT DISTINCT skool_id, name FROM user")}
+        conn.close()
+
+    def get(self, ftype: str, slug: str, key) -> str | None:
+        fid = self.index.get((ftype, slug, key))
+        if fid is None:
+            return None
+        if not hasattr(self._local, 'conn'):
+            self._local.conn = sqlite3.connect(self.db_path)
+        row = self._local.conn.execute("SELECT raw_data FROM fetch WHERE id = ?", [fid]).fetchone()
+        return row[0] if row else None
+
+
+# =============================================================================
+# HTTP
+# =============================================================================
+
+class MockSkool:
+    """Routing + Fehler-/Latenz-Injection. Communities werden bei Bedarf pro Slug erzeugt."""
+
+    def __init__(self, members=1000, posts=200, comments_per_post=30, likes_per_post=10, other_communities=20,
+                 latency_ms=0, jitter_ms=0, p404=0.0, p429=0.0, seed=1, build_id='bench-build', replay=None):
+        self.opts = dict(members=members, posts=posts, comments_per_post=comments_per_post,
+                         likes_per_post=likes_per_post, other_communities=other_communities, seed=seed)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.p404 = p404
+        self.p429 = p429
+        self.build_id = build_id
+        self.replay = ReplayStore(replay) if replay else None
+        self.rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._communities = {}
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'injected_404': 0, 'injected_429': 0, 'replayed': 0}
+
+    def community(self, slug: str) -> MockCommunity:
+        with self._lock:
+            if slug not in self._communities:
+                self._communities[slug] = MockCommunity(slug, **self.opts)
+            return self._communities[slug]
+
+    def _post_owner(self, post_id: str):
+        with self._lock:
+            communities = list(self._communities.values())
+        for c in communities:
+            j = c.post_index(post_id)
+            if j is not None:
+                return c, j
+        return None, None
+
+    def handle(self, path: str, query: dict) -> tuple[int, str, str]:
+        """Returns (status, content_type, body)."""
+        with self._rng_lock:
+            self.stats['requests'] += 1
+            roll = self.rng.random()
+            jitter = self.rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+        if self.latency_ms or jitter:
+            time.sleep((self.latency_ms + jitter) / 1000.0)
+        if roll < self.p429:
+            self.stats['injected_429'] += 1
+            return 429, 'application/json', '{"error": "rate limited"}'
+        if roll < self.p429 + self.p404:
+            self.stats['injected_404'] += 1
+            return 404, 'application/json', '{"error": "not found"}'
+
+        q = {k: v[0] for k, v in query.items()}
+        m = re.match(r'^/_next/data/([^/]+)/(.+)\.json$', path)
+        if m:
+            if m.group(1) != self.build_id:
+                return 404, 'text/plain', 'unknown build'
+            return self._next_data(unquote(m.group(2)), q)
+        m = re.match(r'^/posts/([^/]+)/(comments|vote-users)$', path)
+        if m:
+            return self._api2(m.group(1), m.group(2), q)
+        slug = path.strip('/').split('/')[0]
+        if slug:
+            next_data = json.dumps({'buildId': self.build_id, 'page': '/[group]', 'query': {'group': slug}})
+            html = f'<html><body><script id="__NEXT_DATA__" type="application/json">{next_data}</script></body></html>'
+            return 200, 'text/html', html
+        return 404, 'text/plain', 'not found'
+
+    def _replayed(self, ftype: str, slug: str, key):
+        if not self.replay:
+            return None
+        raw = self.replay.get(ftype, slug, key)
+        if raw is not None:
+            self.stats['replayed'] += 1
+        return raw
+
+    def _next_data(self, route: str, q: dict) -> tuple[int, str, str]:
+        ok = lambda data: (200, 'application/json', data if isinstance(data, str) else json.dumps(data))
+        page = int(q.get('p', 1) or 1)
+        if route.startswith('@'):
+            slug = q.get('group', '')
+            name = route[1:]
+            if self.replay and name in self.replay.user_ids:
+                raw = self._replayed('profile', slug, self.replay.user_ids[name])
+                if raw is not None:
+                    return ok(raw)
+            c = self.community(slug)
+            i = c.member_index(name)
+            return ok(c.profile(i)) if i is not None else (404, 'text/plain', 'unknown user')
+        if route.endswith('/-/members'):
+            slug = route[:-len('/-/members')]
+            return ok(self._replayed('members', slug, page) or self.community(slug).members_page(page))
+        if route.endswith('/about'):
+            slug = route[:-len('/about')]
+            return ok(self._replayed('community_about', slug, None) or self.community(slug).about(slug))
+        slug = route
+        if q.get('tab') == 'leaderboard':
+            return ok(self._replayed('leaderboard', slug, page) or self.community(slug).leaderboard_page())
+        return ok(self._replayed('posts', slug, page) or self.community(slug).posts_page(page))
+
+    def _api2(self, post_id: str, kind: str, q: dict) -> tuple[int, str, str]:
+        c, j = self._post_owner(post_id)
+        if kind == 'comments':
+            cursor = q.get('after', '')
+            raw = self._replayed('comments', c.slug if c else '', (post_id, cursor)) if self.replay else None
+            if raw is None and self.replay:
+                for slug in {k[1] for k in self.replay.index if k[0] == 'comments'}:
+                    raw = self._replayed('comments', slug, (post_id, cursor))
+                    if raw:
+                        break
+            if raw is not None:
+                return 200, 'application/json', raw
+            if c is None:
+                return 404, 'application/json', '{"error": "unknown post"}'
+            return 200, 'application/json', json.dumps(c.comments(j, int(cursor or 0)))
+        raw = None
+        if self.replay:
+            for slug in {k[1] for k in self.replay.index if k[0] == 'likes'}:
+                raw = self._replayed('likes', slug, post_id)
+                if raw:
+                    break
+        if raw is not None:
+            return 200, 'application/json', raw
+        if c is None:
+            return 404, 'application/json', '{"error": "unknown post"}'
+        return 200, 'application/json', json.dumps(c.likes(j))
+
+
+def make_server(mock: MockSkool, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            status, ctype, body = mock.handle(url.path, parse_qs(url.query))
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', ctype)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(mock: MockSkool, host: str = '127.0.0.1', port: int = 0) -> tuple[ThreadingHTTPServer, str]:
+    """Startet den Mock im Hintergrund. Returns (server, base_url)."""
+    server = make_server(mock, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://{host}:{server.server_address[1]}'
+
+
+def add_mock_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument('--members', type=int, default=1000)
+    parser.add_argument('--posts', type=int, default=200)
+    parser.add_argument('--comments-per-post', type=int, default=30)
+    parser.add_argument('--likes-per-post', type=int, default=10)
+    parser.add_argument('--other-communities', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--p404', type=float, default=0.0, help='Anteil Requests mit injiziertem 404')
+    parser.add_argument('--p429', type=float, default=0.0, help='Anteil Requests mit injiziertem 429')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--build-id', default='bench-build')
+    parser.add_argument('--replay', metavar='APP_DB', help='Antworten aus fetch.raw_data dieser DB abspielen')
+
+
+def mock_from_args(args) -> MockSkool:
+    return MockSkool(members=args.members, posts=args.posts, comments_per_post=args.comments_per_post,
+                     likes_per_post=args.likes_per_post, other_communities=args.other_communities,
+                     latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, p404=args.p404, p429=args.p429,
+                     seed=args.seed, build_id=args.build_id, replay=args.replay)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Offline Skool stand-in server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_mock_args(parser)
+    args = parser.parse_args()
+    server = make_server(mock_from_args(args), args.host, args.port)
+    print(f'[mock] listening on http://{args.host}:{args.port} (buildId {args.build_id})')
+    server.serve_forever()
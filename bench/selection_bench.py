@@ -0,0 +1,121 @@
+"""
+Benchmark der Folge-Endpoints der Member-Selektion (Selection-Handle vs. skool_ids-Liste).
+
+Füllt eine frische App über die /api/test/*-Endpoints mit --members Usern (davon --selected Admins),
+Posts und Profilen und misst dann pro Endpoint:
+    ids       - komplette skool_ids-Liste im Body (so wie früher members.html)
+    handle    - {"selection": handle} aus /api/user/filter, erster Aufruf (materialisiert selection_member)
+    handle_2  - derselbe Aufruf nochmal (Menge steht schon)
+
+    python bench/selection_bench.py --members 30000 --selected 20000
+    python bench/selection_bench.py --app-url http://localhost:3000 --repeat 5
+
+Ohne --app-url wird die App wie in driver.py in einem Temp-Verzeichnis gestartet.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from driver import Api, start_app  # noqa: E402
+
+ENDPOINTS = ['/api/post/by-users', '/api/shared-communities', '/api/communities/by-users',
+             '/api/activity/members', '/api/graph/interactions']
+CHUNK = 2000
+
+
+def populate(api: Api, args) -> None:
+    """members User (die ersten selected sind Admins), posts_per_member Posts je User, Profile mit 3 Gruppen."""
+    slug = args.community
+    for start in range(0, args.members, CHUNK):
+        idx = range(start, min(start + CHUNK, args.members))
+        api.post_json('/api/test/bulk-users', {'users': [{
+            'skool_id': f'u{i}', 'name': f'member-{i}', 'community_slug': slug, 'fetch_id': 1, 'fetched_at': 1,
+            'member_role': 'admin' if i < args.selected else 'member', 'points': i % 1000,
+        } for i in idx]})
+        api.post_json('/api/test/bulk-posts', {'posts': [{
+            'skool_id': f'p{i}-{k}', 'user_id': f'u{i}', 'community_slug': slug, 'is_toplevel': 1,
+            'skool_created_at': f'2026-01-{1 + k % 28:02d}T{i % 24:02d}:00:00Z',
+        } for i in idx for k in range(args.posts_per_member)]})
+        api.post_json('/api/test/bulk-profiles', {'profiles': [{
+            'skool_id': f'u{i}', 'fetched_at': 1,
+            'groups_member_of': json.dumps([{'name': f'group-{(i + g) % args.groups}'} for g in range(3)]),
+        } for i in idx]})
+    for g in range(args.groups):
+        api.post_json('/api/othercommunity', {'slug': f'group-{g}', 'name': f'Group {g}'})
+
+
+def timed(api: Api, path: str, body: dict, repeat: int) -> float:
+    """Bester Wert aus repeat Aufrufen in Sekunden."""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        api.post_json(path, body)
+        best = min(best, time.perf_counter() - t0)
+    return round(best, 4)
+
+
+def run(api: Api, args) -> dict:
+    t0 = time.perf_counter()
+    populate(api, args)
+    populate_s = time.perf_counter() - t0
+
+    state = {'communitySlug': args.community, 'include': {'member_role': 'admin'}, 'exclude': {}}
+    skool_ids = [u['skool_id'] for u in api.post_json('/api/user/filter', state)]
+    page = api.post_json('/api/user/filter', {**state, 'limit': 100})
+    extra = {'community': args.community}
+
+    results = {}
+    for path in ENDPOINTS:
+        handle_first = timed(api, path, {**extra, 'selection': page['selection']}, 1)
+        results[path] = {
+            'ids': timed(api, path, {**extra, 'skool_ids': skool_ids}, args.repeat),
+            'handle': handle_first,
+            'handle_2': timed(api, path, {**extra, 'selection': page['selection']}, args.repeat),
+        }
+    return {'members': args.members, 'selected': len(skool_ids), 'populate_s': round(populate_s, 2),
+            'endpoints_s': results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Selection follow-up endpoint benchmark')
+    parser.add_argument('--app-url', help='laufende App verwenden (sollte leer sein) statt eine frische zu starten')
+    parser.add_argument('--community', default='bench')
+    parser.add_argument('--members', type=int, default=30000)
+    parser.add_argument('--selected', type=int, default=20000)
+    parser.add_argument('--posts-per-member', type=int, default=2)
+    parser.add_argument('--groups', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', metavar='PATH', help='Report zusätzlich als JSON schreiben')
+    args = parser.parse_args()
+
+    proc, workdir = None, None
+    if args.app_url:
+        api = Api(args.app_url)
+    else:
+        workdir = tempfile.mkdtemp(prefix='skool-bench-')
+        proc, base = start_app(workdir)
+        api = Api(base)
+
+    try:
+        api.post_json('/api/test/set-community', {'slug': args.community})
+        report = run(api, args)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
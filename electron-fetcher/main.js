@@ -284,49 +284,167 @@ ipcMain.handle('check-skool-login', async () => {
 // Fetch Logic
 // ============================================================================
 
-ipcMain.handle('execute-fetch-task', async (event, task) => {
-  try {
-    const code = `
-      (async function() {
-        const task = ${JSON.stringify(task)};
-
-        const nextData = document.getElementById("__NEXT_DATA__");
-        if (!nextData) return { error: "No __NEXT_DATA__ found - not on Skool page?" };
-
-        const { buildId } = JSON.parse(nextData.textContent);
-        if (!buildId) return { error: "No buildId found" };
-
-        let url;
-        if (task.type === "members") {
-          url = "https://www.skool.com/_next/data/" + buildId + "/" + task.communitySlug + "/-/members.json?t=active&p=" + task.pageParam + "&group=" + task.communitySlug;
-        } else if (task.type === "posts") {
-          url = "https://www.skool.com/_next/data/" + buildId + "/" + task.communitySlug + ".json?s=newest&p=" + task.pageParam;
-        } else if (task.type === "profile") {
-          url = "https://www.skool.com/_next/data/" + buildId + "/@" + task.userName + ".json?group=" + task.communitySlug;
-        } else if (task.type === "comments") {
-          if (!task.groupSkoolId) return { error: "groupSkoolId missing for comments" };
-          url = "https://api2.skool.com/posts/" + task.postSkoolHexId + "/comments?group-id=" + task.groupSkoolId + "&limit=25&pinned=true";
-        } else if (task.type === "likes") {
-          if (!task.groupSkoolId) return { error: "groupSkoolId missing for likes" };
-          url = "https://api2.skool.com/posts/" + task.postSkoolHexId + "/vote-users?group-id=" + task.groupSkoolId;
-        } else if (task.type === "leaderboard") {
-          url = "https://www.skool.com/_next/data/" + buildId + "/" + task.communitySlug + ".json?tab=leaderboard&p=" + task.pageParam + "&group=" + task.communitySlug;
-        } else if (task.type === "community_about") {
-          url = "https://www.skool.com/_next/data/" + buildId + "/" + task.communitySlug + "/about.json?group=" + task.communitySlug;
-        } else {
-          return { error: "Unknown task type: " + task.type };
+// URL pro Task-Typ. Wird als Source in die Skool-Seite injiziert (dort laufen die Fetches mit Cookies).
+const TASK_URL_FN = `
+  function taskUrl(task, buildId) {
+    const next = "https://www.skool.com/_next/data/" + buildId + "/";
+    if (task.type === "members") {
+      return next + task.communitySlug + "/-/members.json?t=active&p=" + task.pageParam + "&group=" + task.communitySlug;
+    } else if (task.type === "posts") {
+      return next + task.communitySlug + ".json?s=newest&p=" + task.pageParam;
+    } else if (task.type === "profile") {
+      return next + "@" + task.userName + ".json?group=" + task.communitySlug;
+    } else if (task.type === "comments") {
+      if (!task.groupSkoolId) return { error: "groupSkoolId missing for comments" };
+      let url = "https://api2.skool.com/posts/" + task.postSkoolHexId + "/comments?group-id=" + task.groupSkoolId + "&limit=25";
+      // Cursor = 'last' der vorherigen Seite; pinned nur auf der ersten Seite
+      url += task.cursor ? "&after=" + encodeURIComponent(task.cursor) : "&pinned=true";
+      return url;
+    } else if (task.type === "likes") {
+      if (!task.groupSkoolId) return { error: "groupSkoolId missing for likes" };
+      return "https://api2.skool.com/posts/" + task.postSkoolHexId + "/vote-users?group-id=" + task.groupSkoolId;
+    } else if (task.type === "leaderboard") {
+      return next + task.communitySlug + ".json?tab=leaderboard&p=" + task.pageParam + "&group=" + task.communitySlug;
+    } else if (task.type === "community_about") {
+      return next + task.communitySlug + "/about.json?group=" + task.communitySlug;
+    }
+    return { error: "Unknown task type: " + task.type };
+  }
+`;
+
+// buildId der Skool-Next.js-App. Gecacht, bis nach einem 404 auf _next/data ein frisch gelesener
+// buildId abweicht (neues Deployment -> alter Build existiert nicht mehr).
+let cachedBuildId = null;
+
+async function loadBuildId(communitySlug) {
+  await skoolView.webContents.loadURL('https://www.skool.com/' + (communitySlug || ''));
+  cachedBuildId = await skoolView.webContents.executeJavaScript(`
+    (function() {
+      const nextData = document.getElementById("__NEXT_DATA__");
+      if (!nextData) return null;
+      try { return JSON.parse(nextData.textContent).buildId || null; } catch (e) { return null; }
+    })()
+  `);
+  return cachedBuildId;
+}
+
+// Aktueller buildId per fetch der Community-Seite im Skool-Kontext - ohne die View neu zu laden.
+async function fetchFreshBuildId(communitySlug) {
+  return skoolView.webContents.executeJavaScript(`
+    (async function() {
+      try {
+        const res = await fetch(${JSON.stringify('https://www.skool.com/' + (communitySlug || ''))}, { credentials: "include" });
+        const match = (await res.text()).match(/"buildId"\\s*:\\s*"([^"]+)"/);
+        return match ? match[1] : null;
+      } catch (e) { return null; }
+    })()
+  `);
+}
+
+async function runFetches(tasks, buildId, concurrency) {
+  const code = `
+    (async function() {
+      const tasks = ${JSON.stringify(tasks)};
+      const buildId = ${JSON.stringify(buildId)};
+      ${TASK_URL_FN}
+      const results = new Array(tasks.length);
+      let next = 0;
+      async function worker() {
+        while (next < tasks.length) {
+          const i = next++;
+          const task = tasks[i];
+          const startedAt = performance.now();
+          try {
+            const url = taskUrl(task, buildId);
+            if (typeof url !== "string") {
+              results[i] = url;
+            } else {
+              const res = await fetch(url, { credentials: "include" });
+              if (!res.ok) {
+                results[i] = { error: "HTTP " + res.status, nextData404: res.status === 404 && url.includes("/_next/data/") };
+              } else {
+                results[i] = { ok: true, type: task.type, data: await res.json() };
+              }
+            }
+          } catch (e) {
+            results[i] = { error: e.message };
+          }
+          results[i].latency_ms = Math.round(performance.now() - startedAt);
         }
+      }
+      await Promise.all(Array.from({ length: Math.min(${concurrency}, tasks.length) }, worker));
+      return results;
+    })();
+  `;
+  return skoolView.webContents.executeJavaScript(code);
+}
 
-        const res = await fetch(url, { credentials: "include" });
-        if (!res.ok) return { error: "HTTP " + res.status };
+// Führt N Tasks mit begrenzter Parallelität aus, Ergebnisse in Task-Reihenfolge.
+// 404 auf _next/data ist meist ein gelöschtes Profil o.ä. - nur wenn ein frisch gelesener buildId
+// vom gecachten abweicht, war es ein neues Deployment: dann genau diese Tasks einmal wiederholen.
+async function executeFetchBatch(tasks, concurrency) {
+  if (!tasks.length) return [];
+  concurrency = Math.max(1, Math.min(parseInt(concurrency, 10) || 1, 8));
+  if (!cachedBuildId) await loadBuildId(tasks[0].communitySlug);
+  if (!cachedBuildId) return tasks.map(() => ({ error: "No buildId found - not on Skool page?" }));
+
+  const usedBuildId = cachedBuildId;
+  const results = await runFetches(tasks, usedBuildId, concurrency);
+  const retry = results.map((r, i) => (r.nextData404 ? i : -1)).filter(i => i >= 0);
+  if (retry.length) {
+    const freshBuildId = await fetchFreshBuildId(tasks[retry[0]].communitySlug);
+    if (freshBuildId && freshBuildId !== usedBuildId) {
+      console.log(`[main] buildId changed ${usedBuildId} -> ${freshBuildId}, retrying ${retry.length} tasks`);
+      cachedBuildId = freshBuildId;
+      const retried = await runFetches(retry.map(i => tasks[i]), freshBuildId, concurrency);
+      retry.forEach((taskIndex, j) => { results[taskIndex] = retried[j]; });
+    }
+  }
+  for (const r of results) delete r.nextData404;
+  return results;
+}
 
-        const data = await res.json();
-        return { ok: true, type: task.type, data };
-      })();
-    `;
+// Tasks vom Server laden, mit dem aktuellen Pacing aus den Headern (Pause + Batch-Größe)
+function loadFetchTasks() {
+  return new Promise((resolve, reject) => {
+    const req = http.get(`${API_URL}/api/fetch-tasks`, (res) => {
+      let body = '';
+      res.setEncoding('utf8');
+      res.on('data', chunk => { body += chunk; });
+      res.on('end', () => {
+        try {
+          const delay = parseInt(res.headers['x-fetch-delay-ms'], 10);
+          const batchSize = parseInt(res.headers['x-fetch-batch-size'], 10);
+          const pacing = Number.isFinite(delay) && batchSize > 0 ? { delay_ms: delay, concurrency: batchSize } : null;
+          resolve({ tasks: JSON.parse(body), pacing });
+        } catch (e) {
+          reject(e);
+        }
+      });
+    });
+    req.on('error', reject);
+  });
+}
 
-    const result = await skoolView.webContents.executeJavaScript(code);
-    return result;
+ipcMain.handle('load-fetch-tasks', async () => {
+  try {
+    return await loadFetchTasks();
+  } catch (e) {
+    return { error: e.message };
+  }
+});
+
+ipcMain.handle('execute-fetch-batch', async (event, tasks, concurrency) => {
+  try {
+    return await executeFetchBatch(tasks, concurrency);
+  } catch (e) {
+    return tasks.map(() => ({ error: e.message }));
+  }
+});
+
+ipcMain.handle('execute-fetch-task', async (event, task) => {
+  try {
+    return (await executeFetchBatch([task], 1))[0];
   } catch (e) {
     return { error: e.message };
   }
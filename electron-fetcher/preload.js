@@ -15,9 +15,15 @@ contextBridge.exposeInMainWorld('electronFetcher', {
   // Prüfen ob bei Skool eingeloggt
   checkSkoolLogin: () => ipcRenderer.invoke('check-skool-login'),
 
+  // Tasks vom Server laden: {tasks, pacing: {delay_ms, concurrency} | null}
+  loadFetchTasks: () => ipcRenderer.invoke('load-fetch-tasks'),
+
   // Einen Fetch-Task ausführen
   executeFetchTask: (task) => ipcRenderer.invoke('execute-fetch-task', task),
 
+  // Mehrere Fetch-Tasks parallel ausführen (max. concurrency gleichzeitig), Results in Task-Reihenfolge
+  executeFetchBatch: (tasks, concurrency) => ipcRenderer.invoke('execute-fetch-batch', tasks, concurrency),
+
   // Skool zu einer URL navigieren (für buildId)
   navigateSkool: (url) => ipcRenderer.invoke('navigate-skool', url),
 
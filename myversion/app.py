@@ -16,6 +16,7 @@ from src.profile import Profile
 from src.leaderboard import Leaderboard
 from src.like import Like
 from src.other_community import OtherCommunity
+from src import current_state, search, membership, other_community, interaction_edges, graph_metrics, activity_rollup, profile_group, selection, table_stats
 from routes import fetch_and_extract_routes, query_routes, stats_routes, image_routes, log_routes, test_routes
 
 app = Flask(__name__, static_folder='static')
@@ -34,6 +35,19 @@ Leaderboard.register(app)
 Like.register(app)
 OtherCommunity.register(app)
 
+# Aktueller Stand (neuester Snapshot pro User/Post), braucht die user/post-Tabellen
+current_state.ensure_tables()
+search.ensure_tables()
+membership.ensure_tables()
+other_community.ensure_tables()
+interaction_edges.ensure_tables()
+graph_metrics.ensure_tables()
+activity_rollup.ensure_tables()
+profile_group.ensure_tables()
+selection.ensure_tables()
+# Zeilenzahl-Trigger für alle Tabellen, deshalb als letztes
+table_stats.ensure_tables()
+
 # Domain-Routes
 fetch_and_extract_routes.register(app)
 query_routes.register(app)
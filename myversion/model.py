@@ -6,8 +6,8 @@ from typing import TypeVar, Type, Any, get_type_hints
 from flask import request, jsonify
 
 T = TypeVar('T')
-_local = threading.local()
-_batch_mode: bool = False
+BUSY_TIMEOUT = 5.0  # Sekunden
+_local = threading.local()  # conn + batch: pro Thread (threaded Server), wie die Connection selbst
 
 class Model:
     """
@@ -38,21 +38,35 @@ class Model:
     @staticmethod
     def connect(db_path: str = 'app.db') -> sqlite3.Connection:
         if not hasattr(_local, 'conn') or _local.conn is None:
-            _local.conn = sqlite3.connect(db_path)
+            _local.conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+            # WAL: offene Lese-Cursor (Streaming-Export, langsamer Client) sperren keine Schreiber,
+            # Schreiber warten höchstens BUSY_TIMEOUT aufeinander
+            _local.conn.execute("PRAGMA journal_mode=WAL")
             _local.conn.row_factory = lambda c, r: dict(zip([col[0] for col in c.description], r))
         return _local.conn
 
     @staticmethod
     def begin_batch():
-        global _batch_mode
-        _batch_mode = True
+        """Commits dieses Threads bis end_batch() aufschieben; andere Threads committen weiter."""
+        _local.batch = True
 
     @staticmethod
     def end_batch():
-        global _batch_mode
-        _batch_mode = False
+        _local.batch = False
         Model.connect().commit()
 
+    @staticmethod
+    def in_batch() -> bool:
+        return getattr(_local, 'batch', False)
+
+    @staticmethod
+    def commit() -> bool:
+        """Commit, außer im Batch-Modus (dann committet end_batch). Returns True wenn committet wurde."""
+        if Model.in_batch():
+            return False
+        Model.connect().commit()
+        return True
+
     @staticmethod
     def _props(cls: type) -> dict[str, str]:
         props = {}
@@ -98,7 +112,7 @@ class Model:
             data['updated_at'] = self.updated_at
             sets = ', '.join([f"{k} = ?" for k in data.keys()])
             conn.execute(f"UPDATE {table} SET {sets} WHERE id = ?", list(data.values()) + [self.id])
-        if not _batch_mode:
+        if not Model.in_batch():
             conn.commit()
 
     def delete(self) -> None:
@@ -1,10 +1,12 @@
 from flask import jsonify, request
 import json
+import time
 from model import Model
 from src.config_entry import ConfigEntry
 from src.fetch_task import FetchTask, FetchStaleInformation
 from src.fetch import Fetch
-from src import extractor
+from src.fetch_pacing import FetchPacer
+from src import data_version, extractor, fetch_stream
 
 
 def _extract_pagination(data: dict, fetch_type: str) -> tuple[int, int]:
@@ -25,50 +27,150 @@ def _extract_pagination(data: dict, fetch_type: str) -> tuple[int, int]:
     return total, total_pages
 
 
+STREAM_COMMIT_INTERVAL = 0.1  # Sekunden: so lange hält der Stream-Ingest höchstens eine Schreib-Transaktion offen
+
+_EXTRACTED_KEYS = ('users', 'posts', 'comments', 'profiles', 'leaderboard', 'leaderboard_applied', 'other_communities', 'likes')
+
+
+def _empty_extracted() -> dict:
+    return {k: 0 for k in _EXTRACTED_KEYS}
+
+
+def _add_extracted(total: dict, ex: dict) -> None:
+    for k in _EXTRACTED_KEYS:
+        total[k] += ex[k]
+
+
+def _store_result(task: dict, ok: bool, error: str, raw_data: str, data, latency_ms=None) -> tuple[Fetch, dict]:
+    """Ein Result als Fetch speichern, Pacing füttern und extrahieren. data = geparstes raw_data."""
+    if not isinstance(data, dict):
+        data = {}
+    fetch_type = task.get('type', '')
+    total_items, total_pages = _extract_pagination(data, fetch_type)
+    f = Fetch({
+        'type': fetch_type,
+        'community_slug': task.get('communitySlug', ''),
+        'page_param': task.get('pageParam', 1),
+        'user_skool_id': task.get('userSkoolHexId', ''),
+        'post_skool_id': task.get('postSkoolHexId', ''),
+        'cursor': task.get('cursor', '') or '',
+        'status': 'ok' if ok else 'error',
+        'error_message': error,
+        'raw_data': raw_data,
+        'total_items': total_items,
+        'total_pages': total_pages,
+    })
+    f.save()
+    FetchPacer.record(fetch_type, ok, error, latency_ms)
+    if f.status != 'ok':
+        return f, _empty_extracted()
+    return f, extractor.extract_from_fetch(f, data)
+
+
 def register(app):
     @app.route('/api/fetch-tasks')
     def get_fetch_tasks():
-        return jsonify([t.to_dict() for t in FetchTask.generateFetchTasks()])
+        """
+        Task-Liste (Body wie bisher). Das aktuelle Pacing (FetchPacer) kommt als Header mit, damit der
+        Fetcher schon den ersten Batch danach richtet: X-Fetch-Delay-Ms, X-Fetch-Batch-Size.
+        """
+        tasks = FetchTask.generateFetchTasks()
+        pacing = FetchPacer.recommend()
+        response = jsonify([t.to_dict() for t in tasks])
+        response.headers['X-Fetch-Delay-Ms'] = str(pacing['delay_ms'])
+        response.headers['X-Fetch-Batch-Size'] = str(pacing['concurrency'])
+        return response
 
     @app.route('/api/fetch-result', methods=['POST'])
     def post_fetch_result():
         """Empfängt Results vom Plugin und speichert sie als Fetch."""
         results = request.json.get('results', [])
         saved = []
-        extracted = {'users': 0, 'posts': 0, 'comments': 0, 'profiles': 0, 'leaderboard': 0, 'leaderboard_applied': 0, 'other_communities': 0, 'likes': 0}
+        extracted = _empty_extracted()
         for r in results:
-            task = r.get('task', {})
             result = r.get('result', {})
             data = result.get('data', {})
-            fetch_type = task.get('type', '')
-            total_items, total_pages = _extract_pagination(data, fetch_type)
-            f = Fetch({
-                'type': fetch_type,
-                'community_slug': task.get('communitySlug', ''),
-                'page_param': task.get('pageParam', 1),
-                'user_skool_id': task.get('userSkoolHexId', ''),
-                'post_skool_id': task.get('postSkoolHexId', ''),
-                'status': 'ok' if result.get('ok') else 'error',
-                'error_message': result.get('error', ''),
-                'raw_data': json.dumps(data),
-                'total_items': total_items,
-                'total_pages': total_pages,
-            })
-            f.save()
+            f, ex = _store_result(r.get('task', {}), bool(result.get('ok')), result.get('error', ''),
+                                  json.dumps(data), data, r.get('latency_ms'))
             saved.append(f.to_dict())
-            if f.status == 'ok':
-                ex = extractor.extract_from_fetch(f)
-            else:
-                ex = {'users': 0, 'posts': 0, 'comments': 0, 'profiles': 0, 'leaderboard': 0, 'leaderboard_applied': 0, 'other_communities': 0, 'likes': 0}
-            extracted['users'] += ex['users']
-            extracted['posts'] += ex['posts']
-            extracted['comments'] += ex['comments']
-            extracted['profiles'] += ex['profiles']
-            extracted['leaderboard'] += ex['leaderboard']
-            extracted['leaderboard_applied'] += ex['leaderboard_applied']
-            extracted['other_communities'] += ex['other_communities']
-            extracted['likes'] += ex['likes']
-        return jsonify({'saved': len(saved), 'fetches': saved, 'extracted': extracted}), 201
+            _add_extracted(extracted, ex)
+        # DELETE ohne nachfolgendes save() (leere Seite) sonst offen -> DB gelockt
+        Model.connect().commit()
+        return jsonify({'saved': len(saved), 'fetches': saved, 'extracted': extracted, 'pacing': FetchPacer.recommend()}), 201
+
+    @app.route('/api/fetch-result/stream', methods=['POST'])
+    def post_fetch_result_stream():
+        """
+        Wie /api/fetch-result, aber als NDJSON-Stream (gzip/zstd via Content-Encoding).
+        Eine Zeile pro Result: {"task": {...}, "ok": true, "error": "", "latency_ms": 812, "data": {...}}
+        raw_data wird so gespeichert, wie es ankommt. Kaputte Zeilen landen in 'rejected'.
+        """
+        encoding = request.headers.get('Content-Encoding', '').strip().lower()
+        try:
+            fetch_stream.check_encoding(encoding)
+        except fetch_stream.UnsupportedEncoding as e:
+            return jsonify({'error': str(e)}), 415
+
+        fetch_ids = []
+        rejected = []
+        extracted = _empty_extracted()
+        conn = Model.connect()
+        batch_started = None  # erste noch nicht committete Änderung
+
+        def commit_batch() -> None:
+            nonlocal batch_started
+            if conn.in_transaction:
+                conn.commit()
+                data_version.bump()
+            batch_started = None
+
+        Model.begin_batch()
+        try:
+            # vor jedem Lesen vom Client committen: kein Write-Lock, während auf den Upload gewartet wird
+            for line_no, line in enumerate(fetch_stream.iter_lines(request.stream, encoding, commit_batch), start=1):
+                try:
+                    fields, raw_data, data = fetch_stream.parse_record(line)
+                except ValueError as e:
+                    rejected.append({'line': line_no, 'error': str(e)})
+                    continue
+                if not conn.in_transaction:
+                    conn.execute("BEGIN")
+                    batch_started = time.monotonic()
+                # ein Record, der beim Speichern/Extrahieren scheitert, wird einzeln zurückgerollt
+                conn.execute("SAVEPOINT record")
+                try:
+                    f, ex = _store_result(fields.get('task') or {}, bool(fields.get('ok')), fields.get('error') or '',
+                                          raw_data, data, fields.get('latency_ms'))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO record")
+                    conn.execute("RELEASE record")
+                    rejected.append({'line': line_no, 'error': f'{type(e).__name__}: {e}'})
+                    continue
+                conn.execute("RELEASE record")
+                fetch_ids.append(f.id)
+                _add_extracted(extracted, ex)
+                if time.monotonic() - batch_started >= STREAM_COMMIT_INTERVAL:
+                    commit_batch()
+        except fetch_stream.DECOMPRESSION_ERRORS as e:
+            rejected.append({'line': None, 'error': f'decompression failed: {e}'})
+        except Exception:
+            conn.rollback()  # z.B. Client-Abbruch: keine halbe Transaktion committen
+            raise
+        finally:
+            Model.end_batch()
+            data_version.bump()
+        return jsonify({'saved': len(fetch_ids), 'fetch_ids': fetch_ids, 'rejected': rejected,
+                        'extracted': extracted, 'pacing': FetchPacer.recommend()}), 201
+
+    @app.route('/api/fetch-pacing')
+    def get_fetch_pacing():
+        """Empfohlene Parallelität + Pause für den nächsten Batch, plus Stats pro Endpoint."""
+        return jsonify(FetchPacer.recommend())
+
+    @app.route('/api/fetch-status')
+    def get_fetch_status():
+        """Backlog + Freshness pro getrackter Community."""
+        return jsonify(FetchTask.community_status())
 
     @app.route('/api/fetch-debug')
     def get_fetch_debug():
@@ -170,6 +272,7 @@ def register(app):
             result['other_communities'] += ex['other_communities']
             result['likes'] += ex['likes']
         Model.end_batch()
+        data_version.bump()
         return jsonify({'extracted': result, 'processed': len(fetches)})
 
     @app.route('/api/apply-leaderboard', methods=['POST'])
@@ -1,15 +1,43 @@
 from flask import jsonify, request, Response
-import json
-import csv
-import io
+import os
+import tempfile
+import time
 from model import Model
 from src.config_entry import ConfigEntry
 from src.user import User
 from src.post import Post
-from src.profile import Profile
 from src.like import Like
 from src.other_community import OtherCommunity
 from src.members_filter import MembersFilter
+from src.posts_filter import PostFilter
+from src.community_filter import CommunityFilter
+from src import search, export, columnar_export, membership_bitmap
+from src.selection import Selection
+from src.filter_cache import FilterCache
+
+
+def _user_row(u: User) -> dict:
+    return {k: v for k, v in u.to_dict().items() if k not in ('metadata', 'member_metadata')}
+
+
+def _expired():
+    return jsonify({'error': 'selection expired'}), 410
+
+
+def _bounded_int(data: dict, key: str, default: int, low: int, high: int) -> int:
+    """Ganzzahl aus dem Body (fehlt/leer -> default), auf [low, high] begrenzt. ValueError -> 400 beim Aufrufer."""
+    value = data.get(key)
+    if not value:
+        return default
+    try:
+        return min(max(int(value), low), high)
+    except (TypeError, ValueError):
+        raise ValueError(f'{key} must be an integer') from None
+
+
+def _selection_mask(bitmap, sel: str) -> int:
+    """User der Selektion (Selection.table()) als Bitmenge des Membership-Bitmaps."""
+    return bitmap.selection_mask(r['skool_id'] for r in Model.query(f"SELECT skool_id FROM {sel}"))
 
 
 def register(app):
@@ -17,36 +45,152 @@ def register(app):
 
     @app.route('/api/user/filter', methods=['POST'])
     def filter_users():
-        """Filter users with include/exclude conditions, search, and sorting."""
+        """
+        Filter users with include/exclude conditions, search, and sorting.
+        Ohne limit: komplette Liste (Array). Mit limit (+ cursor): eine Seite
+        {items, total, next_cursor, selection} - selection ersetzt skool_ids in Folge-Requests.
+        """
         data = request.json or {}
         if not data.get('communitySlug'):
             community = ConfigEntry.getByKey('current_community')
             data['communitySlug'] = community.value if community else ''
         f = MembersFilter(data)
-        users = User.filtered(f)
-        return jsonify([{k: v for k, v in u.to_dict().items() if k not in ('metadata', 'member_metadata')} for u in users])
+        if not data.get('limit'):
+            users = User.filtered(f)
+            return jsonify([_user_row(u) for u in users])
+        try:
+            limit = _bounded_int(data, 'limit', 0, 1, 5000)
+            users, total, next_cursor = User.filtered_page(f, limit, data.get('cursor') or '')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'items': [_user_row(u) for u in users], 'total': total,
+                        'next_cursor': next_cursor, 'selection': Selection.register(f, refresh=not data.get('cursor'))})
+
+    @app.route('/api/user/facets', methods=['POST'])
+    def user_facets():
+        """
+        Trefferzahlen pro Filter-Option (Rolle, Aktivität, Beitritt, Punkte-Bins, online) für den Filter-Zustand.
+        Jede Facette berücksichtigt alle anderen aktiven Bedingungen, nicht ihre eigenen.
+        """
+        data = request.json or {}
+        if not data.get('communitySlug'):
+            community = ConfigEntry.getByKey('current_community')
+            data['communitySlug'] = community.value if community else ''
+        return jsonify(User.facets(MembersFilter(data)))
+
+    @app.route('/api/user/filter/cache')
+    def filter_cache_stats():
+        """Hit/Miss-Zähler und Größe des Filter-Caches (src/filter_cache.py)."""
+        return jsonify(FilterCache.stats())
+
+    @app.route('/api/selection', methods=['POST'])
+    def register_selection():
+        """
+        Selektion registrieren: {skool_ids: [...]} oder ein Filter-Zustand wie bei /api/user/filter.
+        Returns {selection, count} - selection statt skool_ids an die Folge-Endpoints schicken.
+        """
+        data = request.json or {}
+        if 'skool_ids' in data:
+            handle = Selection.register_ids(data['skool_ids'] or [])
+        else:
+            if not data.get('communitySlug'):
+                community = ConfigEntry.getByKey('current_community')
+                data['communitySlug'] = community.value if community else ''
+            handle = Selection.register(MembersFilter(data))
+        return jsonify({'selection': handle, 'count': Selection.count(Selection.table(handle))})
 
     @app.route('/api/user/export-csv', methods=['POST'])
     def export_users_csv():
-        """Export filtered users as CSV."""
+        """Export filtered users as CSV (gestreamt, Spalten wie bisher)."""
         data = request.json or {}
         if not data.get('communitySlug'):
             community = ConfigEntry.getByKey('current_community')
             data['communitySlug'] = community.value if community else ''
-        f = MembersFilter(data)
-        users = User.filtered(f)
-
-        output = io.StringIO()
-        writer = csv.writer(output)
-        writer.writerow(['name', 'first_name', 'last_name', 'email', 'member_role', 'points', 'joined', 'last_active', 'community', 'skool_id'])
-        for u in users:
-            writer.writerow([
-                u.name, u.first_name, u.last_name, u.email,
-                u.member_role, u.points, u.member_created_at, u.last_active,
-                u.community_slug, u.skool_id
-            ])
-        csv_data = output.getvalue()
-        return Response(csv_data, mimetype='text/csv', headers={'Content-Disposition': 'attachment; filename=members.csv'})
+        data['columns'] = export.DEFAULT_COLUMNS['members']
+        header = ['name', 'first_name', 'last_name', 'email', 'member_role', 'points', 'joined', 'last_active',
+                  'community', 'skool_id']
+        return Response(export.stream('members', data, header=header), mimetype='text/csv',
+                        headers={'Content-Disposition': 'attachment; filename=members.csv'})
+
+    @app.route('/api/export/<kind>', methods=['POST'])
+    def export_stream(kind):
+        """
+        Streaming-Export (src/export.py): kind = members | posts | comments | likes.
+        Body: Filter-Zustand wie bei /api/user/filter bzw. /api/post/filter, dazu
+        format ('csv' | 'ndjson'), gzip (bool), columns (Liste oder komma-getrennt).
+        """
+        data = request.json or {}
+        if not data.get('communitySlug'):
+            community = ConfigEntry.getByKey('current_community')
+            data['communitySlug'] = community.value if community else ''
+        fmt = data.get('format') or 'csv'
+        compress = bool(data.get('gzip'))
+        try:
+            body = export.stream(kind, data, fmt, compress)
+        except export.ExportError as e:
+            return jsonify({'error': str(e)}), 400
+        filename = f"{kind}.{fmt}" + ('.gz' if compress else '')
+        return Response(body, mimetype='application/gzip' if compress else export.FORMATS[fmt],
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+    @app.route('/api/export/columnar/<table>')
+    def export_columnar(table):
+        """
+        Eine Analyse-Tabelle als Parquet (?format=parquet, default) oder Arrow IPC (?format=arrow),
+        siehe src/columnar_export.py. Ohne pyarrow.parquet kommt Arrow IPC, ohne pyarrow 501.
+        ?raw=1 exportiert zusätzlich die rohen metadata-JSON-Spalten.
+        """
+        if table not in columnar_export.TABLES:
+            return jsonify({'error': f'unknown table: {table}'}), 400
+        try:
+            fmt = columnar_export.resolve_format(request.args.get('format', 'parquet'))
+        except columnar_export.ColumnarUnavailable as e:
+            return jsonify({'error': str(e)}), 501
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        # Parquet schreibt den Footer zum Schluss -> erst in eine Temp-Datei, dann in Chunks ausliefern
+        fd, path = tempfile.mkstemp(suffix=columnar_export.FORMATS[fmt])
+        with os.fdopen(fd, 'wb') as f:
+            columnar_export.export_table(table, f, fmt, raw=request.args.get('raw') in ('1', 'true'))
+
+        def chunks():
+            try:
+                with open(path, 'rb') as f:
+                    while chunk := f.read(1024 * 1024):
+                        yield chunk
+            finally:
+                os.remove(path)
+
+        mimetype = 'application/vnd.apache.parquet' if fmt == 'parquet' else 'application/vnd.apache.arrow.file'
+        return Response(chunks(), mimetype=mimetype, headers={
+            'Content-Disposition': f'attachment; filename={table}{columnar_export.FORMATS[fmt]}',
+            'Content-Length': str(os.path.getsize(path))})
+
+    @app.route('/api/user/left')
+    def get_recently_left():
+        """
+        Kürzlich gegangene Members (membership_status.left_at in den letzten ?days=30 Tagen), neueste zuerst.
+        ?community=slug, default: current_community.
+        """
+        community = request.args.get('community', '')
+        if not community:
+            c = ConfigEntry.getByKey('current_community')
+            community = c.value if c else ''
+        days = request.args.get('days', 30, type=int)
+        rows = Model.query(
+            """SELECT u.*, m.first_seen, m.last_seen_in_full_crawl, m.left_at
+               FROM membership_status m
+               JOIN user_current u ON u.community_slug = m.community_slug AND u.skool_id = m.skool_id
+               WHERE m.community_slug = ? AND m.left_at >= ?
+               ORDER BY m.left_at DESC""",
+            [community, int(time.time()) - days * 86400]
+        )
+        result = []
+        for r in rows:
+            data = _user_row(User(r))
+            data.update({k: r[k] for k in ('first_seen', 'last_seen_in_full_crawl', 'left_at')})
+            result.append(data)
+        return jsonify(result)
 
     @app.route('/api/user/<int:user_id>/posts')
     def get_user_posts(user_id):
@@ -72,25 +216,14 @@ def register(app):
 
     @app.route('/api/user/<int:user_id>/profile-communities')
     def get_user_profile_communities(user_id):
-        """Get all communities from profile.groups_member_of (more complete than user table)."""
+        """Get all communities from the latest profile's groups_member_of (profile_group, more complete than user table)."""
         user = User.by_id(user_id)
         if not user: return 'User not found', 404
-        profiles = Profile.get_list(
-            "SELECT * FROM profile WHERE skool_id = ? ORDER BY fetched_at DESC LIMIT 1",
+        rows = Model.query(
+            "SELECT group_slug AS slug, display_name AS name FROM profile_group WHERE skool_id = ? ORDER BY rowid",
             [user.skool_id]
         )
-        if not profiles:
-            return jsonify([])
-        profile = profiles[0]
-        groups = json.loads(profile.groups_member_of) if profile.groups_member_of else []
-        result = []
-        for g in groups:
-            slug = g.get('name', '')
-            meta = g.get('metadata', {})
-            display_name = meta.get('displayName', '') or slug
-            if slug:
-                result.append({'slug': slug, 'name': display_name})
-        return jsonify(result)
+        return jsonify(rows)
 
     @app.route('/api/user/<int:user_id>/liked-posts')
     def get_user_liked_posts(user_id):
@@ -110,8 +243,7 @@ def register(app):
             batch = post_ids[i:i + batch_size]
             placeholders = ','.join(['?'] * len(batch))
             posts.extend(Post.get_list(
-                f"""SELECT * FROM post WHERE skool_id IN ({placeholders})
-                    AND id IN (SELECT MAX(id) FROM post GROUP BY skool_id)""",
+                f"SELECT * FROM post_current WHERE skool_id IN ({placeholders})",
                 batch
             ))
         posts.sort(key=lambda p: p.id, reverse=True)
@@ -122,117 +254,187 @@ def register(app):
     @app.route('/api/post/latest')
     def get_posts_latest():
         """Get latest post per skool_id (deduplicated)."""
-        posts = Post.get_list(
-            """SELECT * FROM post WHERE id IN (
-                SELECT MAX(id) FROM post GROUP BY skool_id
-            ) ORDER BY id DESC"""
-        )
+        posts = Post.get_list("SELECT * FROM post_current ORDER BY id DESC")
         return jsonify([p.to_dict() for p in posts])
 
+    @app.route('/api/post/search')
+    def search_posts():
+        """
+        Volltextsuche über Titel, Inhalt und Autor (post_fts), nach Relevanz sortiert.
+        ?q=term&community=slug&toplevel=1&limit=50 - community default: current_community, 'all' = alle.
+        """
+        community = request.args.get('community', '')
+        if not community:
+            c = ConfigEntry.getByKey('current_community')
+            community = c.value if c else ''
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+        rows = search.search_posts(request.args.get('q', ''), '' if community == 'all' else community,
+                                   request.args.get('toplevel') in ('1', 'true'), limit)
+        return jsonify(rows)
+
+    @app.route('/api/post/filter', methods=['POST'])
+    def filter_posts():
+        """
+        Posts filtern wie /api/user/filter (include/exclude, searchTerm, sortBy), immer seitenweise.
+        Body: {communitySlug, include, exclude, searchTerm, sortBy, limit=100, cursor} -> {items, total, next_cursor}.
+        """
+        data = request.json or {}
+        if not data.get('communitySlug'):
+            community = ConfigEntry.getByKey('current_community')
+            data['communitySlug'] = community.value if community else ''
+        try:
+            limit = _bounded_int(data, 'limit', 100, 1, 1000)
+            posts, total, next_cursor = Post.filtered_page(PostFilter(data), limit, data.get('cursor') or '')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'items': [p.to_dict() for p in posts], 'total': total, 'next_cursor': next_cursor})
+
     @app.route('/api/post/by-users', methods=['POST'])
     def get_posts_by_users():
-        """Get posts filtered by user skool_ids (deduplicated: latest per skool_id)."""
-        skool_ids = request.json.get('skool_ids', [])
-        if not skool_ids:
-            return jsonify([])
-        posts = []
-        batch_size = 400
-        for i in range(0, len(skool_ids), batch_size):
-            batch = skool_ids[i:i + batch_size]
-            placeholders = ','.join(['?'] * len(batch))
-            posts.extend(Post.get_list(
-                f"""SELECT * FROM post WHERE user_id IN ({placeholders})
-                    AND id IN (SELECT MAX(id) FROM post GROUP BY skool_id)
-                    ORDER BY id DESC""",
-                batch
-            ))
-        posts.sort(key=lambda p: p.id, reverse=True)
+        """Get posts filtered by user skool_ids or selection handle (deduplicated: latest per skool_id)."""
+        sel = Selection.resolve(request.json)
+        if sel is None:
+            return _expired()
+        posts = Post.get_list(
+            f"SELECT p.* FROM post_current p JOIN {sel} s ON s.skool_id = p.user_id ORDER BY p.id DESC"
+        )
         return jsonify([p.to_dict() for p in posts])
 
     # === Community Routes ===
 
     @app.route('/api/shared-communities', methods=['POST'])
     def get_shared_communities():
-        """Get communities shared by given skool_ids, with user counts, sorted descending."""
-        skool_ids = request.json.get('skool_ids', [])
-        if not skool_ids:
-            return jsonify([])
-        placeholders = ','.join(['?'] * len(skool_ids))
+        """Get communities shared by given skool_ids (or selection handle), with user counts, sorted descending."""
+        sel = Selection.resolve(request.json)
+        if sel is None:
+            return _expired()
         rows = Model.query(
-            f"""SELECT community_slug, COUNT(DISTINCT skool_id) as user_count
-                FROM user
-                WHERE skool_id IN ({placeholders}) AND community_slug != ''
-                GROUP BY community_slug
-                ORDER BY user_count DESC""",
-            skool_ids
+            f"""SELECT u.community_slug, COUNT(*) as user_count
+                FROM user_current u
+                JOIN {sel} s ON s.skool_id = u.skool_id
+                WHERE u.community_slug != ''
+                GROUP BY u.community_slug
+                ORDER BY user_count DESC"""
         )
         return jsonify(rows)
 
     @app.route('/api/other-communities')
     def get_other_communities():
-        """Get all discovered communities from profile fetches, with calculated shared_user_count."""
-        profiles = Model.query("SELECT skool_id, groups_member_of FROM profile WHERE groups_member_of != ''")
-        slug_users = {}
-        for p in profiles:
-            groups = json.loads(p['groups_member_of']) if p['groups_member_of'] else []
-            if not groups:
-                continue
-            for g in groups:
-                slug = g.get('name', '')
-                if slug:
-                    if slug not in slug_users:
-                        slug_users[slug] = set()
-                    slug_users[slug].add(p['skool_id'])
-        communities = OtherCommunity.get_list("SELECT * FROM othercommunity", [])
+        """Get all discovered communities from profile fetches, with calculated shared_user_count (profile_group)."""
+        rows = Model.query(
+            """SELECT c.*, (SELECT COUNT(*) FROM profile_group g WHERE g.group_slug = c.slug) AS shared_user_count
+               FROM othercommunity c
+               ORDER BY shared_user_count DESC, c.id"""
+        )
         result = []
-        for c in communities:
-            data = c.to_dict()
-            data['shared_user_count'] = len(slug_users.get(c.slug, set()))
+        for r in rows:
+            data = OtherCommunity(r).to_dict()
+            data['shared_user_count'] = r['shared_user_count']
             result.append(data)
-        result.sort(key=lambda x: -x['shared_user_count'])
         return jsonify(result)
 
+    @app.route('/api/other-communities/filter', methods=['POST'])
+    def filter_other_communities():
+        """
+        Entdeckte Communities per CommunityFilter (Mitglieder, Posts, Privacy, ... über Spalten), seitenweise.
+        Body: {include, exclude, searchTerm, sortBy, limit=100, cursor} -> {items, total, next_cursor};
+        shared_user_count nur für die Communities der Seite.
+        """
+        data = request.json or {}
+        f = CommunityFilter(data)
+        try:
+            limit = _bounded_int(data, 'limit', 100, 1, 1000)
+            rows, next_cursor = f.fetch_page('othercommunity', limit, data.get('cursor') or '')
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        count_sql, count_args = f.to_count_sql('othercommunity')
+        total = FilterCache.get('community_count', f, lambda: Model.query(count_sql, count_args)[0]['c'])
+        shared = {}
+        if rows:
+            placeholders = ','.join(['?'] * len(rows))
+            shared = {r['slug']: r['c'] for r in Model.query(
+                f"""SELECT group_slug AS slug, COUNT(*) AS c FROM profile_group
+                    WHERE group_slug IN ({placeholders}) GROUP BY group_slug""",
+                [r['slug'] for r in rows]
+            )}
+        items = []
+        for r in rows:
+            item = OtherCommunity(r).to_dict()
+            item.pop('about_data', None)
+            item['shared_user_count'] = shared.get(r['slug'], 0)
+            items.append(item)
+        return jsonify({'items': items, 'total': total, 'next_cursor': next_cursor})
+
     @app.route('/api/communities/by-users', methods=['POST'])
     def get_communities_by_users():
         """Get OtherCommunities where selected users are members, with selection and global count."""
-        skool_ids = request.json.get('skool_ids', [])
-        if not skool_ids:
-            return jsonify([])
-        all_profiles = Model.query("SELECT skool_id, groups_member_of FROM profile WHERE groups_member_of != ''")
-        global_slug_users = {}
-        for p in all_profiles:
-            groups = json.loads(p['groups_member_of']) if p['groups_member_of'] else []
-            if not groups:
-                continue
-            for g in groups:
-                slug = g.get('name', '')
-                if slug:
-                    if slug not in global_slug_users:
-                        global_slug_users[slug] = set()
-                    global_slug_users[slug].add(p['skool_id'])
-        skool_ids_set = set(skool_ids)
-        selection_counts = {}
-        for slug, users in global_slug_users.items():
-            count = len(users & skool_ids_set)
-            if count > 0:
-                selection_counts[slug] = count
-        if not selection_counts:
+        sel = Selection.resolve(request.json)
+        if sel is None:
+            return _expired()
+        # Schnittmengen über den Bitmap-Index (profile_group, neuestes Profil pro User)
+        bitmap = membership_bitmap.index()
+        counts = bitmap.selection_counts(_selection_mask(bitmap, sel))
+        if not counts:
             return jsonify([])
-        communities = []
-        slugs = list(selection_counts.keys())
-        batch_size = 400
-        for i in range(0, len(slugs), batch_size):
-            batch = slugs[i:i + batch_size]
-            placeholders = ','.join(['?'] * len(batch))
-            communities.extend(OtherCommunity.get_list(
-                f"SELECT * FROM othercommunity WHERE slug IN ({placeholders})",
-                batch
-            ))
+        slugs = list(counts)
+        rows = []
+        for i in range(0, len(slugs), 500):
+            batch = slugs[i:i + 500]
+            rows += Model.query(
+                f"SELECT * FROM othercommunity WHERE slug IN ({','.join(['?'] * len(batch))})", batch)
+        rows.sort(key=lambda r: (-counts[r['slug']][0], -counts[r['slug']][1], r['id']))
         result = []
-        for c in communities:
-            data = c.to_dict()
-            data['selection_count'] = selection_counts.get(c.slug, 0)
-            data['shared_user_count'] = len(global_slug_users.get(c.slug, set()))
+        for r in rows:
+            data = OtherCommunity(r).to_dict()
+            data['selection_count'], data['shared_user_count'] = counts[r['slug']]
             result.append(data)
-        result.sort(key=lambda x: (-x['selection_count'], -x['shared_user_count']))
         return jsonify(result)
+
+    @app.route('/api/communities/overlap', methods=['POST'])
+    def get_communities_overlap():
+        """
+        Schnittmengen-Matrix der Communities (Mitglieder laut profile_group).
+        Body: {slugs, selection | skool_ids (optional, nur innerhalb der Selektion)}
+        -> {slugs, sizes, overlap} mit overlap[i][j] = gemeinsame Mitglieder, sizes = Diagonale.
+        """
+        data = request.json or {}
+        slugs = [s for s in data.get('slugs') or [] if s]
+        if len(slugs) > 500:
+            return jsonify({'error': 'too many slugs (max 500)'}), 400
+        bitmap = membership_bitmap.index()
+        mask = None
+        if data.get('selection') or data.get('skool_ids'):
+            sel = Selection.resolve(data)
+            if sel is None:
+                return _expired()
+            mask = _selection_mask(bitmap, sel)
+        matrix = bitmap.overlap(slugs, mask)
+        return jsonify({'slugs': slugs, 'sizes': [matrix[i][i] for i in range(len(slugs))], 'overlap': matrix})
+
+    @app.route('/api/communities/similar', methods=['POST'])
+    def get_similar_communities():
+        """
+        Ähnlichste Communities zu slug nach Jaccard der Mitgliedermengen (profile_group).
+        Body: {slug, k=10, selection | skool_ids (optional)} -> [{slug, jaccard, shared, name, ...}],
+        Kandidaten sind die Communities in othercommunity.
+        """
+        data = request.json or {}
+        if not data.get('slug'):
+            return jsonify({'error': 'slug required'}), 400
+        try:
+            k = _bounded_int(data, 'k', 10, 1, 500)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        bitmap = membership_bitmap.index()
+        mask = None
+        if data.get('selection') or data.get('skool_ids'):
+            sel = Selection.resolve(data)
+            if sel is None:
+                return _expired()
+            mask = _selection_mask(bitmap, sel)
+        # nur entdeckte Communities (othercommunity) -> jedes Item hat deren Felder (name, ...)
+        known = {}
+        for r in Model.query("SELECT * FROM othercommunity ORDER BY id"):
+            known.setdefault(r['slug'], OtherCommunity(r).to_dict())
+        top = bitmap.similar(data['slug'], k, mask, set(known))
+        return jsonify([{**known[t['slug']], **t} for t in top])
@@ -1,5 +1,6 @@
 from flask import jsonify, request
 from model import Model
+from src import activity_rollup, current_state, data_version, graph_layout, graph_metrics, interaction_edges, membership, membership_bitmap, profile_group, table_stats
 
 
 def register(app):
@@ -8,7 +9,9 @@ def register(app):
     @app.route('/api/test/reset', methods=['POST'])
     def test_reset():
         """Clear all data from the database. Used for test setup."""
-        tables = ['user', 'post', 'fetch', 'like', 'profile', 'othercommunity', 'leaderboard']
+        tables = ['user', 'post', 'fetch', 'like', 'profile', 'othercommunity', 'leaderboard',
+                  'user_current', 'post_current', 'membership_status', 'interaction_edge', 'graph_metric',
+                  'activity_day', 'activity_hour', 'profile_group']
         conn = Model.connect()
         for table in tables:
             try:
@@ -16,6 +19,17 @@ def register(app):
             except Exception:
                 pass  # Table might not exist
         conn.commit()
+        from src.fetch_pacing import FetchPacer
+        from src.selection import Selection
+        from src.filter_cache import FilterCache
+        FetchPacer.reset()
+        Selection.reset()
+        FilterCache.reset()
+        graph_metrics.reset()
+        graph_layout.reset()
+        membership_bitmap.reset()
+        table_stats.reset()
+        data_version.bump()
         return jsonify({'status': 'ok', 'cleared': tables})
 
     @app.route('/api/test/bulk-users', methods=['POST'])
@@ -29,7 +43,13 @@ def register(app):
             u = User(data)
             u.save()
             created.append(u.id)
+        if created:
+            current_state.sync_ids('user_current', created[0], created[-1])
+            activity_rollup.sync_user_ids(created[0], created[-1])
+        for slug in {u.get('community_slug', '') for u in users}:
+            membership.update(slug, force=True)
         Model.end_batch()
+        data_version.bump()
         return jsonify({'status': 'ok', 'created': len(created), 'ids': created})
 
     @app.route('/api/test/bulk-posts', methods=['POST'])
@@ -43,7 +63,12 @@ def register(app):
             p = Post(data)
             p.save()
             created.append(p.id)
+        if created:
+            current_state.sync_ids('post_current', created[0], created[-1])
+            interaction_edges.sync_post_ids(created[0], created[-1])
+            activity_rollup.sync_post_ids(created[0], created[-1])
         Model.end_batch()
+        data_version.bump()
         return jsonify({'status': 'ok', 'created': len(created), 'ids': created})
 
     @app.route('/api/test/bulk-likes', methods=['POST'])
@@ -57,7 +82,11 @@ def register(app):
             lk = Like(data)
             lk.save()
             created.append(lk.id)
+        if created:
+            interaction_edges.sync_like_ids(created[0], created[-1])
+            activity_rollup.sync_like_ids(created[0], created[-1])
         Model.end_batch()
+        data_version.bump()
         return jsonify({'status': 'ok', 'created': len(created), 'ids': created})
 
     @app.route('/api/test/bulk-profiles', methods=['POST'])
@@ -71,7 +100,10 @@ def register(app):
             p = Profile(data)
             p.save()
             created.append(p.id)
+        if created:
+            profile_group.sync_ids(created[0], created[-1])
         Model.end_batch()
+        data_version.bump()
         return jsonify({'status': 'ok', 'created': len(created), 'ids': created})
 
     @app.route('/api/test/bulk-fetches', methods=['POST'])
@@ -85,9 +117,23 @@ def register(app):
             f = Fetch(data)
             f.save()
             created.append(f.id)
+        for slug in {f.get('community_slug', '') for f in fetches}:
+            membership.update(slug, force=True)
         Model.end_batch()
+        data_version.bump()
         return jsonify({'status': 'ok', 'created': len(created), 'ids': created})
 
+    @app.route('/api/test/age-fetches', methods=['POST'])
+    def test_age_fetches():
+        """Shift created_at of all fetches into the past (simulates stale fetches)."""
+        hours = int(request.json.get('hours', 0))
+        conn = Model.connect()
+        cur = conn.execute("UPDATE fetch SET created_at = created_at - ?", [hours * 3600])
+        membership.rebuild(commit=False)
+        conn.commit()
+        data_version.bump()
+        return jsonify({'status': 'ok', 'updated': cur.rowcount})
+
     @app.route('/api/test/set-community', methods=['POST'])
     def test_set_community():
         """Set the current community for testing."""
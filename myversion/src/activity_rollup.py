@@ -0,0 +1,198 @@
+"""
+Aktivitäts-Rollups für /api/activity/community und /api/activity/members, inkrementell gepflegt statt
+pro Request über post/user aggregiert.
+
+    activity_day(community_slug, day, posts, comments, joins, likes)
+        day 'YYYY-MM-DD' (UTC). posts/comments aus post_current nach skool_created_at, joins aus
+        user_current nach member_created_at, likes = (Post, User)-Paare auf Posts, die an dem Tag
+        erstellt wurden (likes haben keinen eigenen Zeitstempel, fetched_at ist die Extraktion)
+    activity_hour(community_slug, skool_id, dow, hour, cnt)
+        Posts + Comments (post_current) pro Autor nach Wochentag (strftime %w, 0 = Sonntag) und Stunde
+
+Gepflegt pro Schlüssel wie src/interaction_edges.py: refresh_days() / refresh_users() rechnen die
+betroffenen Tage bzw. Autoren neu (über die Indexe auf post_current/user_current), betroffen sind die
+Tage und Autoren der Rows eines Fetches, bei likes der Tag des gelikten Posts.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Set
+
+from model import Model
+
+DAY_TABLE = 'activity_day'
+HOUR_TABLE = 'activity_hour'
+CHUNK = 500  # SQLite-Variablenlimit
+COUNTS = ('posts', 'comments', 'joins', 'likes')
+
+
+def ensure_tables() -> None:
+    """Legt Tabellen + Indexe an (nach current_state.ensure_tables). Neu angelegt -> aus dem Bestand füllen."""
+    conn = Model.connect()
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [DAY_TABLE]).fetchone()
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {DAY_TABLE} (
+        community_slug TEXT, day TEXT, posts INTEGER DEFAULT 0, comments INTEGER DEFAULT 0,
+        joins INTEGER DEFAULT 0, likes INTEGER DEFAULT 0,
+        PRIMARY KEY (community_slug, day)) WITHOUT ROWID""")
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {HOUR_TABLE} (
+        community_slug TEXT, skool_id TEXT, dow INTEGER, hour INTEGER, cnt INTEGER DEFAULT 0,
+        PRIMARY KEY (skool_id, community_slug, dow, hour)) WITHOUT ROWID""")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_user_current_member_created_at "
+                 "ON user_current (community_slug, member_created_at)")
+    if not exists:
+        rebuild(commit=False)
+    conn.commit()
+
+
+def _epoch(day: str) -> int:
+    return int(datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp())
+
+
+def _next_day(day: str) -> str:
+    return (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+
+
+def refresh_days(community_slug: str, days: Iterable[str]) -> None:
+    """activity_day der Community für days neu berechnen (ohne Commit). Eine Range-Query pro Kennzahl."""
+    days = sorted({d for d in days if d})
+    if not days:
+        return
+    first, end = days[0], _next_day(days[-1])
+    wanted: Set[str] = set(days)
+    counts: Dict[str, Dict[str, int]] = {d: dict.fromkeys(COUNTS, 0) for d in days}
+
+    def collect(name: str, rows: List[dict]) -> None:
+        for r in rows:
+            if r['day'] in wanted:
+                counts[r['day']][name] = r['cnt']
+
+    # skool_created_at ist ISO ('YYYY-MM-DDTHH:MM:SSZ') -> Tagesgrenzen als String-Range auf dem Index
+    for name, toplevel in (('posts', 1), ('comments', 0)):
+        collect(name, Model.query(
+            """SELECT DATE(skool_created_at) AS day, COUNT(*) AS cnt FROM post_current
+               WHERE community_slug = ? AND skool_created_at >= ? AND skool_created_at < ? AND is_toplevel = ?
+               GROUP BY day""", [community_slug, first, end, toplevel]))
+    collect('joins', Model.query(
+        """SELECT DATE(member_created_at, 'unixepoch') AS day, COUNT(*) AS cnt FROM user_current
+           WHERE community_slug = ? AND member_created_at >= ? AND member_created_at < ?
+           GROUP BY day""", [community_slug, _epoch(first), _epoch(end)]))
+    collect('likes', Model.query(
+        """SELECT day, COUNT(*) AS cnt FROM (
+               SELECT DISTINCT DATE(p.skool_created_at) AS day, l.post_skool_id, l.user_skool_id
+               FROM post_current p JOIN like l ON l.post_skool_id = p.skool_id
+               WHERE p.community_slug = ? AND p.skool_created_at >= ? AND p.skool_created_at < ?)
+           GROUP BY day""", [community_slug, first, end]))
+
+    conn = Model.connect()
+    for i in range(0, len(days), CHUNK):
+        batch = days[i:i + CHUNK]
+        conn.execute(f"DELETE FROM {DAY_TABLE} WHERE community_slug = ? AND day IN ({','.join(['?'] * len(batch))})",
+                     [community_slug] + batch)
+    conn.executemany(
+        f"INSERT INTO {DAY_TABLE} (community_slug, day, {', '.join(COUNTS)}) VALUES (?, ?, ?, ?, ?, ?)",
+        [[community_slug, d] + [c[n] for n in COUNTS] for d, c in counts.items() if any(c.values())])
+
+
+def refresh_users(community_slug: str, skool_ids: Iterable[str]) -> None:
+    """activity_hour der Community für die Autoren skool_ids neu berechnen (ohne Commit)."""
+    conn = Model.connect()
+    ids = sorted({s for s in skool_ids if s})
+    for i in range(0, len(ids), CHUNK):
+        batch = ids[i:i + CHUNK]
+        placeholders = ','.join(['?'] * len(batch))
+        conn.execute(f"DELETE FROM {HOUR_TABLE} WHERE skool_id IN ({placeholders}) AND community_slug = ?",
+                     batch + [community_slug])
+        conn.execute(
+            f"""INSERT INTO {HOUR_TABLE} (community_slug, skool_id, dow, hour, cnt)
+                SELECT community_slug, user_id, CAST(strftime('%w', skool_created_at) AS INTEGER) AS dow,
+                       CAST(strftime('%H', skool_created_at) AS INTEGER) AS hour, COUNT(*)
+                FROM post_current
+                WHERE user_id IN ({placeholders}) AND community_slug = ? AND skool_created_at != ''
+                GROUP BY user_id, dow, hour HAVING dow IS NOT NULL AND hour IS NOT NULL""",
+            batch + [community_slug]
+        )
+
+
+def _refresh(day_rows: List[dict], user_rows: List[dict] = ()) -> None:
+    """day_rows: [{community_slug, day}], user_rows: [{community_slug, skool_id}] -> refresh pro Community."""
+    days, users = {}, {}
+    for r in day_rows:
+        days.setdefault(r['community_slug'], set()).add(r['day'])
+    for r in user_rows:
+        users.setdefault(r['community_slug'], set()).add(r['skool_id'])
+    for slug, values in days.items():
+        refresh_days(slug, values)
+    for slug, values in users.items():
+        refresh_users(slug, values)
+
+
+def _sync_posts(where: str, args: list) -> None:
+    _refresh(
+        Model.query(f"SELECT DISTINCT community_slug, DATE(skool_created_at) AS day FROM post WHERE {where}", args),
+        Model.query(f"SELECT DISTINCT community_slug, user_id AS skool_id FROM post WHERE {where}", args))
+
+
+def _sync_users(where: str, args: list) -> None:
+    _refresh(Model.query(
+        f"""SELECT DISTINCT community_slug, DATE(member_created_at, 'unixepoch') AS day FROM user
+            WHERE {where} AND member_created_at > 0""", args))
+
+
+def _sync_likes(where: str, args: list) -> None:
+    """where über post_current p (die gelikten Posts)."""
+    _refresh(Model.query(
+        f"SELECT DISTINCT p.community_slug, DATE(p.skool_created_at) AS day FROM post_current p WHERE {where}", args))
+
+
+def sync_fetch(fetch) -> None:
+    """Nach der Extraktion eines members/posts/comments/likes-Fetches (ohne Commit)."""
+    if fetch.type == 'members':
+        _sync_users("fetch_id = ?", [fetch.id])
+    elif fetch.type in ('posts', 'comments'):
+        _sync_posts("fetch_id = ?", [fetch.id])
+    elif fetch.type == 'likes':
+        _sync_likes("p.skool_id = ?", [fetch.post_skool_id])
+
+
+def sync_user_ids(first_id: int, last_id: int) -> None:
+    """Nach direkt eingefügten user-Rows mit id in [first_id, last_id] (Test-/Bulk-Endpoints)."""
+    _sync_users("id BETWEEN ? AND ?", [first_id, last_id])
+
+
+def sync_post_ids(first_id: int, last_id: int) -> None:
+    """Nach direkt eingefügten post-Rows mit id in [first_id, last_id] (Test-/Bulk-Endpoints)."""
+    _sync_posts("id BETWEEN ? AND ?", [first_id, last_id])
+
+
+def sync_like_ids(first_id: int, last_id: int) -> None:
+    """Nach direkt eingefügten like-Rows mit id in [first_id, last_id] (Test-/Bulk-Endpoints)."""
+    _sync_likes("p.skool_id IN (SELECT post_skool_id FROM like WHERE id BETWEEN ? AND ?)", [first_id, last_id])
+
+
+def rebuild(commit: bool = True) -> None:
+    """Komplett neu aus post_current/user_current/like."""
+    conn = Model.connect()
+    conn.execute(f"DELETE FROM {DAY_TABLE}")
+    conn.execute(f"DELETE FROM {HOUR_TABLE}")
+    _refresh(
+        Model.query("""SELECT DISTINCT community_slug, DATE(skool_created_at) AS day FROM post_current
+                       WHERE skool_created_at != ''
+                       UNION
+                       SELECT DISTINCT community_slug, DATE(member_created_at, 'unixepoch') AS day FROM user_current
+                       WHERE member_created_at > 0"""),
+        Model.query("SELECT DISTINCT community_slug, user_id AS skool_id FROM post_current"))
+    if commit:
+        conn.commit()
+
+
+def community_days(community_slug: str, days: int) -> Dict[str, dict]:
+    """{day: {posts, comments, joins, likes}} der letzten days Tage (Range-Read auf dem Primärschlüssel)."""
+    rows = Model.query(
+        f"SELECT day, {', '.join(COUNTS)} FROM {DAY_TABLE} WHERE community_slug = ? AND day >= DATE('now', ?)",
+        [community_slug, f'-{days} days'])
+    return {r.pop('day'): r for r in rows}
+
+
+def hour_matrix(selection_table: str) -> List[dict]:
+    """[{dow, hour, cnt}] summiert über die User der Selektion (Selection.table(), Spalte skool_id)."""
+    return Model.query(
+        f"""SELECT a.dow, a.hour, SUM(a.cnt) AS cnt FROM {HOUR_TABLE} a
+            JOIN {selection_table} s ON s.skool_id = a.skool_id GROUP BY a.dow, a.hour""")
@@ -0,0 +1,157 @@
+"""
+Spaltenorientierter Export der Analyse-Tabellen als Parquet (bzw. Arrow IPC) für pandas/Notebooks.
+
+    python -m src.columnar_export --db app.db --out export/                  (aus myversion/)
+    python -m src.columnar_export --db app.db --out export/ --tables post_current,like --format arrow
+    GET /api/export/columnar/<table>?format=parquet
+
+Typen kommen aus den Model-Annotationen (int -> int64, str -> string). Zusätzlich pro Tabelle:
+    - Epoch-Spalten (*_ts, Sekunden UTC) für die ISO-Strings von Skool (skool_created_at, ...)
+    - dekodierte metadata-Felder (DECODED), die rohen JSON-Spalten (RAW_JSON) nur mit raw=True
+Geschrieben wird in Row Groups/Record Batches zu ROW_GROUP_SIZE Rows direkt aus dem Cursor.
+
+pyarrow ist optional (tests/requirements.txt, nicht im Nuitka-Build): ohne pyarrow.parquet wird Arrow IPC (.arrow, Feather v2) geschrieben,
+ohne pyarrow wirft export_table ColumnarUnavailable.
+"""
+import argparse
+import os
+from typing import BinaryIO, List, Tuple
+
+try:
+    import pyarrow  # optional, nur für diesen Export
+except ImportError:
+    pyarrow = None
+try:
+    import pyarrow.parquet as parquet
+except ImportError:
+    parquet = None
+
+from model import Model
+from src.leaderboard import Leaderboard
+from src.like import Like
+from src.post import Post
+from src.profile import Profile
+from src.user import User
+
+ROW_GROUP_SIZE = 50_000
+
+# Tabelle -> Model (für Spalten und Typen); *_current haben dieselben Spalten wie die Verlaufstabelle
+TABLES = {
+    'user_current': User, 'post_current': Post,
+    'user': User, 'post': Post, 'like': Like, 'leaderboard': Leaderboard, 'profile': Profile,
+}
+
+# ISO-Strings -> zusätzliche Epoch-Spalte <name>_ts
+ISO_COLUMNS = ('skool_created_at', 'skool_updated_at')
+
+# Tabelle -> {Spalte: (JSON-Spalte, Pfad)}; bio ist schon eine eigene Spalte
+_PROFILE_FIELDS = {'location': ('metadata', '$.location'), 'link_website': ('metadata', '$.linkWebsite'),
+                   'link_linkedin': ('metadata', '$.linkLinkedin'), 'link_youtube': ('metadata', '$.linkYoutube')}
+_USER = {**_PROFILE_FIELDS,
+         'request_location': ('member_metadata', '$.requestLocation'),
+         'approved_by': ('member_metadata', '$.approvedBy')}
+_POST = {'title': ('metadata', '$.title'), 'content': ('metadata', '$.content'),
+         'pinned': ('metadata', '$.pinned')}
+DECODED = {
+    'user_current': _USER, 'user': _USER, 'post_current': _POST, 'post': _POST,
+    'profile': {**_PROFILE_FIELDS, 'request_location': ('member_metadata', '$.requestLocation')},
+}
+
+# Rohe JSON-Spalten, die durch DECODED ersetzt werden (raw=True exportiert sie trotzdem)
+RAW_JSON = ('metadata', 'user_metadata', 'member_metadata')
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+class ColumnarUnavailable(RuntimeError):
+    pass
+
+
+def _columns(table: str, raw: bool) -> List[Tuple[str, str, str]]:
+    """[(Name, SQL-Ausdruck, 'int'|'str')] für den Export von table."""
+    props = Model._props(TABLES[table])
+    # CAST: alte Rows können '' in INTEGER-Spalten haben (SQLite-Affinität), Arrow braucht echte ints
+    cols = [(n, f'CAST("{n}" AS INTEGER)' if t == 'INTEGER' else f'"{n}"', 'int' if t == 'INTEGER' else 'str')
+            for n, t in props.items() if raw or n not in RAW_JSON]
+    cols += [(f'{n}_ts', f"CAST(strftime('%s', NULLIF({n}, '')) AS INTEGER)", 'int')
+             for n in ISO_COLUMNS if n in props]
+    for name, (source, path) in DECODED.get(table, {}).items():
+        cols.append((name, f"CASE WHEN json_valid({source}) THEN CAST(json_extract({source}, '{path}') AS TEXT) END",
+                     'str'))
+    return cols
+
+
+def resolve_format(fmt: str = 'parquet') -> str:
+    """Tatsächliches Format: parquet fällt ohne pyarrow.parquet auf arrow zurück. Wirft ColumnarUnavailable."""
+    if pyarrow is None:
+        raise ColumnarUnavailable('columnar export requires the pyarrow package')
+    if fmt not in FORMATS:
+        raise ValueError(f'unknown format: {fmt}')
+    return fmt if fmt != 'parquet' or parquet is not None else 'arrow'
+
+
+def export_table(table: str, sink: BinaryIO, fmt: str = 'parquet', raw: bool = False) -> int:
+    """
+    Schreibt table nach sink (Datei oder Buffer) in Row Groups zu ROW_GROUP_SIZE, returns Anzahl Rows.
+    fmt vorher per resolve_format() bestimmen. Wirft ColumnarUnavailable / ValueError.
+    """
+    if table not in TABLES:
+        raise ValueError(f'unknown table: {table}')
+    fmt = resolve_format(fmt)
+    cols = _columns(table, raw)
+    schema = pyarrow.schema([(n, pyarrow.int64() if t == 'int' else pyarrow.string()) for n, _, t in cols])
+    select = ', '.join(f'{e} AS {n}' for n, e, _ in cols)
+    cur = Model.connect().execute(f'SELECT {select} FROM "{table}" ORDER BY id')
+    if fmt == 'parquet':
+        writer = parquet.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        writer = pyarrow.ipc.new_file(sink, schema)
+    total = 0
+    try:
+        while True:
+            rows = cur.fetchmany(ROW_GROUP_SIZE)
+            if not rows:
+                break
+            arrays = [pyarrow.array([r[n] for r in rows], type=schema.field(n).type) for n, _, _ in cols]
+            batch = pyarrow.RecordBatch.from_arrays(arrays, schema=schema)
+            if fmt == 'parquet':
+                writer.write_table(pyarrow.Table.from_batches([batch]), row_group_size=ROW_GROUP_SIZE)
+            else:
+                writer.write_batch(batch)
+            total += len(rows)
+    finally:
+        writer.close()
+    return total
+
+
+def export_all(out_dir: str, tables: List[str] = None, fmt: str = 'parquet', raw: bool = False) -> dict:
+    """Alle (bzw. die angegebenen) Tabellen nach out_dir/<table>.<ext>. Returns {table: rows}."""
+    fmt = resolve_format(fmt)
+    unknown = [t for t in tables or [] if t not in TABLES]
+    if unknown:
+        raise ValueError(f"unknown tables: {', '.join(unknown)}")
+    os.makedirs(out_dir, exist_ok=True)
+    result = {}
+    for table in tables or list(TABLES):
+        with open(os.path.join(out_dir, table + FORMATS[fmt]), 'wb') as f:
+            result[table] = export_table(table, f, fmt, raw)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export der Analyse-Tabellen als Parquet/Arrow')
+    parser.add_argument('--db', default='app.db')
+    parser.add_argument('--out', default='export')
+    parser.add_argument('--tables', help=f'komma-getrennt, default: {",".join(TABLES)}')
+    parser.add_argument('--format', choices=list(FORMATS), default='parquet')
+    parser.add_argument('--raw', action='store_true', help='rohe metadata-JSON-Spalten mit exportieren')
+    args = parser.parse_args()
+
+    Model.connect(args.db)
+    tables = [t.strip() for t in args.tables.split(',')] if args.tables else None
+    for table, rows in export_all(args.out, tables, args.format, args.raw).items():
+        print(f'{table}: {rows} rows')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,74 @@
-class CommunityFilter:
-    endpoints = {}
\ No newline at end of file
+import time
+from typing import Dict, List, Tuple
+
+from src.sql_filter import SqlFilter
+
+
+class CommunityFilter(SqlFilter):
+    """
+    Filter über othercommunity (entdeckte Communities) mit den aus der About-Page extrahierten Spalten.
+
+    Keys: members_min / members_max, posts_min / posts_max, online_min, courses_min,
+    privacy ('public' / 'private'), is_paid, about_fetched, created_since (Tage, Gründung der Community).
+    Suche per LIKE über name, slug und description.
+    """
+    DEFAULT_SORT = 'members_desc'
+    CURRENT_TABLE = 'othercommunity'
+    LIKE_COLUMNS = ('name', 'slug', 'description')
+    USE_COMMUNITY = False
+
+    SORT_COLUMNS = {
+        'members_desc': ('total_members', 'DESC'),
+        'members_asc': ('total_members', 'ASC'),
+        'posts_desc': ('total_posts', 'DESC'),
+        'online_desc': ('total_online_members', 'DESC'),
+        'newest': ('group_created_at', 'DESC'),
+        'oldest': ('group_created_at', 'ASC'),
+        'name_asc': ('name', 'ASC'),
+        'name_desc': ('name', 'DESC'),
+    }
+
+    # Range-Keys -> Spalte
+    RANGES = {
+        'members': 'total_members',
+        'posts': 'total_posts',
+        'online': 'total_online_members',
+        'courses': 'num_courses',
+    }
+
+    def _build_conditions(self, filters: Dict, negate: bool = False) -> Tuple[List[str], List]:
+        """Build SQL conditions from filter dict. If negate=True, conditions are inverted."""
+        conditions = []
+        args = []
+        now = int(time.time())
+        day_seconds = 86400
+
+        for key, val in filters.items():
+            if val is None or val == '' or val == -1 or val == '-1':
+                continue
+
+            name, _, bound = key.rpartition('_')
+            if name in self.RANGES and bound in ('min', 'max'):
+                column = self.RANGES[name]
+                if bound == 'min':
+                    conditions.append(f"{column} < ?" if negate else f"{column} >= ?")
+                else:
+                    conditions.append(f"{column} > ?" if negate else f"{column} <= ?")
+                args.append(int(val))
+
+            elif key == 'privacy':
+                private = val == 'private' or val == 1 or val == '1'
+                conditions.append("privacy = ?")
+                args.append(int(private != negate))
+
+            elif key in ('is_paid', 'about_fetched'):
+                flag = val is True or val == 'true' or val == 1 or val == '1'
+                conditions.append(f"{key} = ?")
+                args.append(int(flag != negate))
+
+            elif key == 'created_since':
+                threshold = now - int(val) * day_seconds
+                conditions.append("group_created_at < ?" if negate else "group_created_at >= ?")
+                args.append(threshold)
+
+        return conditions, args
@@ -0,0 +1,126 @@
+"""
+Materialisierter aktueller Stand: user_current / post_current.
+user und post speichern einen Snapshot pro Fetch (Verlauf). Die meisten Lesepfade wollen aber nur
+den neuesten Snapshot - statt ROW_NUMBER()/MAX(id) über den ganzen Verlauf hält der Extractor
+diese Tabellen per Upsert aktuell.
+
+    user_current: ein Row pro (community_slug, skool_id), neuester nach (fetched_at, id)
+    post_current: ein Row pro skool_id, neuester nach id
+
+Spalten = Spalten von User/Post, id = id des Snapshots in user/post.
+"""
+from model import Model
+from .user import User
+from .post import Post
+
+# table -> (Quelltabelle, Model, Key-Spalten, "ist neuer"-Bedingung für das Upsert)
+TABLES = {
+    'user_current': ('user', User, ('community_slug', 'skool_id'),
+                     'excluded.fetched_at > user_current.fetched_at OR '
+                     '(excluded.fetched_at = user_current.fetched_at AND excluded.id > user_current.id)'),
+    'post_current': ('post', Post, ('skool_id',), 'excluded.id > post_current.id'),
+}
+
+# Ordnung für den Rebuild aus dem Verlauf, passend zur Upsert-Bedingung
+_LATEST_ORDER = {'user_current': 'fetched_at DESC, id DESC', 'post_current': 'id DESC'}
+
+
+def _columns(table: str) -> list[str]:
+    return list(Model._props(TABLES[table][1]))
+
+
+def ensure_tables() -> None:
+    """Legt die Tabellen an (nach den Model-Tabellen aufrufen). Neu angelegt oder neue Spalten -> Rebuild."""
+    conn = Model.connect()
+    for table, (source, model, keys, _) in TABLES.items():
+        props = Model._props(model)
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [table]).fetchone()
+        changed = not exists
+        cols = [f"{n} {t}" for n, t in props.items()]
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(cols)}, PRIMARY KEY ({', '.join(keys)}))")
+        have = {r['name'] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+        for name, typ in props.items():
+            if name not in have:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {typ}")
+                changed = True
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_id ON {table} (id)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_fetch ON {table} (fetch_id)")
+        if changed:
+            rebuild(table, commit=False)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_post_current_user ON post_current (user_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_post_current_root ON post_current (root_id)")
+    # PostFilter: Community + Sortspalte (Keyset-Seiten), label als Gleichheitsfilter
+    for column in ('skool_created_at', 'upvotes', 'comments', 'label_id'):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_post_current_{column} ON post_current (community_slug, {column})")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_user_fetch ON user (fetch_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_post_fetch ON post (fetch_id)")
+    conn.commit()
+
+
+def _upsert(table: str, where: str, args: list) -> int:
+    """Übernimmt alle Snapshots aus der Quelltabelle, die where erfüllen, falls sie neuer sind."""
+    source, _, keys, newer = TABLES[table]
+    cols = _columns(table)
+    col_list = ', '.join(cols)
+    updates = ', '.join(f"{c} = excluded.{c}" for c in cols if c not in keys)
+    # ORDER BY id: bei mehreren Snapshots im selben Batch gewinnt der letzte
+    cur = Model.connect().execute(
+        f"""INSERT INTO {table} ({col_list})
+            SELECT {col_list} FROM {source} WHERE {where} ORDER BY id
+            ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates} WHERE {newer}""",
+        args
+    )
+    return cur.rowcount
+
+
+def sync_fetch(table: str, fetch_id: int) -> int:
+    """Nach der Extraktion eines Fetches: seine Snapshots in den aktuellen Stand übernehmen."""
+    return _upsert(table, 'fetch_id = ?', [fetch_id])
+
+
+def sync_ids(table: str, first_id: int, last_id: int) -> int:
+    """Snapshots mit id in [first_id, last_id] übernehmen (Bulk-Inserts)."""
+    return _upsert(table, 'id BETWEEN ? AND ?', [first_id, last_id])
+
+
+def forget_fetch(table: str, fetch_id: int) -> None:
+    """
+    Nachdem die Snapshots eines Fetches gelöscht wurden (Re-Extraktion): Rows, die auf diesen Fetch
+    zeigen, aus dem verbleibenden Verlauf neu bestimmen.
+    """
+    conn = Model.connect()
+    stale = conn.execute(f"SELECT skool_id FROM {table} WHERE fetch_id = ?", [fetch_id]).fetchall()
+    if not stale:
+        return
+    conn.execute(f"DELETE FROM {table} WHERE fetch_id = ?", [fetch_id])
+    ids = sorted({r['skool_id'] for r in stale})
+    for i in range(0, len(ids), 400):
+        batch = ids[i:i + 400]
+        _rebuild_where(table, f"skool_id IN ({','.join(['?'] * len(batch))})", batch)
+
+
+def _rebuild_where(table: str, where: str, args: list) -> None:
+    source, _, keys, _ = TABLES[table]
+    cols = _columns(table)
+    col_list = ', '.join(cols)
+    updates = ', '.join(f"{c} = excluded.{c}" for c in cols if c not in keys)
+    # Upsert statt INSERT OR REPLACE: REPLACE löst keine DELETE-Trigger aus (search.py)
+    Model.connect().execute(
+        f"""INSERT INTO {table} ({col_list})
+            SELECT {col_list} FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY {', '.join(keys)} ORDER BY {_LATEST_ORDER[table]}) AS rn
+                FROM {source} WHERE {where}
+            ) WHERE rn = 1
+            ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}""",
+        args
+    )
+
+
+def rebuild(table: str = None, commit: bool = True) -> None:
+    """Komplett neu aus dem Verlauf aufbauen (eine oder alle Tabellen)."""
+    conn = Model.connect()
+    for t in [table] if table else TABLES:
+        conn.execute(f"DELETE FROM {t}")
+        _rebuild_where(t, '1=1', [])
+    if commit:
+        conn.commit()
@@ -0,0 +1,21 @@
+"""
+Prozessweiter Daten-Versionszähler.
+Alles, was extrahierte Daten ändert (Extractor, Leaderboard-Apply, Test-Endpoints), ruft bump() auf.
+Caches über diesen Daten (src/filter_cache.py) merken sich current() und verwerfen ihre Einträge,
+sobald sich die Version geändert hat.
+"""
+import threading
+
+_lock = threading.Lock()
+_version = 0
+
+
+def current() -> int:
+    return _version
+
+
+def bump() -> int:
+    global _version
+    with _lock:
+        _version += 1
+        return _version
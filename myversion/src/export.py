@@ -0,0 +1,159 @@
+"""
+Streaming-Export (/api/export/<kind>) von members, posts, comments und likes als CSV oder NDJSON,
+optional gzip-komprimiert.
+
+Die Rows kommen per fetchmany(BATCH_SIZE) direkt aus dem SQLite-Cursor und werden batchweise
+serialisiert und ausgeliefert - der Speicher bleibt unabhängig von der Anzahl Rows konstant und das
+erste Byte geht raus, bevor die Query durch ist. Der Cursor bleibt offen, solange der Client liest -
+das geht nur, weil app.db im WAL-Modus läuft (Model.connect): Leser sperren dort keine Schreiber. Liegt ein Member-Ergebnis schon im FilterCache,
+wird stattdessen aus der gecachten Liste geschrieben (die ist ohnehin im Speicher).
+
+    members   user_current per MembersFilter (Filter-Zustand wie /api/user/filter)
+    posts     post_current per PostFilter, nur Top-Level-Posts
+    comments  post_current per PostFilter, nur Kommentare
+    likes     like, neuester Snapshot pro (post, user) der Community
+
+columns wählt Spalten aus (Default: DEFAULT_COLUMNS), erlaubt sind die Tabellenspalten plus VIRTUAL.
+"""
+import csv
+import io
+import json
+import zlib
+from typing import Iterator, List, Tuple
+
+from model import Model
+from src.filter_cache import FilterCache
+from src.members_filter import MembersFilter
+from src.posts_filter import PostFilter
+
+BATCH_SIZE = 1000
+
+FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+TABLES = {'members': 'user_current', 'posts': 'post_current', 'comments': 'post_current', 'likes': 'like'}
+
+DEFAULT_COLUMNS = {
+    'members': ['name', 'first_name', 'last_name', 'email', 'member_role', 'points', 'member_created_at',
+                'last_active', 'community_slug', 'skool_id'],
+    'posts': ['skool_id', 'name', 'user_id', 'user_name', 'label_id', 'skool_created_at', 'upvotes', 'comments',
+              'title', 'content'],
+    'comments': ['skool_id', 'root_id', 'user_id', 'user_name', 'skool_created_at', 'upvotes', 'content'],
+    'likes': ['post_skool_id', 'user_skool_id', 'user_name', 'user_first_name', 'user_last_name',
+              'community_slug', 'fetched_at'],
+}
+
+# Zusätzliche Spalten: Name -> SQL-Ausdruck (metadata ist JSON-Text)
+_POST_JSON = "CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.{}') END"
+VIRTUAL = {
+    'posts': {'title': _POST_JSON.format('title'), 'content': _POST_JSON.format('content')},
+    'comments': {'title': _POST_JSON.format('title'), 'content': _POST_JSON.format('content')},
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+def _select(kind: str, columns: List[str]) -> str:
+    """Spaltenliste prüfen -> SELECT-Teil. Wirft ExportError bei unbekannten Spalten."""
+    table = TABLES[kind]
+    have = {r['name'] for r in Model.query(f"PRAGMA table_info({table})")}
+    virtual = VIRTUAL.get(kind, {})
+    unknown = [c for c in columns if c not in have and c not in virtual]
+    if unknown:
+        raise ExportError(f"unknown columns: {', '.join(unknown)}")
+    if not columns:
+        raise ExportError('no columns')
+    return ', '.join(f"{virtual[c]} AS {c}" if c in virtual else f'"{c}"' for c in columns)
+
+
+def _columns(kind: str, data: dict) -> List[str]:
+    columns = data.get('columns') or DEFAULT_COLUMNS[kind]
+    if isinstance(columns, str):
+        columns = [c.strip() for c in columns.split(',') if c.strip()]
+    return columns
+
+
+def _query(kind: str, f, select: str, data: dict) -> Tuple[str, List]:
+    if kind == 'members':
+        return f.to_sql('user_current', select)
+    if kind in ('posts', 'comments'):
+        return f.to_sql('post_current', select)
+    return (f"""SELECT {select} FROM "like" WHERE id IN (
+                    SELECT MAX(id) FROM "like" WHERE community_slug = ? GROUP BY post_skool_id, user_skool_id)
+                ORDER BY id""",
+            [data.get('communitySlug', '')])
+
+
+def _filter(kind: str, data: dict):
+    if kind == 'members':
+        return MembersFilter(data)
+    if kind in ('posts', 'comments'):
+        state = dict(data)
+        state['include'] = {**(data.get('include') or {}), 'is_toplevel': kind == 'posts'}
+        return PostFilter(state)
+    return None
+
+
+def stream(kind: str, data: dict, fmt: str = 'csv', compress: bool = False, header: List[str] = None) -> Iterator[bytes]:
+    """
+    Export als Iterator von Byte-Chunks für die Response. data = Filter-Zustand (+ columns),
+    header ersetzt die Spaltennamen in der CSV-Kopfzeile. Liegt das Member-Ergebnis schon im FilterCache,
+    wird daraus geschrieben, sonst läuft die Query sofort an (Fehler also vor dem ersten Byte).
+    Wirft ExportError bei unbekanntem kind/Format/Spalten.
+    """
+    if kind not in TABLES:
+        raise ExportError(f'unknown export: {kind}')
+    if fmt not in FORMATS:
+        raise ExportError(f'unknown format: {fmt}')
+    columns = _columns(kind, data)
+    select = _select(kind, columns)
+    f = _filter(kind, data)
+    cached = FilterCache.peek('users', f) if kind == 'members' else None
+    if cached is not None:
+        batches = ([{c: getattr(o, c) for c in columns} for o in cached[i:i + BATCH_SIZE]]
+                   for i in range(0, len(cached), BATCH_SIZE))
+    else:
+        sql, args = _query(kind, f, select, data)
+        batches = _batches(Model.connect().execute(sql, args))
+    return _chunks(header or columns, batches, fmt, compress)
+
+
+def _batches(cur) -> Iterator[list]:
+    while True:
+        rows = cur.fetchmany(BATCH_SIZE)
+        if not rows:
+            return
+        yield rows
+
+
+def _csv_lines(rows: list, header: List[str] = None) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(header)
+    writer.writerows([list(r.values()) for r in rows])
+    return buf.getvalue()
+
+
+def _chunks(header: List[str], batches: Iterator[list], fmt: str, compress: bool) -> Iterator[bytes]:
+    gz = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS) if compress else None
+
+    def encode(text: str) -> bytes:
+        data = text.encode()
+        return gz.compress(data) if gz else data
+
+    if fmt == 'csv':
+        out = encode(_csv_lines([], header))
+        if out:
+            yield out
+    for rows in batches:
+        if fmt == 'csv':
+            chunk = _csv_lines(rows)
+        else:
+            chunk = ''.join(json.dumps(r, ensure_ascii=False) + '\n' for r in rows)
+        out = encode(chunk)
+        if out:
+            yield out
+    if gz:
+        yield gz.flush()
@@ -11,7 +11,8 @@ from .post import Post
 from .profile import Profile
 from .leaderboard import Leaderboard
 from .like import Like
-from .other_community import OtherCommunity
+from .other_community import OtherCommunity, about_fields
+from . import activity_rollup, current_state, data_version, interaction_edges, membership, profile_group
 from model import Model
 
 
@@ -25,30 +26,48 @@ def _iso_to_timestamp(iso_str: str) -> int:
     except:
         return 0
 
-def extract_from_fetch(fetch: Fetch) -> dict:
+def extract_from_fetch(fetch: Fetch, data: dict = None) -> dict:
     """
     Extrahiert Entitäten aus einem Fetch.
     Löscht vorher alle alten Einträge dieses Fetches.
+    data: bereits geparstes raw_data (spart das erneute json.loads), sonst aus fetch.raw_data.
     Returns: {'users': int, 'posts': int, 'comments': int, 'profiles': int, 'leaderboard': int, 'leaderboard_applied': int, 'other_communities': int, 'likes': int}
     """
+    if data is None:
+        data = json.loads(fetch.raw_data) if fetch.raw_data else {}
     result = {'users': 0, 'posts': 0, 'comments': 0, 'profiles': 0, 'leaderboard': 0, 'leaderboard_applied': 0, 'other_communities': 0, 'likes': 0}
     if fetch.type == 'members':
-        result['users'] = _extract_users(fetch)
+        result['users'] = _extract_users(fetch, data)
+        current_state.sync_fetch('user_current', fetch.id)
+        membership.update(fetch.community_slug)
+        activity_rollup.sync_fetch(fetch)
     elif fetch.type == 'posts':
-        result['posts'] = _extract_posts(fetch)
+        result['posts'] = _extract_posts(fetch, data)
+        current_state.sync_fetch('post_current', fetch.id)
+        interaction_edges.sync_fetch(fetch)
+        activity_rollup.sync_fetch(fetch)
     elif fetch.type == 'comments':
-        result['comments'] = _extract_comments(fetch)
+        result['comments'] = _extract_comments(fetch, data)
+        current_state.sync_fetch('post_current', fetch.id)
+        interaction_edges.sync_fetch(fetch)
+        activity_rollup.sync_fetch(fetch)
     elif fetch.type == 'likes':
-        result['likes'] = _extract_likes(fetch)
+        result['likes'] = _extract_likes(fetch, data)
+        interaction_edges.sync_fetch(fetch)
+        activity_rollup.sync_fetch(fetch)
     elif fetch.type == 'profile':
-        result['profiles'] = _extract_profile(fetch)
-        result['other_communities'] = _extract_other_communities(fetch)
+        result['profiles'] = _extract_profile(fetch, data)
+        result['other_communities'] = _extract_other_communities(fetch, data)
     elif fetch.type == 'leaderboard':
-        result['leaderboard'] = _extract_leaderboard(fetch)
+        result['leaderboard'] = _extract_leaderboard(fetch, data)
         # Auto-apply leaderboard to users
         result['leaderboard_applied'] = apply_leaderboard_to_users(fetch.community_slug)
     elif fetch.type == 'community_about':
-        _extract_community_about(fetch)
+        _extract_community_about(fetch, data)
+    # Upserts/DELETEs ohne nachfolgendes save() nicht offen lassen; Version erst nach dem Commit erhöhen,
+    # sonst cachen andere Threads den alten Stand unter der neuen Version (im Batch bumpt der Aufrufer)
+    if Model.commit():
+        data_version.bump()
     return result
 
 def extract_all_fetches() -> dict:
@@ -66,12 +85,17 @@ def extract_all_fetches() -> dict:
         totals['likes'] += result['likes']
     return totals
 
-def _extract_users(fetch: Fetch) -> int:
+def _delete_snapshots(table: str, fetch: Fetch) -> None:
+    """Löscht die user/post-Snapshots eines Fetches (Re-Extraktion) und korrigiert {table}_current."""
+    cur = Model.connect().execute(f"DELETE FROM {table} WHERE fetch_id = ?", [fetch.id])
+    if cur.rowcount:
+        current_state.forget_fetch(f'{table}_current', fetch.id)
+
+def _extract_users(fetch: Fetch, data: dict) -> int:
     """Extrahiert Users aus einem members-Fetch."""
     # Alte Einträge dieses Fetches löschen
-    Model.connect().execute("DELETE FROM user WHERE fetch_id = ?", [fetch.id])
+    _delete_snapshots('user', fetch)
 
-    data = json.loads(fetch.raw_data) if fetch.raw_data else {}
     users_raw = data.get('pageProps', {}).get('users', [])
     now = int(time.time())
     count = 0
@@ -108,15 +132,15 @@ def _extract_users(fetch: Fetch) -> int:
 
     return count
 
-def _extract_posts(fetch: Fetch) -> int:
+def _extract_posts(fetch: Fetch, data: dict) -> int:
     """Extrahiert Posts aus einem posts-Fetch."""
     # Alte Einträge dieses Fetches löschen
-    Model.connect().execute("DELETE FROM post WHERE fetch_id = ?", [fetch.id])
+    _delete_snapshots('post', fetch)
 
-    data = json.loads(fetch.raw_data) if fetch.raw_data else {}
     trees = data.get('pageProps', {}).get('postTrees', [])
     now = int(time.time())
     count = 0
+    _mark_changed_posts(fetch, trees)
 
     for tree in trees:
         p = tree.get('post', {})
@@ -151,29 +175,76 @@ def _extract_posts(fetch: Fetch) -> int:
     return count
 
 
-def _extract_comments(fetch: Fetch) -> int:
+def _mark_changed_posts(fetch: Fetch, trees: list) -> int:
+    """
+    Zählt Posts dieser Seite, die neu sind oder ein anderes skool_updated_at haben
+    als in früheren Fetches, und speichert das als fetch.changed_items.
+    Der Planner nutzt das für Early-Stop beim inkrementellen Posts-Refresh.
+    """
+    keys = {(t.get('post', {}).get('id', ''), t.get('post', {}).get('updatedAt', '')) for t in trees}
+    keys.discard(('', ''))
+    known = _known_post_versions([k[0] for k in keys], fetch.id)
+    changed = len(keys - known)
+    fetch.changed_items = changed
+    Model.connect().execute("UPDATE fetch SET changed_items = ? WHERE id = ?", [changed, fetch.id])
+    return changed
+
+
+def _known_post_versions(ids: list, fetch_id: int) -> set:
+    """(skool_id, skool_updated_at) aller schon gespeicherten Versionen aus anderen Fetches."""
+    known = set()
+    batch_size = 400
+    for i in range(0, len(ids), batch_size):
+        batch = ids[i:i + batch_size]
+        placeholders = ','.join(['?'] * len(batch))
+        rows = Model.query(
+            f"""SELECT DISTINCT skool_id, skool_updated_at FROM post
+                WHERE skool_id IN ({placeholders}) AND fetch_id != ?""",
+            batch + [fetch_id]
+        )
+        known.update((r['skool_id'], r['skool_updated_at']) for r in rows)
+    return known
+
+
+COMMENTS_PAGE_SIZE = 25  # limit=25 in electron-fetcher/main.js
+
+
+def _extract_comments(fetch: Fetch, data: dict) -> int:
     """
     Extrahiert Comments aus einem comments-Fetch (api2.skool.com).
     Comments werden in die post-Tabelle gespeichert mit is_toplevel=0.
     Format: { post_tree: { children: [...] }, pinned_post_tree: {}, last: int }
+    Seiten werden per Comment-ID gemerged: Comments, die mit gleichem updated_at schon aus
+    einem anderen Fetch da sind, werden nicht nochmal gespeichert - Upvotes/Antworten ändern
+    updated_at nicht, die Zähler (und metadata) übernimmt post_current trotzdem. Ist die Seite voll,
+    kommt 'last' als next_cursor an den Fetch, der Planner holt dann die nächste Seite.
     """
     # Alte Einträge dieses Fetches löschen
-    Model.connect().execute("DELETE FROM post WHERE fetch_id = ?", [fetch.id])
-
-    data = json.loads(fetch.raw_data) if fetch.raw_data else {}
+    _delete_snapshots('post', fetch)
 
     # api2.skool.com Format: direkt post_tree (snake_case, kein pageProps wrapper)
     post_tree = data.get('post_tree', {})
     children = post_tree.get('children', [])
     now = int(time.time())
 
+    def collect_ids(nodes: list, ids: list):
+        for node in nodes:
+            ids.append(node.get('post', {}).get('id', ''))
+            collect_ids(node.get('children', []), ids)
+        return ids
+
+    known = _known_post_versions([i for i in collect_ids(children, []) if i], fetch.id)
+    seen = set()
+    counters = []  # (upvotes, comments, metadata, skool_id) bekannter Versionen
+
     def extract_comment_tree(nodes: list) -> int:
         """Rekursiv alle Comments aus children extrahieren."""
         count = 0
         for node in nodes:
             p = node.get('post', {})
-            if not p.get('id'):
+            if not p.get('id') or p['id'] in seen:
                 continue
+            seen.add(p['id'])
 
             u = p.get('user', {})
             meta = p.get('metadata', {})
@@ -181,28 +252,31 @@ def _extract_comments(fetch: Fetch) -> int:
             # api2 uses snake_case
             root_id = p.get('root_id', '') or ''
 
-            post = Post({
-                'fetch_id': fetch.id,
-                'fetched_at': now,
-                'community_slug': fetch.community_slug,
-                'skool_id': skool_id,
-                'name': p.get('name', ''),
-                'post_type': p.get('post_type', ''),
-                'group_id': p.get('group_id', ''),
-                'user_id': p.get('user_id', ''),
-                'label_id': p.get('label_id', ''),
-                'root_id': root_id,
-                'skool_created_at': p.get('created_at', ''),
-                'skool_updated_at': p.get('updated_at', ''),
-                'metadata': json.dumps(meta),
-                'is_toplevel': 0,  # Comments sind immer nicht-toplevel
-                'comments': meta.get('comments', 0) or 0,
-                'upvotes': meta.get('upvotes', 0) or 0,
-                'user_name': u.get('name', ''),
-                'user_metadata': json.dumps(u.get('metadata', {})),
-            })
-            post.save()
-            count += 1
+            if (skool_id, p.get('updated_at', '')) not in known:
+                post = Post({
+                    'fetch_id': fetch.id,
+                    'fetched_at': now,
+                    'community_slug': fetch.community_slug,
+                    'skool_id': skool_id,
+                    'name': p.get('name', ''),
+                    'post_type': p.get('post_type', ''),
+                    'group_id': p.get('group_id', ''),
+                    'user_id': p.get('user_id', ''),
+                    'label_id': p.get('label_id', ''),
+                    'root_id': root_id,
+                    'skool_created_at': p.get('created_at', ''),
+                    'skool_updated_at': p.get('updated_at', ''),
+                    'metadata': json.dumps(meta),
+                    'is_toplevel': 0,  # Comments sind immer nicht-toplevel
+                    'comments': meta.get('comments', 0) or 0,
+                    'upvotes': meta.get('upvotes', 0) or 0,
+                    'user_name': u.get('name', ''),
+                    'user_metadata': json.dumps(u.get('metadata', {})),
+                })
+                post.save()
+                count += 1
+            else:
+                counters.append((meta.get('upvotes', 0) or 0, meta.get('comments', 0) or 0, json.dumps(meta), skool_id))
 
             # Rekursiv children verarbeiten
             sub_children = node.get('children', [])
@@ -211,15 +285,31 @@ def _extract_comments(fetch: Fetch) -> int:
 
         return count
 
-    return extract_comment_tree(children)
+    count = extract_comment_tree(children)
+    # nur geänderte Rows anfassen (der Update-Trigger der Suche feuert pro Row)
+    Model.connect().executemany(
+        """UPDATE post_current SET upvotes = ?1, comments = ?2, metadata = ?3
+           WHERE skool_id = ?4 AND (upvotes IS NOT ?1 OR comments IS NOT ?2 OR metadata IS NOT ?3)""",
+        counters
+    )
+
+    # Volle Seite -> es gibt vermutlich mehr. Gleicher Cursor wie vorher = kein Fortschritt -> Ende.
+    last = data.get('last')
+    next_cursor = str(last) if last and len(children) >= COMMENTS_PAGE_SIZE else ''
+    if next_cursor == fetch.cursor:
+        next_cursor = ''
+    fetch.next_cursor = next_cursor
+    fetch.changed_items = count
+    Model.connect().execute("UPDATE fetch SET next_cursor = ?, changed_items = ? WHERE id = ?",
+                            [next_cursor, count, fetch.id])
+    return count
 
 
-def _extract_profile(fetch: Fetch) -> int:
+def _extract_profile(fetch: Fetch, data: dict) -> int:
     """Extrahiert Profile aus einem profile-Fetch."""
     # Alte Einträge dieses Fetches löschen
     Model.connect().execute("DELETE FROM profile WHERE fetch_id = ?", [fetch.id])
 
-    data = json.loads(fetch.raw_data) if fetch.raw_data else {}
     # Profile-Daten kommen aus currentUser oder renderData.user
     u = data.get('pageProps', {}).get('currentUser', {})
     if not u:
@@ -256,14 +346,15 @@ def _extract_profile(fetch: Fetch) -> int:
         'daily_activities': json.dumps(pd.get('dailyActivities', {})),
     })
     profile.save()
+    # Gruppen aus dem neuesten Profil des Users (bei Re-Extraktion eines älteren Fetches bleibt das neueste)
+    profile_group.sync([profile.skool_id])
     return 1
 
-def _extract_leaderboard(fetch: Fetch) -> int:
+def _extract_leaderboard(fetch: Fetch, data: dict) -> int:
     """Extrahiert Leaderboard-Einträge aus einem leaderboard-Fetch."""
     # Alte Einträge dieses Fetches löschen
     Model.connect().execute("DELETE FROM leaderboard WHERE fetch_id = ?", [fetch.id])
 
-    data = json.loads(fetch.raw_data) if fetch.raw_data else {}
     # Leaderboard-Daten aus leaderboardsData oder renderData.leaderboard
     lb_data = data.get('pageProps', {}).get('leaderboardsData', {})
     if not lb_data:
@@ -297,11 +388,11 @@ def apply_leaderboard_to_users(community_slug: str) -> int:
 
     # Hole neueste Leaderboard-Einträge pro User (dedupliziert)
     sql = """
-        UPDATE user
+        UPDATE {table}
         SET points = (
             SELECT lb.points FROM leaderboard lb
-            WHERE lb.user_skool_id = user.skool_id
-            AND lb.community_slug = user.community_slug
+            WHERE lb.user_skool_id = {table}.skool_id
+            AND lb.community_slug = {table}.community_slug
             ORDER BY lb.fetched_at DESC
             LIMIT 1
         ),
@@ -309,22 +400,24 @@ def apply_leaderboard_to_users(community_slug: str) -> int:
         WHERE community_slug = ?
         AND EXISTS (
             SELECT 1 FROM leaderboard lb
-            WHERE lb.user_skool_id = user.skool_id
-            AND lb.community_slug = user.community_slug
+            WHERE lb.user_skool_id = {table}.skool_id
+            AND lb.community_slug = {table}.community_slug
         )
     """
     conn = Model.connect()
-    cursor = conn.execute(sql, [now, community_slug])
+    cursor = conn.execute(sql.format(table='user'), [now, community_slug])
+    conn.execute(sql.format(table='user_current'), [now, community_slug])
+    if Model.commit():
+        data_version.bump()
     return cursor.rowcount
 
 
-def _extract_other_communities(fetch: Fetch) -> int:
+def _extract_other_communities(fetch: Fetch, data: dict) -> int:
     """
     Extracts other communities from a profile fetch.
     Looks in groupsMemberOf for community slugs different from the fetch community.
     Only creates new OtherCommunity entries (shared_user_count is calculated on-demand).
     """
-    data = json.loads(fetch.raw_data) if fetch.raw_data else {}
     u = data.get('pageProps', {}).get('currentUser', {})
     if not u:
         u = data.get('pageProps', {}).get('renderData', {}).get('user', {})
@@ -363,12 +456,10 @@ def _extract_other_communities(fetch: Fetch) -> int:
     return count
 
 
-def _extract_community_about(fetch: Fetch) -> None:
+def _extract_community_about(fetch: Fetch, data: dict) -> None:
     """
     Extracts community about page data and updates OtherCommunity record.
     """
-    data = json.loads(fetch.raw_data) if fetch.raw_data else {}
-
     # Update the OtherCommunity record
     existing = OtherCommunity.get_list(
         "SELECT * FROM othercommunity WHERE slug = ?", [fetch.community_slug]
@@ -386,11 +477,14 @@ def _extract_community_about(fetch: Fetch) -> None:
         display_name = meta.get('displayName', '')
         if display_name:
             oc.name = display_name
+        # Zahlen/Kategorien als Spalten, damit CommunityFilter nicht about_data parsen muss
+        for key, value in about_fields(data).items():
+            setattr(oc, key, value)
 
         oc.save()
 
 
-def _extract_likes(fetch: Fetch) -> int:
+def _extract_likes(fetch: Fetch, data: dict) -> int:
     """
     Extrahiert Likes aus einem likes-Fetch (api2.skool.com/posts/{id}/vote-users).
     Format: { users: [...] } - Liste von Usern die den Post geliked haben.
@@ -398,7 +492,6 @@ def _extract_likes(fetch: Fetch) -> int:
     # Alte Einträge dieses Fetches löschen
     Model.connect().execute("DELETE FROM like WHERE fetch_id = ?", [fetch.id])
 
-    data = json.loads(fetch.raw_data) if fetch.raw_data else {}
     # api2.skool.com Format: direkt users array (kein pageProps wrapper)
     users = data.get('users', [])
     now = int(time.time())
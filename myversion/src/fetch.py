@@ -16,3 +16,8 @@ class Fetch(Model):
     # Pagination (aus Response extrahiert)
     total_items: int = 0      # total aus pageProps
     total_pages: int = 0      # totalPages (members) oder berechnet (posts)
+    # Incremental refresh: neue/geänderte Posts bzw. Comments in diesem Fetch, -1 = unbekannt
+    changed_items: int = -1
+    # Cursor-Pagination (comments): mit welchem Cursor gefetched, 'last' aus der Response falls Seite voll
+    cursor: str = ""
+    next_cursor: str = ""
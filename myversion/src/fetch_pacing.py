@@ -0,0 +1,136 @@
+"""
+Adaptive Pacing für den Fetcher.
+Jedes Result, das über /api/fetch-result reinkommt, wird hier mit Latenz und Fehler
+pro Skool-Endpoint erfasst. Pro Endpoint läuft ein Token Bucket, dessen Rate per AIMD
+geregelt wird: jeder Erfolg erhöht die Rate additiv, 429/5xx halbieren sie.
+Daraus ergibt sich die empfohlene Parallelität und Pause für den nächsten Batch.
+"""
+import math
+import re
+import threading
+import time
+
+_lock = threading.Lock()
+
+
+def endpoint_for(fetch_type: str) -> str:
+    """comments/likes laufen über api2.skool.com, alles andere über _next/data."""
+    return 'api2' if fetch_type in ('comments', 'likes') else 'next_data'
+
+
+def _status_code(error: str) -> int:
+    """'HTTP 429' -> 429, sonst 0."""
+    m = re.search(r'HTTP (\d{3})', error or '')
+    return int(m.group(1)) if m else 0
+
+
+class _EndpointState:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate              # erlaubte Requests pro Sekunde
+        self.tokens = burst
+        self.updated = time.time()
+        self.latency_ms = 0.0         # EWMA
+        self.error_rate = 0.0         # EWMA über alle Fehler (auch 404)
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0            # 429 + 5xx
+        self.backoff_until = 0.0
+
+    def refill(self, now: float, burst: float):
+        self.tokens = min(burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class FetchPacer:
+    """
+    Prozessweiter Zustand (eine lokale App, ein Fetcher).
+    Alle Raten in Requests pro Sekunde.
+    """
+    START_RATE = 0.2        # 1 Request / 5s = bisheriger fester Delay
+    MIN_RATE = 0.05         # nie langsamer als 1 Request / 20s
+    MAX_RATE = 2.0
+    ADDITIVE_STEP = 0.05    # pro erfolgreichem Request
+    DECREASE_FACTOR = 0.5   # bei 429 / 5xx
+    BURST = 3.0
+    MAX_CONCURRENCY = 4
+    EWMA_ALPHA = 0.2
+
+    _states: dict[str, _EndpointState] = {}
+
+    @classmethod
+    def _state(cls, endpoint: str) -> _EndpointState:
+        if endpoint not in cls._states:
+            cls._states[endpoint] = _EndpointState(cls.START_RATE, cls.BURST)
+        return cls._states[endpoint]
+
+    @classmethod
+    def record(cls, fetch_type: str, ok: bool, error: str = '', latency_ms: float = None) -> None:
+        """Ein Result erfassen und die Rate des Endpoints anpassen."""
+        now = time.time()
+        code = _status_code(error)
+        throttled = code == 429 or code >= 500
+        with _lock:
+            s = cls._state(endpoint_for(fetch_type))
+            s.refill(now, cls.BURST)
+            s.tokens -= 1
+            s.requests += 1
+            if latency_ms is not None:
+                s.latency_ms = latency_ms if s.requests == 1 else \
+                    (1 - cls.EWMA_ALPHA) * s.latency_ms + cls.EWMA_ALPHA * float(latency_ms)
+            s.error_rate = (1 - cls.EWMA_ALPHA) * s.error_rate + cls.EWMA_ALPHA * (0.0 if ok else 1.0)
+            if not ok:
+                s.errors += 1
+            if throttled:
+                # Multiplicative decrease + Bucket leeren, damit sofort gebremst wird
+                s.throttled += 1
+                s.rate = max(cls.MIN_RATE, s.rate * cls.DECREASE_FACTOR)
+                s.tokens = min(s.tokens, 0.0)
+                s.backoff_until = now + 1.0 / s.rate
+            elif ok:
+                s.rate = min(cls.MAX_RATE, s.rate + cls.ADDITIVE_STEP)
+            # 404 & Co. sagen nichts über das Rate-Limit -> Rate bleibt
+
+    @classmethod
+    def _recommend_endpoint(cls, s: _EndpointState, now: float) -> dict:
+        s.refill(now, cls.BURST)
+        delay = 0.0 if s.tokens >= 1 else (1 - s.tokens) / s.rate
+        delay = max(delay, s.backoff_until - now)
+        # Little's Law: gleichzeitig offene Requests = Rate * Latenz
+        if now < s.backoff_until:
+            concurrency = 1
+        else:
+            concurrency = math.ceil(s.rate * (s.latency_ms / 1000.0)) if s.latency_ms else 1
+            concurrency = max(1, min(cls.MAX_CONCURRENCY, concurrency))
+        return {
+            'rate': round(s.rate, 3),
+            'delay_ms': int(delay * 1000),
+            'concurrency': concurrency,
+            'latency_ms': round(s.latency_ms, 1),
+            'error_rate': round(s.error_rate, 3),
+            'requests': s.requests,
+            'errors': s.errors,
+            'throttled': s.throttled,
+        }
+
+    @classmethod
+    def recommend(cls) -> dict:
+        """
+        Empfehlung für den nächsten Batch. Ohne bisherige Results gilt START_RATE.
+        Über mehrere Endpoints hinweg gilt der langsamste (max. Pause, min. Parallelität).
+        """
+        now = time.time()
+        with _lock:
+            endpoints = {name: cls._recommend_endpoint(s, now) for name, s in cls._states.items()}
+        if not endpoints:
+            fresh = cls._recommend_endpoint(_EndpointState(cls.START_RATE, cls.BURST), now)
+            return {'delay_ms': fresh['delay_ms'], 'concurrency': fresh['concurrency'], 'endpoints': {}}
+        return {
+            'delay_ms': max(e['delay_ms'] for e in endpoints.values()),
+            'concurrency': min(e['concurrency'] for e in endpoints.values()),
+            'endpoints': endpoints,
+        }
+
+    @classmethod
+    def reset(cls) -> None:
+        with _lock:
+            cls._states = {}
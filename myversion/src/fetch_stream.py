@@ -0,0 +1,165 @@
+"""
+Streaming-Ingestion für Fetch-Results (/api/fetch-result/stream).
+Body ist NDJSON, eine Zeile pro Result, optional gzip- oder zstd-komprimiert (Content-Encoding):
+
+    {"task": {...}, "ok": true, "error": "", "latency_ms": 812, "data": {...}}
+
+Der Body wird in Chunks dekomprimiert und zeilenweise verarbeitet, es liegt also immer nur
+ein Result im Speicher. Der data-Wert wird genau einmal geparst (für die Extraktion) und als
+Original-Textausschnitt gespeichert - kein json.dumps mehr wie bei /api/fetch-result.
+"""
+import json
+import re
+import zlib
+from typing import BinaryIO, Callable, Iterator
+
+try:
+    import zstandard  # optional, nur für Content-Encoding: zstd
+except ImportError:
+    zstandard = None
+
+CHUNK_SIZE = 64 * 1024
+
+# Kaputter/abgeschnittener Body
+DECOMPRESSION_ERRORS = (zlib.error, EOFError) + ((zstandard.ZstdError,) if zstandard else ())
+
+_decoder = json.JSONDecoder()
+_WS = re.compile(r'[ \t\n\r]*')
+
+
+class UnsupportedEncoding(ValueError):
+    pass
+
+
+def check_encoding(encoding: str) -> None:
+    """Wirft UnsupportedEncoding, bevor der Body gelesen wird (-> 415)."""
+    if encoding in ('', 'identity', 'gzip', 'x-gzip'):
+        return
+    if encoding == 'zstd':
+        if zstandard is None:
+            raise UnsupportedEncoding('zstd requires the zstandard package')
+        return
+    raise UnsupportedEncoding(f'Unsupported Content-Encoding: {encoding}')
+
+
+def _gunzip_chunks(stream: BinaryIO) -> Iterator[bytes]:
+    """
+    gzip in Stücken von höchstens CHUNK_SIZE (max_length): eine Zeile, die zu Gigabytes aufgeht,
+    landet so nie auf einmal im Speicher. Der nicht verarbeitete Rest bleibt in unconsumed_tail.
+    """
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    while True:
+        data = stream.read(CHUNK_SIZE)
+        if not data:
+            break
+        while data:
+            out = d.decompress(data, CHUNK_SIZE)
+            if out:
+                yield out
+            if d.eof:
+                # mehrere aneinandergehängte Members (z.B. pro Batch) -> neuer Decompressor
+                data = d.unused_data
+                if data:
+                    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            else:
+                # was übrig bleibt, kommt beim nächsten decompress()/flush() (auch gepufferte Ausgabe)
+                data = d.unconsumed_tail
+    tail = d.flush(CHUNK_SIZE)
+    while tail:
+        yield tail
+        tail = d.flush(CHUNK_SIZE)
+    if not d.eof:
+        raise EOFError('gzip stream is truncated')
+
+
+def _decompressed_chunks(stream: BinaryIO, encoding: str) -> Iterator[bytes]:
+    check_encoding(encoding)
+    if encoding in ('gzip', 'x-gzip'):
+        yield from _gunzip_chunks(stream)
+    elif encoding == 'zstd':
+        # read_to_iter liefert höchstens write_size Bytes pro Stück (wie max_length bei zlib)
+        yield from zstandard.ZstdDecompressor().read_to_iter(stream, read_size=CHUNK_SIZE, write_size=CHUNK_SIZE)
+    else:
+        while True:
+            chunk = stream.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+class _HookedReader:
+    """stream.read() mit before_read() davor - z.B. offene Schreib-Transaktion committen, bevor auf den Client gewartet wird."""
+
+    def __init__(self, stream: BinaryIO, before_read: Callable[[], None]):
+        self.stream = stream
+        self.before_read = before_read
+
+    def read(self, size: int = -1) -> bytes:
+        self.before_read()
+        return self.stream.read(size)
+
+
+def iter_lines(stream: BinaryIO, encoding: str = '', before_read: Callable[[], None] = None) -> Iterator[bytes]:
+    """
+    Nicht-leere Zeilen aus dem (dekomprimierten) Body, ohne den ganzen Body zu puffern.
+    before_read wird vor jedem Lesen vom Client aufgerufen (das kann blockieren).
+    """
+    if before_read is not None:
+        stream = _HookedReader(stream, before_read)
+    pending = []
+    for chunk in _decompressed_chunks(stream, encoding):
+        start = 0
+        while True:
+            nl = chunk.find(b'\n', start)
+            if nl < 0:
+                pending.append(chunk[start:])
+                break
+            pending.append(chunk[start:nl])
+            line = b''.join(pending)
+            pending = []
+            if line.strip():
+                yield line
+            start = nl + 1
+    line = b''.join(pending)
+    if line.strip():
+        yield line
+
+
+def parse_record(line: bytes) -> tuple[dict, str, object]:
+    """
+    Zerlegt eine NDJSON-Zeile in (felder, raw_data, data).
+    Läuft nur über die Keys der obersten Ebene; data wird einmal geparst und zusätzlich
+    als unveränderter Textausschnitt zurückgegeben. Wirft ValueError bei kaputtem JSON.
+    """
+    text = line.decode('utf-8')
+    idx = _WS.match(text, 0).end()
+    if text[idx:idx + 1] != '{':
+        raise ValueError('record must be a JSON object')
+    fields, raw_data, data = {}, '', {}
+    idx = _WS.match(text, idx + 1).end()
+    if text[idx:idx + 1] == '}':
+        return fields, raw_data, data
+    while True:
+        key, idx = _decoder.raw_decode(text, idx)
+        if not isinstance(key, str):
+            raise ValueError(f'invalid key at {idx}')
+        idx = _WS.match(text, idx).end()
+        if text[idx:idx + 1] != ':':
+            raise ValueError(f'expected ":" at {idx}')
+        start = _WS.match(text, idx + 1).end()
+        value, idx = _decoder.raw_decode(text, start)
+        if key == 'data':
+            raw_data, data = text[start:idx], value
+        else:
+            fields[key] = value
+        idx = _WS.match(text, idx).end()
+        sep = text[idx:idx + 1]
+        if sep == ',':
+            idx = _WS.match(text, idx + 1).end()
+        elif sep == '}':
+            break
+        else:
+            raise ValueError(f'expected "," or "}}" at {idx}')
+    if text[idx + 1:].strip():
+        raise ValueError('trailing data after record')
+    return fields, raw_data, data
@@ -1,9 +1,11 @@
-from typing import List
+from typing import Iterable, Iterator, List
+import heapq
+import itertools
+import json
 import time
 
 from .config_entry import ConfigEntry
 from .fetch import Fetch
-from .other_community import OtherCommunity
 from model import Model
 from .post import Post
 from .user import User
@@ -23,6 +25,8 @@ class FetchStaleInformation:
         'stale_community_about': 30 * 24,
         'max_post_age_days': 90,
         'max_user_inactive_days': 90,
+        'posts_full_sweep_hours': 7 * 24,  # incremental posts refresh: full sweep fallback
+        'fetch_tasks_limit': 1000,  # max. Tasks pro Planungslauf über alle Communities
     }
 
     @classmethod
@@ -68,6 +72,90 @@ class FetchStaleInformation:
     def get_max_user_inactive_days(cls) -> int:
         return cls._get_setting('max_user_inactive_days')
 
+    @classmethod
+    def get_posts_full_sweep_hours(cls) -> int:
+        return cls._get_setting('posts_full_sweep_hours')
+
+    @classmethod
+    def get_fetch_tasks_limit(cls) -> int:
+        return cls._get_setting('fetch_tasks_limit')
+
+    @classmethod
+    def is_posts_incremental(cls) -> bool:
+        """Incremental posts refresh is on unless posts_incremental is set to 'false'."""
+        entry = ConfigEntry.getByKey('posts_incremental')
+        return not (entry and entry.value == 'false')
+
+    @classmethod
+    def get_tracked_communities(cls) -> List[str]:
+        """
+        tracked_communities: JSON-Liste oder kommagetrennt ("a, b").
+        Nicht gesetzt -> nur current_community (bisheriges Verhalten).
+        """
+        entry = ConfigEntry.getByKey('tracked_communities')
+        raw = entry.value.strip() if entry and entry.value else ''
+        slugs = []
+        if raw:
+            try:
+                parsed = json.loads(raw)
+                slugs = parsed if isinstance(parsed, list) else []
+            except ValueError:
+                slugs = raw.split(',')
+        else:
+            current = ConfigEntry.getByKey('current_community')
+            if current and current.value:
+                slugs = [current.value]
+        # Reihenfolge behalten, Duplikate raus
+        return list(dict.fromkeys(str(s).strip() for s in slugs if str(s).strip()))
+
+    @classmethod
+    def _get_json_setting(cls, key: str) -> dict:
+        entry = ConfigEntry.getByKey(key)
+        if entry and entry.value:
+            try:
+                val = json.loads(entry.value)
+                if isinstance(val, dict):
+                    return val
+            except ValueError:
+                pass
+        return {}
+
+    @classmethod
+    def get_community_weights(cls, slugs: List[str]) -> dict:
+        """community_weights: JSON {"slug": 2, ...}. Fehlend oder <= 0 -> 1."""
+        weights = cls._get_json_setting('community_weights')
+        result = {}
+        for slug in slugs:
+            try:
+                w = float(weights.get(slug, 1))
+            except (TypeError, ValueError):
+                w = 1.0
+            result[slug] = w if w > 0 else 1.0
+        return result
+
+    @classmethod
+    def get_community_task_budgets(cls, slugs: List[str]) -> dict:
+        """
+        community_task_budget: max. Tasks pro Community und Planungslauf, 0 = unbegrenzt.
+        Entweder eine Zahl für alle oder JSON {"slug": 50, "*": 20}.
+        """
+        entry = ConfigEntry.getByKey('community_task_budget')
+        raw = entry.value.strip() if entry and entry.value else ''
+        per_slug = cls._get_json_setting('community_task_budget') if raw.startswith('{') else {}
+        default = 0
+        if not per_slug and raw:
+            try:
+                default = max(0, int(raw))
+            except ValueError:
+                pass
+        result = {}
+        for slug in slugs:
+            try:
+                result[slug] = max(0, int(per_slug.get(slug, per_slug.get('*', default))))
+            except (TypeError, ValueError):
+                result[slug] = default
+        return result
+
     @classmethod
     def get_404_cooldown_hours(cls) -> int:
         entry = ConfigEntry.getByKey('error_404_cooldown_hours')
@@ -93,6 +181,56 @@ class FetchStaleInformation:
         return 2  # default 2 failures
 
 
+class FetchFreshness:
+    """
+    Bulk-Snapshot der Fetch-Tabelle für alle getrackten Communities auf einmal,
+    statt _has_valid_fetch() pro Seite und Community:
+    - letzter ok-Fetch je (type, slug, page) für members/posts/leaderboard
+    - letzter ok-Fetch je (type, slug) für alle Typen (Status-Ansicht)
+    - letzter vollständiger Posts-Durchlauf je slug (incremental refresh)
+    """
+    PAGED_TYPES = ('members', 'posts', 'leaderboard')
+
+    def __init__(self, slugs: List[str]):
+        self.slugs = list(slugs)
+        self.thresholds = {t: FetchTask._stale_threshold(t) for t in self.PAGED_TYPES}
+        self.pages: dict[tuple, dict] = {}       # (type, slug, page) -> row
+        self.last_ok: dict[tuple, int] = {}      # (type, slug) -> created_at
+        self.full_sweep_at: dict[str, int] = {}  # slug -> created_at
+        if not self.slugs:
+            return
+        marks = ','.join('?' * len(self.slugs))
+        # SQLite: bei MAX() kommen die übrigen Spalten aus genau der Zeile mit dem Maximum (höchste id = neuester)
+        for r in Model.query(
+            f"""SELECT type, community_slug, page_param, MAX(id) AS id, created_at, changed_items, total_pages
+                FROM fetch WHERE status = 'ok' AND type IN ('members', 'posts', 'leaderboard')
+                AND community_slug IN ({marks})
+                GROUP BY type, community_slug, page_param""", self.slugs):
+            self.pages[(r['type'], r['community_slug'], r['page_param'])] = r
+        for r in Model.query(
+            f"""SELECT type, community_slug, MAX(created_at) AS created_at FROM fetch
+                WHERE status = 'ok' AND community_slug IN ({marks}) GROUP BY type, community_slug""", self.slugs):
+            self.last_ok[(r['type'], r['community_slug'])] = r['created_at']
+        for r in Model.query(
+            f"""SELECT community_slug, MAX(created_at) AS created_at FROM fetch
+                WHERE type = 'posts' AND status = 'ok' AND total_pages > 0 AND page_param >= total_pages
+                AND community_slug IN ({marks}) GROUP BY community_slug""", self.slugs):
+            self.full_sweep_at[r['community_slug']] = r['created_at']
+
+    def valid(self, fetch_type: str, slug: str, page: int) -> dict | None:
+        """Letzter Fetch dieser Seite, falls nicht stale."""
+        row = self.pages.get((fetch_type, slug, page))
+        return row if row and row['created_at'] > self.thresholds[fetch_type] else None
+
+    def total_pages(self, fetch_type: str, slug: str) -> int:
+        row = self.valid(fetch_type, slug, 1)
+        return row['total_pages'] if row else 0
+
+    def has_recent_full_posts_sweep(self, slug: str) -> bool:
+        hours = FetchStaleInformation.get_posts_full_sweep_hours()
+        return self.full_sweep_at.get(slug, 0) > int(time.time()) - (hours * 3600)
+
+
 class FetchTask(Model):
     """
     A list fetch task is sent to the fetching-plugin so it knows what
@@ -109,6 +247,7 @@ class FetchTask(Model):
     postSkoolHexId: str = ""  # for comments/likes fetch
     postName: str = ""  # for comments/likes fetch URL
     groupSkoolId: str = ""  # Skool UUID for api2.skool.com calls (comments/likes)
+    cursor: str = ""  # comments: 'last' der vorherigen Seite, leer = erste Seite
     comment: str = ""  # explains why this task was generated
 
     # =========================================================================
@@ -157,12 +296,6 @@ class FetchTask(Model):
         )
         return {getattr(r, id_column) for r in rows}
 
-    @staticmethod
-    def _get_total_pages(fetch_type: str, slug: str) -> int:
-        """Get total_pages from page=1 fetch."""
-        f = FetchTask._get_valid_fetch(fetch_type, slug, page=1)
-        return f.total_pages if f else 0
-
     @staticmethod
     def _should_skip_404_cooldown(fetch_type: str, slug: str,
                                    user_id: str = None, post_id: str = None) -> bool:
@@ -194,6 +327,19 @@ class FetchTask(Model):
         rows2 = Model.query(sql2, args)
         return rows2 and rows2[0]['created_at'] > cutoff
 
+    @staticmethod
+    def _get_404_cooldown_ids(fetch_type: str, slug: str, id_column: str) -> set:
+        """Bulk-Variante von _should_skip_404_cooldown: alle IDs, die gerade im 404-Cooldown sind."""
+        max_failures = FetchStaleInformation.get_404_max_failures()
+        cutoff = int(time.time()) - (FetchStaleInformation.get_404_cooldown_hours() * 3600)
+        rows = Model.query(
+            f"""SELECT {id_column} AS id FROM fetch
+                WHERE type = ? AND community_slug = ? AND error_message LIKE '%404%'
+                GROUP BY {id_column} HAVING COUNT(*) >= ? AND MAX(created_at) > ?""",
+            [fetch_type, slug, max_failures, cutoff]
+        )
+        return {r['id'] for r in rows}
+
     # =========================================================================
     # Task Generierung
     # =========================================================================
@@ -201,74 +347,183 @@ class FetchTask(Model):
     @classmethod
     def generateFetchTasks(cls) -> List["FetchTask"]:
         """
-        Generate fetch tasks in 3 phases:
+        Plant Tasks für alle getrackten Communities (tracked_communities, sonst current_community).
+        Pro Community in Phasen:
         Phase 1: members + posts + leaderboard (all pages)
         Phase 2: profiles, comments, likes (only after phase 1 complete)
+        Phase 3: community about pages (global, erst wenn alle Communities Phase 1 durch haben)
+        Die Listen der Communities werden per gewichtetem Fair-Share verschränkt, höchstens
+        fetch_tasks_limit Tasks pro Lauf. Phase 2 wird pro Community erst beim Verschränken erzeugt:
+        eine große Community rechnet nicht ihre ganze Liste, bevor die kleinen drankommen.
         """
-        currentCommunity = ConfigEntry.getByKey("current_community")
-        if currentCommunity is None or currentCommunity.value.strip() == "":
-            return []  # No community selected
+        plans, about_tasks, _ = cls._plan()
+        slugs = list(plans)
+        weights = FetchStaleInformation.get_community_weights(slugs)
+        budgets = FetchStaleInformation.get_community_task_budgets(slugs)
+        limit = FetchStaleInformation.get_fetch_tasks_limit()
+        tasks = cls._interleave({slug: p['tasks'] for slug, p in plans.items()}, weights, budgets, limit)
+        return tasks + about_tasks[:limit - len(tasks)]
+
+    @classmethod
+    def community_status(cls) -> dict:
+        """Backlog und Freshness pro getrackter Community (für /api/fetch-status)."""
+        plans, about_tasks, fresh = cls._plan()
+        slugs = list(plans)
+        weights = FetchStaleInformation.get_community_weights(slugs)
+        budgets = FetchStaleInformation.get_community_task_budgets(slugs)
+        now = int(time.time())
+        communities = []
+        for slug, plan in plans.items():
+            plan['tasks'] = list(plan['tasks'])  # Status braucht den ganzen Backlog
+            by_type = {}
+            for t in plan['tasks']:
+                by_type[t.type] = by_type.get(t.type, 0) + 1
+            freshness = {}
+            for t in ('members', 'posts', 'leaderboard', 'profile', 'comments', 'likes'):
+                last = fresh.last_ok.get((t, slug))
+                entry = {'last_fetch_at': last, 'age_hours': round((now - last) / 3600, 1) if last else None}
+                if t in FetchFreshness.PAGED_TYPES:
+                    total = fresh.total_pages(t, slug)
+                    entry['total_pages'] = total
+                    entry['fresh_pages'] = sum(1 for page in range(1, total + 1) if fresh.valid(t, slug, page))
+                freshness[t] = entry
+            budget = budgets[slug]
+            backlog = len(plan['tasks'])
+            communities.append({
+                'slug': slug,
+                'weight': weights[slug],
+                'budget': budget,
+                'phase': plan['phase'],
+                'backlog': backlog,
+                'planned': min(backlog, budget) if budget else backlog,
+                'by_type': by_type,
+                'freshness': freshness,
+            })
+        return {'communities': communities, 'community_about': len(about_tasks)}
 
-        slug = currentCommunity.value.strip()
+    @classmethod
+    def _plan(cls) -> tuple[dict, List["FetchTask"], FetchFreshness]:
+        """
+        Ungekürzte Tasks pro Community: {slug: {'phase', 'tasks'}} + about-Tasks + Snapshot.
+        tasks ist ein Iterator (Phase 2 wird erst beim Durchlaufen erzeugt).
+        Freshness der Seiten kommt aus einem gemeinsamen Snapshot, nicht aus Queries pro Seite.
+        """
+        slugs = FetchStaleInformation.get_tracked_communities()
+        fresh = FetchFreshness(slugs)
+        plans = {}
+        for slug in slugs:
+            phase, tasks = cls._plan_community(slug, fresh)
+            plans[slug] = {'phase': phase, 'tasks': tasks}
+        about_tasks = []
+        if plans and all(p['phase'] == 'details' for p in plans.values()):
+            about_tasks = cls._generate_community_about_tasks()
+        return plans, about_tasks, fresh
 
+    @classmethod
+    def _plan_community(cls, slug: str, fresh: FetchFreshness) -> tuple[str, Iterable["FetchTask"]]:
+        """Phase 1a/1b/2 für eine Community. Returns (phase, tasks) - Phase 2 als Iterator."""
         # Phase 1a: Erste Seite members + posts + leaderboard (parallel)
         initial_tasks = []
-        if not cls._has_valid_fetch('members', slug, page=1):
+        if not fresh.valid('members', slug, 1):
             initial_tasks.append(cls({"type": "members", "communitySlug": slug, "pageParam": 1,
                 "comment": "Initial members fetch (page 1) to get total page count"}))
-        if not cls._has_valid_fetch('posts', slug, page=1):
+        if not fresh.valid('posts', slug, 1):
             initial_tasks.append(cls({"type": "posts", "communitySlug": slug, "pageParam": 1,
                 "comment": "Initial posts fetch (page 1) to get total page count"}))
-        if not cls._has_valid_fetch('leaderboard', slug, page=1):
+        if not fresh.valid('leaderboard', slug, 1):
             initial_tasks.append(cls({"type": "leaderboard", "communitySlug": slug, "pageParam": 1,
                 "comment": "Initial leaderboard fetch (page 1) to get user points"}))
         if initial_tasks:
-            return initial_tasks
+            return 'initial', initial_tasks
 
         # Phase 1b: Restliche Seiten
-        members_total = cls._get_total_pages('members', slug)
-        posts_total = cls._get_total_pages('posts', slug)
-        leaderboard_total = cls._get_total_pages('leaderboard', slug)
+        members_total = fresh.total_pages('members', slug)
+        posts_total = fresh.total_pages('posts', slug)
+        leaderboard_total = fresh.total_pages('leaderboard', slug)
 
         missing_tasks = []
         for page in range(2, members_total + 1):
-            if not cls._has_valid_fetch('members', slug, page=page):
+            if not fresh.valid('members', slug, page):
                 missing_tasks.append(cls({"type": "members", "communitySlug": slug, "pageParam": page,
                     "comment": f"Members page {page}/{members_total}"}))
 
-        for page in range(2, posts_total + 1):
-            if not cls._has_valid_fetch('posts', slug, page=page):
-                missing_tasks.append(cls({"type": "posts", "communitySlug": slug, "pageParam": page,
-                    "comment": f"Posts page {page}/{posts_total}"}))
+        missing_tasks.extend(cls._generate_posts_page_tasks(slug, posts_total, fresh))
 
         for page in range(2, leaderboard_total + 1):
-            if not cls._has_valid_fetch('leaderboard', slug, page=page):
+            if not fresh.valid('leaderboard', slug, page):
                 missing_tasks.append(cls({"type": "leaderboard", "communitySlug": slug, "pageParam": page,
                     "comment": f"Leaderboard page {page}/{leaderboard_total}"}))
 
         if missing_tasks:
-            return missing_tasks
+            return 'pages', missing_tasks
+
+        # Phase 2: profiles, comments, likes (lazy, die Queries laufen erst beim ersten Task)
+        return 'details', itertools.chain(cls._generate_profile_tasks(slug), cls._generate_comment_tasks(slug),
+                                          cls._generate_likes_tasks(slug))
 
-        # Phase 2: profiles, comments, likes
+    @staticmethod
+    def _interleave(task_lists: dict, weights: dict, budgets: dict, limit: int = 0) -> List["FetchTask"]:
+        """
+        Weighted Fair Share über virtuelle Zeit: jede Community startet bei 0, pro vergebenem
+        Task wächst ihre Zeit um 1/weight, dran ist immer die kleinste. Bei Gleichstand
+        entscheidet die Reihenfolge in tracked_communities. Budget kürzt die Liste der Community,
+        limit (0 = unbegrenzt) die Gesamtzahl. Die Listen dürfen Iteratoren sein: gezogen wird nur,
+        was vergeben wird.
+        """
+        queues = {}
+        heap = []
+        for order, (slug, tasks) in enumerate(task_lists.items()):
+            queues[slug] = itertools.islice(tasks, budgets[slug]) if budgets.get(slug) else iter(tasks)
+            heap.append((0.0, order, slug))
+        heapq.heapify(heap)
+        result = []
+        while heap and not (limit and len(result) >= limit):
+            vtime, order, slug = heapq.heappop(heap)
+            task = next(queues[slug], None)
+            if task is None:
+                continue  # Community hat nichts mehr
+            result.append(task)
+            heapq.heappush(heap, (vtime + 1.0 / weights.get(slug, 1.0), order, slug))
+        return result
+
+    @classmethod
+    def _generate_posts_page_tasks(cls, slug: str, posts_total: int, fresh: FetchFreshness) -> List["FetchTask"]:
+        """
+        Posts-Seiten 2..N. Posts werden mit s=newest gefetched, neue Posts können also nur
+        auf den ersten Seiten landen. Im inkrementellen Modus laufen wir die Seiten der Reihe
+        nach ab und hören auf, sobald eine Seite keine neuen/geänderten Posts mehr hatte
+        (changed_items == 0). Ohne vollständigen Durchlauf innerhalb von posts_full_sweep_hours
+        werden wie bisher alle fehlenden Seiten erzeugt.
+        """
         tasks = []
-        tasks.extend(cls._generate_profile_tasks(slug))
-        tasks.extend(cls._generate_comment_tasks(slug))
-        tasks.extend(cls._generate_likes_tasks(slug))
+        if FetchStaleInformation.is_posts_incremental() and fresh.has_recent_full_posts_sweep(slug):
+            for page in range(1, posts_total + 1):
+                f = fresh.valid('posts', slug, page)
+                if f is None:
+                    # Nächste Seite hängt vom Ergebnis dieser ab -> immer nur eine Seite
+                    tasks.append(cls({"type": "posts", "communitySlug": slug, "pageParam": page,
+                        "comment": f"Posts page {page}/{posts_total} (incremental refresh)"}))
+                    break
+                if f['changed_items'] == 0:
+                    break  # Seite brachte nichts Neues -> ältere Seiten sind unverändert
+            return tasks
 
-        # Phase 3: community about pages for other communities above threshold
-        tasks.extend(cls._generate_community_about_tasks())
+        for page in range(2, posts_total + 1):
+            if not fresh.valid('posts', slug, page):
+                tasks.append(cls({"type": "posts", "communitySlug": slug, "pageParam": page,
+                    "comment": f"Posts page {page}/{posts_total}"}))
         return tasks
 
     @classmethod
-    def _generate_profile_tasks(cls, slug: str) -> List["FetchTask"]:
+    def _generate_profile_tasks(cls, slug: str) -> Iterator["FetchTask"]:
         """Profile tasks for users active within max_user_inactive_days."""
-        tasks = []
         now = time.time()
         max_inactive = FetchStaleInformation.get_max_user_inactive_days()
         cutoff = now - (max_inactive * 86400)
         valid_ids = cls._get_valid_fetch_ids('profile', slug, 'user_skool_id')
+        cooldown_ids = cls._get_404_cooldown_ids('profile', slug, 'user_skool_id')
 
-        users = User.get_list("SELECT * FROM user WHERE community_slug = ?", [slug])
+        users = User.get_list("SELECT * FROM user_current WHERE community_slug = ?", [slug])
         for u in users:
             # Skip wenn User zu lange inaktiv
             if u.last_active:
@@ -282,21 +537,22 @@ class FetchTask(Model):
 
             if u.skool_id not in valid_ids:
                 # Skip if in 404 cooldown
-                if cls._should_skip_404_cooldown('profile', slug, user_id=u.skool_id):
+                if u.skool_id in cooldown_ids:
                     continue
-                tasks.append(cls({
+                yield cls({
                     "type": "profile",
                     "communitySlug": slug,
                     "userSkoolHexId": u.skool_id,
                     "userName": u.name,
                     "comment": f"Profile for user '{u.name}' (active in last {max_inactive} days)",
-                }))
-        return tasks
+                })
 
     @classmethod
-    def _generate_comment_tasks(cls, slug: str) -> List["FetchTask"]:
-        """Comment tasks for posts younger than comments_max_post_age_days with comments > 0."""
-        tasks = []
+    def _generate_comment_tasks(cls, slug: str) -> Iterator["FetchTask"]:
+        """
+        Comment tasks for posts younger than comments_max_post_age_days with comments > 0.
+        Große Threads werden per Cursor seitenweise geholt (next_cursor des letzten Fetches).
+        """
         now = time.time()
 
         # Get comments-specific cutoff (default 30 days)
@@ -310,14 +566,16 @@ class FetchTask(Model):
 
         # If 0, skip all comment fetching
         if max_days <= 0:
-            return tasks
+            return
 
         cutoff = now - (max_days * 86400)
-        valid_ids = cls._get_valid_fetch_ids('comments', slug, 'post_skool_id')
+        threshold = cls._stale_threshold('comments')
+        latest = cls._get_latest_comment_fetches(slug)
+        cooldown_ids = cls._get_404_cooldown_ids('comments', slug, 'post_skool_id')
 
         from datetime import datetime
         posts = Post.get_list(
-            "SELECT * FROM post WHERE community_slug = ? AND COALESCE(comments, 0) > 0",
+            "SELECT * FROM post_current WHERE community_slug = ? AND COALESCE(comments, 0) > 0",
             [slug]
         )
         for p in posts:
@@ -331,19 +589,43 @@ class FetchTask(Model):
             except:
                 continue  # Skip if date parsing fails
 
-            if p.skool_id not in valid_ids:
-                # Skip if in 404 cooldown
-                if cls._should_skip_404_cooldown('comments', slug, post_id=p.skool_id):
-                    continue
-                tasks.append(cls({
-                    "type": "comments",
-                    "communitySlug": slug,
-                    "postSkoolHexId": p.skool_id,
-                    "postName": p.name,
-                    "groupSkoolId": p.group_id,  # Skool UUID for api2.skool.com
-                    "comment": f"Comments for post '{p.name}' ({p.comments} comments, <{max_days}d old)",
-                }))
-        return tasks
+            last = latest.get(p.skool_id)
+            if last and last['next_cursor']:
+                # Thread noch nicht komplett -> nächste Seite, unabhängig von stale
+                cursor = last['next_cursor']
+                reason = "next page"
+            elif last and last['created_at'] > threshold:
+                continue  # komplett und frisch
+            elif last:
+                # Refresh: ab dem Cursor der letzten Seite weiter statt von vorne
+                cursor = last['cursor']
+                reason = "refresh from last page" if cursor else "refresh"
+            else:
+                cursor = ''
+                reason = "first page"
+            if p.skool_id in cooldown_ids:
+                continue
+            yield cls({
+                "type": "comments",
+                "communitySlug": slug,
+                "postSkoolHexId": p.skool_id,
+                "postName": p.name,
+                "groupSkoolId": p.group_id,  # Skool UUID for api2.skool.com
+                "cursor": cursor,
+                "comment": f"Comments for post '{p.name}' ({p.comments} comments, <{max_days}d old, {reason})",
+            })
+
+    @staticmethod
+    def _get_latest_comment_fetches(slug: str) -> dict:
+        """post_skool_id -> letzter ok comments-Fetch (created_at, cursor, next_cursor), eine Query.
+        Letzter = höchste id, created_at ist bei mehreren Seiten in derselben Sekunde gleich."""
+        rows = Model.query(
+            """SELECT post_skool_id, MAX(id) AS id, created_at, cursor, next_cursor FROM fetch
+               WHERE type = 'comments' AND community_slug = ? AND status = 'ok'
+               GROUP BY post_skool_id""",
+            [slug]
+        )
+        return {r['post_skool_id']: r for r in rows}
 
     @classmethod
     def _get_ever_fetched_ids(cls, fetch_type: str, slug: str, id_column: str) -> set:
@@ -355,9 +637,8 @@ class FetchTask(Model):
         return {getattr(r, id_column) for r in rows}
 
     @classmethod
-    def _generate_likes_tasks(cls, slug: str) -> List["FetchTask"]:
+    def _generate_likes_tasks(cls, slug: str) -> Iterator["FetchTask"]:
         """Likes tasks for posts younger than likes_max_post_age_days with upvotes > 0."""
-        tasks = []
         now = time.time()
 
         # Get likes-specific cutoff (default 30 days)
@@ -371,7 +652,7 @@ class FetchTask(Model):
 
         # If 0, skip all likes fetching
         if max_days <= 0:
-            return tasks
+            return
 
         # Check if comments should be fetched too
         fetch_comments = ConfigEntry.getByKey('likes_fetch_comments')
@@ -379,12 +660,13 @@ class FetchTask(Model):
 
         cutoff = now - (max_days * 86400)
         valid_ids = cls._get_valid_fetch_ids('likes', slug, 'post_skool_id')
+        cooldown_ids = cls._get_404_cooldown_ids('likes', slug, 'post_skool_id')
 
         # Build SQL based on whether comments should be fetched
         if include_comments:
-            sql = "SELECT * FROM post WHERE community_slug = ? AND COALESCE(upvotes, 0) > 0"
+            sql = "SELECT * FROM post_current WHERE community_slug = ? AND COALESCE(upvotes, 0) > 0"
         else:
-            sql = "SELECT * FROM post WHERE community_slug = ? AND COALESCE(is_toplevel, 0) = 1 AND COALESCE(upvotes, 0) > 0"
+            sql = "SELECT * FROM post_current WHERE community_slug = ? AND COALESCE(is_toplevel, 0) = 1 AND COALESCE(upvotes, 0) > 0"
         posts = Post.get_list(sql, [slug])
 
         from datetime import datetime
@@ -408,20 +690,19 @@ class FetchTask(Model):
                 continue
 
             # Skip if in 404 cooldown
-            if cls._should_skip_404_cooldown('likes', slug, post_id=p.skool_id):
+            if p.skool_id in cooldown_ids:
                 continue
 
             is_comment = not getattr(p, 'is_toplevel', False)
             post_type = "comment" if is_comment else "post"
-            tasks.append(cls({
+            yield cls({
                 "type": "likes",
                 "communitySlug": slug,
                 "postSkoolHexId": p.skool_id,
                 "postName": p.name,
                 "groupSkoolId": p.group_id,
                 "comment": f"Likes for {post_type} '{p.name}' ({p.upvotes} likes, <{max_days}d old)",
-            }))
-        return tasks
+            })
 
     @classmethod
     def _generate_community_about_tasks(cls) -> List["FetchTask"]:
@@ -429,8 +710,6 @@ class FetchTask(Model):
         Generate tasks to fetch about pages for other communities
         that have at least min_shared_members users.
         """
-        import json
-        from .profile import Profile
         tasks = []
 
         # Get min_shared_members threshold from settings (default 10)
@@ -442,45 +721,34 @@ class FetchTask(Model):
             except:
                 pass
 
-        # Calculate shared_user_count on-demand from profiles
-        profiles = Profile.get_list("SELECT skool_id, groups_member_of FROM profile WHERE groups_member_of != ''", [])
-        slug_users = {}  # slug -> set of skool_ids
-        for p in profiles:
-            groups = json.loads(p.groups_member_of) if p.groups_member_of else []
-            if not groups:
-                continue
-            for g in groups:
-                slug = g.get('name', '')
-                if slug:
-                    if slug not in slug_users:
-                        slug_users[slug] = set()
-                    slug_users[slug].add(p.skool_id)
-
-        # Get communities that haven't been fetched recently
+        # Get communities that haven't been fetched recently, shared_user_count aus profile_group
         threshold = cls._stale_threshold('community_about')
-        communities = OtherCommunity.get_list(
-            "SELECT * FROM othercommunity WHERE about_fetched = 0",
-            []
+        rows = Model.query(
+            """SELECT c.slug, COUNT(g.skool_id) AS shared_count
+               FROM othercommunity c LEFT JOIN profile_group g ON g.group_slug = c.slug
+               WHERE c.about_fetched = 0
+               GROUP BY c.id
+               HAVING shared_count >= ?
+               ORDER BY c.id""",
+            [min_threshold]
         )
 
-        for oc in communities:
-            shared_count = len(slug_users.get(oc.slug, set()))
-            if shared_count < min_threshold:
-                continue
+        for oc in rows:
+            slug, shared_count = oc['slug'], oc['shared_count']
 
             # Check if we have a recent fetch for this community's about page
             recent_fetch = Fetch.get_list(
                 "SELECT * FROM fetch WHERE type = 'community_about' AND community_slug = ? AND status = 'ok' AND created_at > ?",
-                [oc.slug, threshold]
+                [slug, threshold]
             )
             if not recent_fetch:
                 # Skip if in 404 cooldown
-                if cls._should_skip_404_cooldown('community_about', oc.slug):
+                if cls._should_skip_404_cooldown('community_about', slug):
                     continue
                 tasks.append(cls({
                     "type": "community_about",
-                    "communitySlug": oc.slug,
-                    "comment": f"About page for '{oc.slug}' ({shared_count} shared members)",
+                    "communitySlug": slug,
+                    "comment": f"About page for '{slug}' ({shared_count} shared members)",
                 }))
 
         return tasks
@@ -0,0 +1,113 @@
+"""
+LRU-Cache für Filter-Ergebnisse (User.filtered, Trefferanzahl der Member- und Post-Seiten).
+Key = normalisierter Filter-Zustand (SqlFilter.to_state(), JSON mit sortierten Keys), gültig für
+eine Daten-Version (src/data_version.py) - ändert sich die Version, wird der ganze Cache verworfen.
+Begrenzt über die geschätzte Größe der gecachten User (MAX_BYTES), nicht über die Anzahl.
+Zeitfilter (active_since, joined_* ...) sind relativ zu jetzt -> Einträge laufen zusätzlich nach MAX_AGE ab.
+Der Key kommt aus SqlFilter.cache_key(): Graph-Sortierungen tragen darin den graph_metric-Stand der
+Community (MembersFilter), ein neuer Stand trifft also nur diese Einträge, nicht den ganzen Cache.
+
+Gecachte Listen werden geteilt: Aufrufer dürfen die User-Objekte nicht verändern.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from src import data_version
+from src.sql_filter import SqlFilter
+
+_lock = threading.Lock()
+
+
+def _size(value) -> int:
+    """Grobe Größe in Bytes: Listen von Models über ihre Attribute, sonst sys.getsizeof."""
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(
+            sys.getsizeof(v.__dict__) + sum(sys.getsizeof(a) for a in v.__dict__.values()) for v in value)
+    return sys.getsizeof(value)
+
+
+class FilterCache:
+    MAX_BYTES = 64 * 1024 * 1024
+    MAX_AGE = 300  # Sekunden
+
+    _entries: OrderedDict = OrderedDict()  # (kind, key) -> (value, size, erstellt)
+    _version = 0
+    _bytes = 0
+    hits = 0
+    misses = 0
+
+    @staticmethod
+    def key(f: SqlFilter) -> str:
+        return f.cache_key()
+
+    @classmethod
+    def _sync_version(cls) -> None:
+        """Unter _lock: bei neuer Daten-Version alles verwerfen."""
+        version = data_version.current()
+        if version != cls._version:
+            cls._entries.clear()
+            cls._bytes = 0
+            cls._version = version
+
+    @classmethod
+    def peek(cls, kind: str, f: SqlFilter):
+        """Gecachter Wert oder None - zählt als Hit, aber nicht als Miss."""
+        return cls._peek((kind, cls.key(f)))
+
+    @classmethod
+    def _peek(cls, k: tuple):
+        with _lock:
+            cls._sync_version()
+            entry = cls._entries.get(k)
+            if entry is None:
+                return None
+            if time.time() - entry[2] > cls.MAX_AGE:
+                cls._bytes -= cls._entries.pop(k)[1]
+                return None
+            cls._entries.move_to_end(k)
+            cls.hits += 1
+            return entry[0]
+
+    @classmethod
+    def get(cls, kind: str, f: SqlFilter, compute: Callable):
+        """Wert aus dem Cache oder compute() (ohne Lock ausgeführt) und ablegen."""
+        # Key vor compute(): kommt während compute() ein neuer graph_metric-Stand, landet das Ergebnis unter dem alten
+        k = (kind, cls.key(f))
+        value = cls._peek(k)
+        if value is not None:
+            return value
+        version = data_version.current()
+        value = compute()
+        size = _size(value)
+        with _lock:
+            cls.misses += 1
+            cls._sync_version()
+            # Daten haben sich während compute() geändert oder Eintrag sprengt den Cache -> nicht ablegen
+            if version != cls._version or size > cls.MAX_BYTES:
+                return value
+            if k in cls._entries:
+                cls._bytes -= cls._entries[k][1]
+            cls._entries[k] = (value, size, time.time())
+            cls._bytes += size
+            while cls._bytes > cls.MAX_BYTES:
+                _, (_, evicted, _) = cls._entries.popitem(last=False)
+                cls._bytes -= evicted
+        return value
+
+    @classmethod
+    def stats(cls) -> dict:
+        with _lock:
+            cls._sync_version()
+            return {'hits': cls.hits, 'misses': cls.misses, 'entries': len(cls._entries),
+                    'bytes': cls._bytes, 'max_bytes': cls.MAX_BYTES, 'data_version': cls._version}
+
+    @classmethod
+    def reset(cls) -> None:
+        with _lock:
+            cls._entries.clear()
+            cls._bytes = 0
+            cls.hits = 0
+            cls.misses = 0
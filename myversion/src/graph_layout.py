@@ -0,0 +1,243 @@
+"""
+Vorberechnetes Layout und Level of Detail für /api/graph/interactions.
+
+Statt vis.js-Physik im Browser (bricht ab ein paar tausend Knoten ein) liefert der Server Positionen
+(x, y) pro Knoten und dünnt die Kanten aus:
+
+    positions(community, nodes, edges)   Force-Directed (Fruchterman-Reingold), gestartet vom
+                                         Cluster-Layout (src/graph_metrics.py); gecacht pro Community,
+                                         Knotenmenge und Daten-Version
+    prune(edges, top_k, min_weight)      nur Kanten mit weight >= min_weight, davon pro Knoten die
+                                         top_k stärksten (Kante bleibt, wenn sie für eines ihrer Enden zählt)
+
+Das Layout hängt nur von Knoten und allen Kanten ab, nicht vom Level of Detail - beim Wechsel der
+Detailstufe bleiben die Positionen gleich.
+
+NumPy steht in requirements.txt (und landet damit im Nuitka-Build): damit laufen die Kräfte vektorisiert
+(Abstoßung blockweise, Speicher O(BLOCK * n)). Fehlt es trotzdem (z.B. Dev-Umgebung), wird in reinem Python
+iteriert. Die Abstoßung ist exakt, also O(n²) pro Iteration, und läuft im Request-Thread: das Force-Layout
+bekommen deshalb höchstens FORCE_MAX_NODES (NumPy) bzw. PY_MAX_NODES Knoten - die mit dem größten
+Kantengewicht. Die übrigen landen neben ihrem stärksten Nachbarn aus diesem Kern, ohne Nachbarn dort bleibt
+die Position aus dem Cluster-Layout.
+"""
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+try:
+    import numpy  # requirements.txt; ohne nur kleine Graphen mit Force-Layout
+except ImportError:
+    numpy = None
+
+from src import data_version, graph_metrics
+
+SCALE = 1000.0        # Koordinaten in [-SCALE, SCALE]
+ITERATIONS = 60
+GRAVITY = 1.0         # Zug zur Mitte, hält Knoten ohne Kanten im Radius ~ sqrt(n)
+BLOCK = 512           # Zeilen pro Block der Abstoßungs-Matrix
+FORCE_MAX_NODES = 1500  # Knoten im Force-Layout mit NumPy (~1 s), der Rest wird angehängt
+PY_MAX_NODES = 200      # dasselbe ohne NumPy
+MAX_ENTRIES = 16
+GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+_lock = threading.Lock()
+_cache: OrderedDict = OrderedDict()  # (community, Knoten-Hash) -> {skool_id: (x, y)}
+_version = 0
+
+
+def _sunflower(i: int, count: int) -> Tuple[float, float]:
+    """Punkt i von count gleichmäßig auf der Einheitsscheibe (Vogel-Spirale)."""
+    r = math.sqrt((i + 0.5) / count)
+    return r * math.cos(i * GOLDEN_ANGLE), r * math.sin(i * GOLDEN_ANGLE)
+
+
+def cluster_layout(community: str, nodes: List[str]) -> List[Tuple[float, float]]:
+    """Cluster (graph_metrics) als Scheiben auf einer Spirale, größter in der Mitte; Mitglieder darin verteilt."""
+    metrics = graph_metrics.stored(community)
+    members: Dict[int, List[int]] = {}
+    for i, s in enumerate(nodes):
+        members.setdefault(metrics.get(s, {}).get('cluster', 0), []).append(i)
+    clusters = sorted(members, key=lambda c: (-len(members[c]), c))
+    positions = [(0.0, 0.0)] * len(nodes)
+    # Fläche der Cluster ~ Größe: Zentren auf der Spirale mit Abstand nach Wurzel der größten Cluster
+    spacing = 2.2 * math.sqrt(len(members[clusters[0]])) if clusters else 1.0
+    for rank, c in enumerate(clusters):
+        cx, cy = _sunflower(rank, len(clusters))
+        cx, cy = cx * spacing * math.sqrt(len(clusters)), cy * spacing * math.sqrt(len(clusters))
+        radius = math.sqrt(len(members[c]))
+        for j, i in enumerate(members[c]):
+            x, y = _sunflower(j, len(members[c]))
+            positions[i] = (cx + x * radius, cy + y * radius)
+    return positions
+
+
+def _force_numpy(pos, sources, targets, weights, k: float):
+    pos = numpy.array(pos, dtype=float)
+    n = len(pos)
+    sources, targets = numpy.array(sources, dtype=numpy.int64), numpy.array(targets, dtype=numpy.int64)
+    weights = numpy.log1p(numpy.array(weights, dtype=float))
+    temperature = (pos.max(axis=0) - pos.min(axis=0)).max() / 10 or 1.0
+    for step in range(ITERATIONS):
+        # Abstoßung sum_j (p_i - p_j) * k²/d²  =  p_i * sum_j f_ij - (f @ p)_i, Abstände per Matrixprodukt
+        norms = (pos ** 2).sum(axis=1)
+        disp = numpy.empty_like(pos)
+        for start in range(0, n, BLOCK):
+            block = pos[start:start + BLOCK]
+            dist2 = norms[start:start + BLOCK, None] + norms[None, :] - 2 * block @ pos.T
+            f = k * k / numpy.maximum(dist2, 1e-4)
+            f[numpy.arange(len(block)), numpy.arange(start, start + len(block))] = 0
+            disp[start:start + BLOCK] = block * f.sum(axis=1)[:, None] - f @ pos
+        disp -= GRAVITY * (pos - pos.mean(axis=0))
+        delta = pos[sources] - pos[targets]
+        dist = numpy.maximum(numpy.sqrt((delta ** 2).sum(axis=1)), 1e-2)
+        pull = delta * (dist * weights / k)[:, None]
+        numpy.add.at(disp, sources, -pull)
+        numpy.add.at(disp, targets, pull)
+        length = numpy.maximum(numpy.sqrt((disp ** 2).sum(axis=1)), 1e-9)
+        pos += disp / length[:, None] * numpy.minimum(length, temperature)[:, None]
+        temperature *= 1 - (step + 1) / (ITERATIONS + 1)
+    return [tuple(p) for p in pos.tolist()]
+
+
+def _force_python(pos, sources, targets, weights, k: float):
+    pos = [list(p) for p in pos]
+    n = len(pos)
+    weights = [math.log1p(w) for w in weights]
+    xs, ys = [p[0] for p in pos], [p[1] for p in pos]
+    temperature = max(max(xs) - min(xs), max(ys) - min(ys)) / 10 or 1.0
+    for step in range(ITERATIONS):
+        disp = [[0.0, 0.0] for _ in range(n)]
+        for i in range(n):
+            xi, yi = pos[i]
+            for j in range(i + 1, n):
+                dx, dy = xi - pos[j][0], yi - pos[j][1]
+                f = k * k / max(dx * dx + dy * dy, 1e-4)
+                disp[i][0] += dx * f
+                disp[i][1] += dy * f
+                disp[j][0] -= dx * f
+                disp[j][1] -= dy * f
+        cx, cy = sum(p[0] for p in pos) / n, sum(p[1] for p in pos) / n
+        for p, d in zip(pos, disp):
+            d[0] -= GRAVITY * (p[0] - cx)
+            d[1] -= GRAVITY * (p[1] - cy)
+        for s, t, w in zip(sources, targets, weights):
+            dx, dy = pos[s][0] - pos[t][0], pos[s][1] - pos[t][1]
+            f = max(math.hypot(dx, dy), 1e-2) * w / k
+            disp[s][0] -= dx * f
+            disp[s][1] -= dy * f
+            disp[t][0] += dx * f
+            disp[t][1] += dy * f
+        for p, (dx, dy) in zip(pos, disp):
+            length = max(math.hypot(dx, dy), 1e-9)
+            p[0] += dx / length * min(length, temperature)
+            p[1] += dy / length * min(length, temperature)
+        temperature *= 1 - (step + 1) / (ITERATIONS + 1)
+    return [tuple(p) for p in pos]
+
+
+def _core(n: int, pairs: Dict[Tuple[int, int], float], limit: int) -> List[int]:
+    """Die limit Knoten mit dem größten Kantengewicht (bei Gleichstand der kleinere Index), aufsteigend."""
+    strength = [0.0] * n
+    for (s, t), w in pairs.items():
+        strength[s] += w
+        strength[t] += w
+    return sorted(sorted(range(n), key=lambda i: (-strength[i], i))[:limit])
+
+
+def _attach(pos: List[Tuple[float, float]], core: List[int], pairs: Dict[Tuple[int, int], float]) -> None:
+    """Knoten außerhalb des Kerns als kleine Scheibe um ihren stärksten Nachbarn im Kern."""
+    in_core = set(core)
+    best: Dict[int, Tuple[float, int]] = {}  # Knoten -> (Gewicht, Nachbar im Kern)
+    for (s, t), w in pairs.items():
+        for node, other in ((s, t), (t, s)):
+            if node in in_core or other not in in_core:
+                continue
+            # stärkster Nachbar, bei Gleichstand der kleinere Index -> deterministisch
+            if node not in best or (w, -other) > (best[node][0], -best[node][1]):
+                best[node] = (w, other)
+    satellites: Dict[int, List[int]] = {}
+    for node in sorted(best):
+        satellites.setdefault(best[node][1], []).append(node)
+    for hub, members in satellites.items():
+        radius = math.sqrt(len(members))
+        for j, node in enumerate(members):
+            x, y = _sunflower(j, len(members))
+            pos[node] = (pos[hub][0] + x * radius, pos[hub][1] + y * radius)
+
+
+def compute(community: str, nodes: List[str], edges: List[dict]) -> Dict[str, Tuple[float, float]]:
+    """Positionen für nodes (skool_ids) mit edges ({source, target, weight}), skaliert auf [-SCALE, SCALE]."""
+    if not nodes:
+        return {}
+    pos = cluster_layout(community, nodes)
+    index = {s: i for i, s in enumerate(nodes)}
+    pairs: Dict[Tuple[int, int], float] = {}
+    for e in edges:
+        s, t = index.get(e['source']), index.get(e['target'])
+        if s is not None and t is not None and s != t:
+            key = (min(s, t), max(s, t))
+            pairs[key] = pairs.get(key, 0) + e['weight']
+    limit = FORCE_MAX_NODES if numpy is not None else PY_MAX_NODES
+    core = list(range(len(nodes))) if len(nodes) <= limit else _core(len(nodes), pairs, limit)
+    local = {i: j for j, i in enumerate(core)}
+    core_pairs = [(local[s], local[t], w) for (s, t), w in pairs.items() if s in local and t in local]
+    sources, targets = [s for s, _, _ in core_pairs], [t for _, t, _ in core_pairs]
+    weights = [w for _, _, w in core_pairs]
+    k = 1.0  # Cluster-Layout: ein Knoten pro Flächeneinheit
+    force = _force_numpy if numpy is not None else _force_python
+    for i, p in zip(core, force([pos[i] for i in core], sources, targets, weights, k)):
+        pos[i] = p
+    if len(core) < len(nodes):
+        _attach(pos, core, pairs)
+    cx = sum(x for x, _ in pos) / len(pos)
+    cy = sum(y for _, y in pos) / len(pos)
+    extent = max(max(abs(x - cx), abs(y - cy)) for x, y in pos) or 1.0
+    return {s: (round((x - cx) / extent * SCALE, 1), round((y - cy) / extent * SCALE, 1))
+            for s, (x, y) in zip(nodes, pos)}
+
+
+def positions(community: str, nodes: List[str], edges: List[dict]) -> Dict[str, Tuple[float, float]]:
+    """compute() gecacht pro (Community, Knotenmenge) für die aktuelle Daten-Version (nicht verändern)."""
+    global _version
+    version = data_version.current()
+    key = (community, hashlib.sha1('\n'.join(sorted(nodes)).encode()).hexdigest())
+    with _lock:
+        if version != _version:
+            _cache.clear()
+            _version = version
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    result = compute(community, nodes, edges)
+    with _lock:
+        if version == _version:
+            _cache[key] = result
+            while len(_cache) > MAX_ENTRIES:
+                _cache.popitem(last=False)
+    return result
+
+
+def prune(edges: List[dict], top_k: int = 0, min_weight: int = 0) -> List[dict]:
+    """
+    Level of Detail: Kanten mit weight >= min_weight, bei top_k > 0 nur die, die für Quelle oder Ziel
+    unter den top_k stärksten sind (Gleichstand -> zuerst nach source/target). Reihenfolge bleibt.
+    """
+    edges = [e for e in edges if e['weight'] >= min_weight]
+    if top_k <= 0:
+        return edges
+    incident: Dict[str, List[int]] = {}
+    for i, e in enumerate(edges):
+        incident.setdefault(e['source'], []).append(i)
+        incident.setdefault(e['target'], []).append(i)
+    keep = set()
+    for ids in incident.values():
+        ids.sort(key=lambda i: (-edges[i]['weight'], edges[i]['source'], edges[i]['target']))
+        keep.update(ids[:top_k])
+    return [e for i, e in enumerate(edges) if i in keep]
+
+
+def reset() -> None:
+    with _lock:
+        _cache.clear()
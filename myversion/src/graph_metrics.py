@@ -0,0 +1,318 @@
+"""
+Graph-Kennzahlen pro Community über die Interaktions-Kanten (src/interaction_edges.py):
+PageRank (gewichtet), In-/Out-Degree, Betweenness (approximiert) und Cluster per Label Propagation.
+
+    graph_metric(community_slug, skool_id, pagerank, in_degree, out_degree, betweenness, cluster)
+
+Knoten sind alle Members der Community (user_current), Kanten source -> target mit der Summe der
+like- und comment-Gewichte (Einfluss fließt zum Post-Autor). Berechnet wird auf der ganzen Community,
+nicht auf einer Selektion - die Werte sind als Knoten-Attribute in /api/graph/interactions und als
+Sortierung im MembersFilter (pagerank_desc, betweenness_desc, ...) vergleichbar.
+
+Ergebnisse gelten für eine Daten-Version (src/data_version.py): metrics() rechnet beim ersten Zugriff
+nach einer Änderung neu und schreibt graph_metric (für ORDER BY im MembersFilter).
+Requests warten darauf nicht: die Members-Sortierung (snapshot()) und der Graph (stored()) nehmen den
+letzten Stand aus graph_metric, neu gerechnet wird im Hintergrund - für die Sortierung höchstens alle
+REFRESH_INTERVAL Sekunden, für den Graph sobald er veraltet ist (GRAPH_REFRESH_INTERVAL). Synchron nur,
+solange es für die Community noch keine Zeilen gibt. stored_version() zählt die gespeicherten Stände
+pro Community; der FilterCache hat ihn im Key der Graph-Sortierungen.
+
+NumPy (requirements.txt) rechnet PageRank vektorisiert; fehlt es, wird über dieselbe CSR-Struktur in reinem Python iteriert.
+"""
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Set, Tuple
+
+try:
+    import numpy  # optional, nur für PageRank
+except ImportError:
+    numpy = None
+
+from model import Model
+from src import data_version
+
+TABLE = 'graph_metric'
+COLUMNS = ('pagerank', 'in_degree', 'out_degree', 'betweenness', 'cluster')
+
+DAMPING = 0.85
+PAGERANK_TOL = 1e-9
+PAGERANK_MAX_ITER = 100
+BETWEENNESS_SAMPLES = 128    # Quellknoten für Brandes; kleinere Graphen exakt
+LABEL_MAX_ROUNDS = 30
+SEED = 42                    # deterministische Stichprobe/Reihenfolge -> stabile Cluster-Nummern
+REFRESH_INTERVAL = 300       # Sekunden zwischen zwei Hintergrund-Neuberechnungen für snapshot()
+GRAPH_REFRESH_INTERVAL = 0   # der Graph zeigt Kennzahlen an: veraltet -> gleich im Hintergrund neu rechnen
+
+_lock = threading.Lock()
+_cache: Dict[str, Tuple[int, Dict[str, dict]]] = {}  # community -> (Daten-Version, {skool_id: Kennzahlen})
+_computed_at: Dict[str, float] = {}  # community -> Start der letzten Berechnung
+_refreshing: Set[str] = set()        # Communities mit laufender Hintergrund-Berechnung
+_generation = 0                      # reset() -> laufende Hintergrund-Berechnungen schreiben nicht mehr
+_stored: Dict[str, Tuple[int, Dict[str, dict]]] = {}  # community -> (Stand-Nummer, zuletzt gespeichert)
+_store_counter = 0
+
+
+def ensure_tables() -> None:
+    conn = Model.connect()
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {TABLE} (
+        community_slug TEXT, skool_id TEXT, pagerank REAL DEFAULT 0, in_degree INTEGER DEFAULT 0,
+        out_degree INTEGER DEFAULT 0, betweenness REAL DEFAULT 0, cluster INTEGER DEFAULT 0,
+        PRIMARY KEY (community_slug, skool_id)) WITHOUT ROWID""")
+    conn.commit()
+
+
+class Csr:
+    """Gerichteter Graph als CSR: Nachbarn von i sind indices[indptr[i]:indptr[i+1]] mit weights."""
+
+    def __init__(self, n: int, edges: List[Tuple[int, int, float]]):
+        self.n = n
+        edges = sorted(edges)
+        self.indptr = [0] * (n + 1)
+        for s, _, _ in edges:
+            self.indptr[s + 1] += 1
+        for i in range(n):
+            self.indptr[i + 1] += self.indptr[i]
+        self.indices = [t for _, t, _ in edges]
+        self.weights = [w for _, _, w in edges]
+
+    def neighbors(self, i: int) -> range:
+        return range(self.indptr[i], self.indptr[i + 1])
+
+    def transpose(self) -> 'Csr':
+        return Csr(self.n, [(self.indices[k], s, self.weights[k]) for s in range(self.n) for k in self.neighbors(s)])
+
+
+def _load(community: str) -> Tuple[List[str], Csr]:
+    nodes = [r['skool_id'] for r in Model.query(
+        "SELECT skool_id FROM user_current WHERE community_slug = ? ORDER BY skool_id", [community])]
+    index = {s: i for i, s in enumerate(nodes)}
+    rows = Model.query(
+        """SELECT source, target, SUM(weight) AS weight FROM interaction_edge
+           WHERE community_slug = ? GROUP BY source, target""", [community])
+    edges = [(index[r['source']], index[r['target']], float(r['weight'])) for r in rows
+             if r['source'] in index and r['target'] in index and r['weight'] > 0]
+    return nodes, Csr(len(nodes), edges)
+
+
+def pagerank(g: Csr) -> List[float]:
+    """Gewichteter PageRank, Summe 1. Knoten ohne ausgehende Kanten verteilen gleichmäßig."""
+    n = g.n
+    if n == 0:
+        return []
+    out_weight = [sum(g.weights[k] for k in g.neighbors(i)) for i in range(n)]
+    if numpy is not None:
+        sources = numpy.repeat(numpy.arange(n), numpy.diff(numpy.array(g.indptr)))
+        targets = numpy.array(g.indices, dtype=numpy.int64)
+        out = numpy.array(out_weight)
+        share = numpy.array(g.weights) / out[sources] if len(sources) else numpy.zeros(0)
+        dangling = out == 0
+        rank = numpy.full(n, 1.0 / n)
+        for _ in range(PAGERANK_MAX_ITER):
+            flow = numpy.bincount(targets, weights=rank[sources] * share, minlength=n)
+            new = (1 - DAMPING) / n + DAMPING * (flow + rank[dangling].sum() / n)
+            done = numpy.abs(new - rank).sum() < PAGERANK_TOL
+            rank = new
+            if done:
+                break
+        return rank.tolist()
+    rank = [1.0 / n] * n
+    for _ in range(PAGERANK_MAX_ITER):
+        dangling = sum(rank[i] for i in range(n) if out_weight[i] == 0)
+        new = [(1 - DAMPING) / n + DAMPING * dangling / n] * n
+        for i in range(n):
+            if out_weight[i]:
+                factor = DAMPING * rank[i] / out_weight[i]
+                for k in g.neighbors(i):
+                    new[g.indices[k]] += factor * g.weights[k]
+        done = sum(abs(a - b) for a, b in zip(new, rank)) < PAGERANK_TOL
+        rank = new
+        if done:
+            break
+    return rank
+
+
+def betweenness(g: Csr, samples: int = BETWEENNESS_SAMPLES) -> List[float]:
+    """
+    Betweenness (gerichtet, ungewichtet, normiert auf 0..1) nach Brandes, bei mehr als samples Knoten
+    über eine Stichprobe von Quellknoten hochgerechnet.
+    """
+    n = g.n
+    score = [0.0] * n
+    if n < 3:
+        return score
+    sources = list(range(n))
+    if n > samples:
+        sources = random.Random(SEED).sample(sources, samples)
+    for s in sources:
+        order, preds = [], [[] for _ in range(n)]
+        sigma, dist = [0] * n, [-1] * n
+        sigma[s], dist[s] = 1, 0
+        queue = deque([s])
+        while queue:
+            v = queue.popleft()
+            order.append(v)
+            for k in g.neighbors(v):
+                w = g.indices[k]
+                if dist[w] < 0:
+                    dist[w] = dist[v] + 1
+                    queue.append(w)
+                if dist[w] == dist[v] + 1:
+                    sigma[w] += sigma[v]
+                    preds[w].append(v)
+        delta = [0.0] * n
+        for w in reversed(order):
+            for v in preds[w]:
+                delta[v] += sigma[v] / sigma[w] * (1 + delta[w])
+            if w != s:
+                score[w] += delta[w]
+    scale = n / len(sources) / ((n - 1) * (n - 2))
+    return [b * scale for b in score]
+
+
+def label_propagation(g: Csr) -> List[int]:
+    """
+    Cluster per Label Propagation auf dem ungerichteten, gewichteten Graph. Cluster-Nummern nach Größe
+    absteigend (0 = größter), Knoten ohne Kanten bilden eigene Cluster.
+    """
+    n = g.n
+    gt = g.transpose()
+    labels = list(range(n))
+    order = list(range(n))
+    rng = random.Random(SEED)
+    for _ in range(LABEL_MAX_ROUNDS):
+        rng.shuffle(order)
+        changed = False
+        for i in order:
+            votes = {}
+            for graph in (g, gt):
+                for k in graph.neighbors(i):
+                    label = labels[graph.indices[k]]
+                    votes[label] = votes.get(label, 0) + graph.weights[k]
+            if not votes:
+                continue
+            best = max(votes.values())
+            if votes.get(labels[i]) == best:
+                continue
+            labels[i] = min(label for label, v in votes.items() if v == best)
+            changed = True
+        if not changed:
+            break
+    sizes = {}
+    for label in labels:
+        sizes[label] = sizes.get(label, 0) + 1
+    ranked = sorted(sizes, key=lambda label: (-sizes[label], label))
+    number = {label: i for i, label in enumerate(ranked)}
+    return [number[label] for label in labels]
+
+
+def compute(community: str) -> Dict[str, dict]:
+    """Alle Kennzahlen der Community -> {skool_id: {pagerank, in_degree, out_degree, betweenness, cluster}}."""
+    nodes, g = _load(community)
+    ranks = pagerank(g)
+    between = betweenness(g)
+    clusters = label_propagation(g)
+    in_degree = [0] * g.n
+    for t in g.indices:
+        in_degree[t] += 1
+    return {s: {'pagerank': ranks[i], 'in_degree': in_degree[i], 'out_degree': g.indptr[i + 1] - g.indptr[i],
+                'betweenness': between[i], 'cluster': clusters[i]}
+            for i, s in enumerate(nodes)}
+
+
+def _store(community: str, result: Dict[str, dict]) -> None:
+    global _store_counter
+    conn = Model.connect()
+    conn.execute(f"DELETE FROM {TABLE} WHERE community_slug = ?", [community])
+    conn.executemany(
+        f"INSERT INTO {TABLE} (community_slug, skool_id, {', '.join(COLUMNS)}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [[community, s] + [m[c] for c in COLUMNS] for s, m in result.items()])
+    conn.commit()
+    with _lock:
+        _store_counter += 1
+        _stored[community] = (_store_counter, result)
+
+
+def stored_version(community: str) -> int:
+    """Nummer des gespeicherten Stands der Community (0 = noch keiner in diesem Prozess)."""
+    with _lock:
+        entry = _stored.get(community)
+    return entry[0] if entry else 0
+
+
+def stored(community: str) -> Dict[str, dict]:
+    """
+    Letzter gespeicherter Stand für die Anzeige (nicht verändern), ohne auf compute() zu warten;
+    veraltet wird im Hintergrund neu gerechnet.
+    """
+    snapshot(community, GRAPH_REFRESH_INTERVAL)
+    with _lock:
+        entry = _stored.get(community)
+    if entry is not None:
+        return entry[1]
+    # gespeichert von einem früheren Prozess
+    rows = Model.query(f"SELECT skool_id, {', '.join(COLUMNS)} FROM {TABLE} WHERE community_slug = ?", [community])
+    result = {r['skool_id']: {c: r[c] for c in COLUMNS} for r in rows}
+    with _lock:
+        return _stored.setdefault(community, (0, result))[1]
+
+
+def metrics(community: str) -> Dict[str, dict]:
+    """Kennzahlen der Community für die aktuelle Daten-Version (gecacht, Ergebnis nicht verändern)."""
+    version = data_version.current()
+    with _lock:
+        entry = _cache.get(community)
+        if entry and entry[0] == version:
+            return entry[1]
+        generation = _generation
+        _computed_at[community] = time.time()
+    result = compute(community)
+    with _lock:
+        if generation != _generation:
+            return result  # reset() während compute(): nichts mehr schreiben
+    _store(community, result)
+    with _lock:
+        # Daten haben sich während compute() geändert -> nicht ablegen, nächster Zugriff rechnet neu
+        if version == data_version.current():
+            _cache[community] = (version, result)
+    return result
+
+
+def _refresh(community: str) -> None:
+    try:
+        metrics(community)
+    finally:
+        with _lock:
+            _refreshing.discard(community)
+
+
+def snapshot(community: str, interval: float = REFRESH_INTERVAL) -> None:
+    """
+    graph_metric für die Members-Sortierung bereitstellen, ohne auf die Berechnung zu warten: ein älterer
+    Stand reicht, veraltet wird höchstens alle interval Sekunden im Hintergrund neu gerechnet.
+    """
+    with _lock:
+        entry = _cache.get(community)
+        if entry and entry[0] == data_version.current() or community in _refreshing:
+            return
+        due = time.time() - _computed_at.get(community, 0) >= interval
+    if not Model.query(f"SELECT 1 AS stored FROM {TABLE} WHERE community_slug = ? LIMIT 1", [community]):
+        metrics(community)  # noch nichts zum Sortieren da
+        return
+    if not due:
+        return
+    with _lock:
+        if community in _refreshing:
+            return
+        _refreshing.add(community)
+    threading.Thread(target=_refresh, args=(community,), daemon=True).start()
+
+
+def reset() -> None:
+    global _generation
+    with _lock:
+        _cache.clear()
+        _computed_at.clear()
+        _stored.clear()
+        _generation += 1
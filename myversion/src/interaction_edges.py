@@ -0,0 +1,123 @@
+"""
+Interaktions-Kanten für den Graph (/api/graph/interactions), inkrementell gepflegt statt pro Request
+über die ganze Community aggregiert.
+
+    interaction_edge(community_slug, source, target, kind, weight, last_at)
+        kind 'like':    source hat Posts von target geliked, weight = Anzahl like-Rows
+                        (über post_current.user_id), last_at = neuestes fetched_at
+        kind 'comment': source hat unter Top-Level-Posts von target kommentiert, weight = Anzahl
+                        Kommentare (post_current), last_at = neuestes skool_created_at (epoch)
+        Keine Self-Edges.
+
+Gepflegt pro Ziel-User: refresh_targets() rechnet alle Kanten in die betroffenen Post-Autoren neu
+(über die Indexe auf post_current.user_id/root_id und like.post_skool_id). Betroffen sind nach einem
+likes-Fetch der Autor des Posts, nach posts/comments-Fetches die Autoren der Posts bzw. der Root-Posts.
+"""
+from model import Model
+
+TABLE = 'interaction_edge'
+CHUNK = 500  # SQLite-Variablenlimit
+
+
+def ensure_tables() -> None:
+    """Legt Tabelle + Indexe an (nach current_state.ensure_tables). Neu angelegt -> aus dem Bestand füllen."""
+    conn = Model.connect()
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [TABLE]).fetchone()
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {TABLE} (
+        community_slug TEXT, source TEXT, target TEXT, kind TEXT,
+        weight INTEGER DEFAULT 0, last_at INTEGER DEFAULT 0,
+        PRIMARY KEY (community_slug, source, target, kind)) WITHOUT ROWID""")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_target ON {TABLE} (community_slug, target)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_like_post ON like (post_skool_id)")
+    if not exists:
+        rebuild(commit=False)
+    conn.commit()
+
+
+def refresh_targets(community_slug: str, targets: list[str]) -> None:
+    """Alle Kanten der Community in die Ziel-User targets neu berechnen (ohne Commit)."""
+    conn = Model.connect()
+    targets = sorted({t for t in targets if t})
+    for i in range(0, len(targets), CHUNK):
+        batch = targets[i:i + CHUNK]
+        placeholders = ','.join(['?'] * len(batch))
+        conn.execute(f"DELETE FROM {TABLE} WHERE community_slug = ? AND target IN ({placeholders})",
+                     [community_slug] + batch)
+        conn.execute(
+            f"""INSERT INTO {TABLE} (community_slug, source, target, kind, weight, last_at)
+                SELECT l.community_slug, l.user_skool_id, p.user_id, 'like', COUNT(*), MAX(l.fetched_at)
+                FROM post_current p JOIN like l ON l.post_skool_id = p.skool_id
+                WHERE p.user_id IN ({placeholders}) AND l.community_slug = ? AND l.user_skool_id != p.user_id
+                GROUP BY l.user_skool_id, p.user_id""",
+            batch + [community_slug]
+        )
+        conn.execute(
+            f"""INSERT INTO {TABLE} (community_slug, source, target, kind, weight, last_at)
+                SELECT c.community_slug, c.user_id, p.user_id, 'comment', COUNT(*),
+                       COALESCE(MAX(CAST(strftime('%s', NULLIF(c.skool_created_at, '')) AS INTEGER)), 0)
+                FROM post_current p JOIN post_current c ON c.root_id = p.skool_id
+                WHERE p.user_id IN ({placeholders}) AND p.is_toplevel = 1
+                  AND c.is_toplevel = 0 AND c.community_slug = ? AND c.user_id != p.user_id
+                GROUP BY c.user_id, p.user_id""",
+            batch + [community_slug]
+        )
+
+
+def _refresh(rows: list[dict]) -> None:
+    """rows: [{community_slug, target}] -> refresh_targets pro Community."""
+    by_community = {}
+    for r in rows:
+        by_community.setdefault(r['community_slug'], []).append(r['target'])
+    for slug, targets in by_community.items():
+        refresh_targets(slug, targets)
+
+
+def _post_targets(where: str, args: list) -> list[dict]:
+    """Betroffene Ziele für post-Snapshots (where über post r): die Autoren selbst und bei Kommentaren der Root-Autor."""
+    return Model.query(
+        f"""SELECT DISTINCT r.community_slug, r.user_id AS target FROM post r WHERE {where}
+            UNION
+            SELECT DISTINCT r.community_slug, p.user_id AS target
+            FROM post r JOIN post_current p ON p.skool_id = r.root_id
+            WHERE {where} AND r.is_toplevel = 0""",
+        args + args
+    )
+
+
+def sync_fetch(fetch) -> None:
+    """Nach der Extraktion eines likes/posts/comments-Fetches (ohne Commit)."""
+    if fetch.type == 'likes':
+        rows = Model.query("SELECT user_id FROM post_current WHERE skool_id = ?", [fetch.post_skool_id])
+        if rows:
+            refresh_targets(fetch.community_slug, [rows[0]['user_id']])
+    elif fetch.type in ('posts', 'comments'):
+        _refresh(_post_targets("r.fetch_id = ?", [fetch.id]))
+
+
+def sync_post_ids(first_id: int, last_id: int) -> None:
+    """Nach direkt eingefügten post-Rows mit id in [first_id, last_id] (Test-/Bulk-Endpoints)."""
+    _refresh(_post_targets("r.id BETWEEN ? AND ?", [first_id, last_id]))
+
+
+def sync_like_ids(first_id: int, last_id: int) -> None:
+    """Nach direkt eingefügten like-Rows mit id in [first_id, last_id] (Test-/Bulk-Endpoints)."""
+    _refresh(Model.query(
+        """SELECT DISTINCT l.community_slug, p.user_id AS target
+           FROM like l JOIN post_current p ON p.skool_id = l.post_skool_id
+           WHERE l.id BETWEEN ? AND ?""",
+        [first_id, last_id]
+    ))
+
+
+def rebuild(commit: bool = True) -> None:
+    """Komplett neu aus like/post_current."""
+    conn = Model.connect()
+    conn.execute(f"DELETE FROM {TABLE}")
+    _refresh(Model.query(
+        """SELECT DISTINCT l.community_slug, p.user_id AS target
+           FROM like l JOIN post_current p ON p.skool_id = l.post_skool_id
+           UNION
+           SELECT DISTINCT community_slug, user_id AS target FROM post_current WHERE is_toplevel = 1"""
+    ))
+    if commit:
+        conn.commit()
@@ -2,24 +2,19 @@ import json
 import time
 from typing import Dict, List, Tuple
 
+from src import graph_metrics
+from src.sql_filter import SqlFilter
 
-class MembersFilter:
+
+class MembersFilter(SqlFilter):
     """
     Members filter needs to be able to be translated into sql.
     """
-    sort_by: str = 'name_asc'
-    search_term: str = ''
-    community_slug: str = ''
-    include_by: str = '{}'
-    exclude_by: str = '{}'
-
-    def __init__(self, data: dict = None):
-        if data:
-            self.sort_by = data.get('sortBy', 'name_asc')
-            self.search_term = data.get('searchTerm', '')
-            self.community_slug = data.get('communitySlug', '')
-            self.include_by = json.dumps(data.get('include', {}))
-            self.exclude_by = json.dumps(data.get('exclude', {}))
+    DEFAULT_SORT = 'name_asc'
+    CURRENT_TABLE = 'user_current'
+    FTS_TABLE = 'user_fts'
+    LIKE_COLUMNS = ('name', 'first_name', 'last_name', 'email', 'bio')  # wie user_fts
+    RELEVANCE_TIEBREAK = 'name ASC'
 
     def _build_conditions(self, filters: Dict, negate: bool = False) -> Tuple[List[str], List]:
         """Build SQL conditions from filter dict. If negate=True, conditions are inverted."""
@@ -100,79 +95,110 @@ class MembersFilter:
 
             elif key == 'is_former_member':
                 if val is True or val == 'true':
-                    # Former member = NOT in latest fetch batch (same day as most recent fetch)
-                    # Uses community_slug from filter (passed as arg) for performance
-                    subquery = """
-                        skool_id NOT IN (
-                            SELECT DISTINCT u2.skool_id FROM user u2
-                            WHERE u2.fetch_id IN (
-                                SELECT f.id FROM fetch f
-                                WHERE f.type = 'members' AND f.community_slug = ?
-                                AND date(f.created_at, 'unixepoch') = (
-                                    SELECT date(f2.created_at, 'unixepoch') FROM fetch f2
-                                    WHERE f2.type = 'members' AND f2.community_slug = ?
-                                    ORDER BY f2.created_at DESC LIMIT 1
-                                )
-                            )
-                        )
-                    """
-                    if negate:
-                        conditions.append(subquery.replace("NOT IN", "IN"))
-                    else:
-                        conditions.append(subquery)
-                    # Need community_slug twice for the subquery
-                    args.append(self.community_slug)
+                    # Former member = im letzten kompletten members-Crawl nicht mehr dabei (src/membership.py)
+                    op = "NOT IN" if negate else "IN"
+                    conditions.append(f"skool_id {op} (SELECT skool_id FROM membership_status "
+                                      "WHERE community_slug = ? AND left_at > 0)")
                     args.append(self.community_slug)
 
+            elif key == 'left_since':
+                days = int(val)
+                threshold = now - (days * day_seconds)
+                op = "NOT IN" if negate else "IN"
+                conditions.append(f"skool_id {op} (SELECT skool_id FROM membership_status "
+                                  "WHERE community_slug = ? AND left_at >= ?)")
+                args.extend([self.community_slug, threshold])
+
         return conditions, args
 
-    def _get_order_by(self) -> str:
-        """Convert sortBy value to SQL ORDER BY clause."""
-        sort_map = {
-            'name_asc': 'name ASC',
-            'name_desc': 'name DESC',
-            'points_asc': 'points ASC',
-            'points_desc': 'points DESC',
-            'last_active_asc': 'last_active ASC',
-            'last_active_desc': 'last_active DESC',
-            'joined_asc': 'member_created_at ASC',
-            'joined_desc': 'member_created_at DESC',
-        }
-        return sort_map.get(self.sort_by, 'name ASC')
-
-    def to_sql(self) -> Tuple[str, List]:
-        """Build complete SQL query with filters, search, and sorting."""
-        sql = "SELECT * FROM user WHERE 1=1"
-        args = []
+    SORT_COLUMNS = {
+        'name_asc': ('name', 'ASC'),
+        'name_desc': ('name', 'DESC'),
+        'points_asc': ('points', 'ASC'),
+        'points_desc': ('points', 'DESC'),
+        'last_active_asc': ('last_active', 'ASC'),
+        'last_active_desc': ('last_active', 'DESC'),
+        'joined_asc': ('member_created_at', 'ASC'),
+        'joined_desc': ('member_created_at', 'DESC'),
+        'pagerank_desc': ('graph_pagerank', 'DESC'),
+        'pagerank_asc': ('graph_pagerank', 'ASC'),
+        'betweenness_desc': ('graph_betweenness', 'DESC'),
+        'in_degree_desc': ('graph_in_degree', 'DESC'),
+        'out_degree_desc': ('graph_out_degree', 'DESC'),
+        'cluster_asc': ('graph_cluster', 'ASC'),
+    }
+
+    # Graph-Kennzahlen der Community (src/graph_metrics.py), Members ohne Eintrag zählen als 0
+    SORT_EXPRESSIONS = {
+        f'graph_{column}': f"""COALESCE((SELECT g.{column} FROM graph_metric g
+            WHERE g.community_slug = {{table}}.community_slug AND g.skool_id = {{table}}.skool_id), 0)"""
+        for column in graph_metrics.COLUMNS
+    }
+
+    def _sorts_by_graph(self) -> bool:
+        return self._sort_column()[0] in self.SORT_EXPRESSIONS and bool(self.community_slug)
+
+    def _prepare_sort(self) -> None:
+        """graph_metric bereitstellen, bevor danach sortiert wird (letzter Stand, neu gerechnet im Hintergrund)."""
+        if self._sorts_by_graph():
+            graph_metrics.snapshot(self.community_slug)
+
+    def cache_key(self) -> str:
+        """Graph-Sortierungen hängen zusätzlich am gespeicherten graph_metric-Stand der Community."""
+        state = self.to_state()
+        if self._sorts_by_graph():
+            state['graphMetrics'] = graph_metrics.stored_version(self.community_slug)
+        return json.dumps(state, sort_keys=True)
+
+    # Facette -> Filter-Keys, die für ihre eigenen Zahlen ignoriert werden (die Optionen sind Alternativen)
+    FACET_KEYS = {
+        'member_role': ('member_role',),
+        'active_since': ('active_since', 'inactive_since'),
+        'joined_since': ('joined_since', 'joined_before'),
+        'points': ('points_min', 'points_max'),
+        'is_online': ('is_online',),
+    }
+    FACET_DAYS = (5, 20, 30, 90, 180, 365)  # wie die Tage-Auswahl im Filter-Dialog
+    FACET_POINTS = (0, 1, 10, 50, 100, 500, 1000, 5000)  # Untergrenzen der Punkte-Bins
+
+    def to_facets_sql(self, table: str = 'user_current') -> Tuple[str, List]:
+        """
+        Facetten-Zahlen in einem Durchlauf über table, gruppiert nach member_role.
+        Jede Facette zählt unter allen aktiven Bedingungen außer ihren eigenen (FACET_KEYS);
+        die innere Query markiert pro Row, ob diese "anderen" Bedingungen zutreffen.
+        Spalten: member_role, role, active_<tage>, joined_<tage>, points_<i>, online, total.
+        """
+        base, base_args = self._base_where(table)
+        flags, args = [], []
+        for facet, keys in self.FACET_KEYS.items():
+            conds, cond_args = self._conditions(keys)
+            flags.append(f"({conds}) AS f_{facet}")
+            args.extend(cond_args)
+        all_conds, all_args = self._conditions()
+        flags.append(f"({all_conds}) AS f_all")
+        args.extend(all_args)
 
-        # Community filter (required - no community = no results)
-        if self.community_slug:
-            sql += " AND community_slug = ?"
-            args.append(self.community_slug)
-        else:
-            sql += " AND 1=0"  # No community set -> return empty
-
-        # Search term
-        if self.search_term:
-            sql += " AND (name LIKE ? OR first_name LIKE ? OR last_name LIKE ? OR email LIKE ?)"
-            search_pattern = f"%{self.search_term}%"
-            args.extend([search_pattern, search_pattern, search_pattern, search_pattern])
-
-        # Include conditions (AND)
-        include_filters = json.loads(self.include_by) if self.include_by else {}
-        include_conds, include_args = self._build_conditions(include_filters, negate=False)
-        for cond in include_conds:
-            sql += f" AND {cond}"
-        args.extend(include_args)
-
-        # Exclude conditions (AND NOT)
-        exclude_filters = json.loads(self.exclude_by) if self.exclude_by else {}
-        exclude_conds, exclude_args = self._build_conditions(exclude_filters, negate=True)
-        for cond in exclude_conds:
-            sql += f" AND {cond}"
-        args.extend(exclude_args)
-
-        # Sorting
-        sql += f" ORDER BY {self._get_order_by()}"
-
-        return sql, args
\ No newline at end of file
+        now = int(time.time())
+        sums, sum_args = ["SUM(f_member_role) AS role"], []
+        for days in self.FACET_DAYS:
+            sums.append(f"SUM(CASE WHEN f_active_since AND last_active >= ? THEN 1 ELSE 0 END) AS active_{days}")
+            sum_args.append(now - days * 86400)
+        for days in self.FACET_DAYS:
+            sums.append(f"SUM(CASE WHEN f_joined_since AND member_created_at >= ? THEN 1 ELSE 0 END) AS joined_{days}")
+            sum_args.append(now - days * 86400)
+        bounds = self.FACET_POINTS
+        for i, low in enumerate(bounds):
+            if i + 1 < len(bounds):
+                sums.append(f"SUM(CASE WHEN f_points AND points >= ? AND points < ? THEN 1 ELSE 0 END) AS points_{i}")
+                sum_args.extend([low, bounds[i + 1]])
+            else:
+                sums.append(f"SUM(CASE WHEN f_points AND points >= ? THEN 1 ELSE 0 END) AS points_{i}")
+                sum_args.append(low)
+        sums.append("SUM(CASE WHEN f_is_online AND is_online = 1 THEN 1 ELSE 0 END) AS online")
+        sums.append("SUM(f_all) AS total")
+
+        sql = f"""SELECT member_role, {', '.join(sums)}
+                  FROM (SELECT member_role, last_active, member_created_at, points, is_online, {', '.join(flags)}
+                        FROM {table} WHERE {base})
+                  GROUP BY member_role"""
+        return sql, sum_args + args + base_args
@@ -0,0 +1,139 @@
+"""
+Mitgliedschafts-Status pro (community_slug, skool_id), berechnet wenn ein kompletter members-Crawl fertig ist.
+
+    first_seen               erster Snapshot in user (fetched_at)
+    last_seen_in_full_crawl  Start (created_at von Seite 1) des letzten kompletten Crawls, in dem der User war; 0 = nie
+    left_at                  Ende des ersten kompletten Crawls ohne den User; 0 = (wieder) Mitglied
+
+Ein Crawl ist komplett, wenn es ab einem ok-Fetch von Seite 1 (bis zum nächsten) für jede Seite
+1..total_pages einen ok-Fetch gibt. Ersetzt die Subquery über user/fetch im is_former_member-Filter:
+ehemalige Mitglieder sind left_at > 0, "kürzlich gegangen" ist left_at >= Schwelle.
+"""
+from model import Model
+
+TABLE = 'membership_status'
+MAX_CRAWLS_BACK = 10  # so viele Seite-1-Fetches zurück wird nach einem kompletten Crawl gesucht
+
+
+def ensure_tables() -> None:
+    """Legt die Tabelle an (nach den Model-Tabellen aufrufen). Neu angelegt -> aus dem Verlauf füllen."""
+    conn = Model.connect()
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [TABLE]).fetchone()
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {TABLE} (
+        community_slug TEXT, skool_id TEXT,
+        first_seen INTEGER DEFAULT 0, last_seen_in_full_crawl INTEGER DEFAULT 0, left_at INTEGER DEFAULT 0,
+        PRIMARY KEY (community_slug, skool_id))""")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_left ON {TABLE} (community_slug, left_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fetch_members ON fetch (type, community_slug, page_param)")
+    if not exists:
+        rebuild(commit=False)
+    conn.commit()
+
+
+def complete_crawls(community_slug: str, limit: int | None = MAX_CRAWLS_BACK) -> list[tuple[int, int, list[int]]]:
+    """
+    Komplette members-Crawls unter den letzten limit Seite-1-Fetches (None = alle), älteste zuerst:
+    [(start, ende, fetch_ids je Seite)]. Ein Crawl beginnt mit einem ok-Fetch von Seite 1
+    (start = created_at) und reicht bis zum nächsten; pro Seite zählt der neueste ok-Fetch darin.
+    """
+    starts = Model.query(
+        f"""SELECT created_at, total_pages FROM fetch
+            WHERE type = 'members' AND community_slug = ? AND status = 'ok' AND page_param = 1
+            ORDER BY created_at DESC, id DESC {'LIMIT ?' if limit else ''}""",
+        [community_slug] + ([limit] if limit else [])
+    )
+    crawls = []
+    until = None
+    for first in starts:
+        start, pages = first['created_at'], max(first['total_pages'] or 0, 1)
+        rows = Model.query(
+            f"""SELECT page_param, MAX(id) AS id, MAX(created_at) AS created_at FROM fetch
+                WHERE type = 'members' AND community_slug = ? AND status = 'ok'
+                AND page_param BETWEEN 1 AND ? AND created_at >= ? {'AND created_at < ?' if until else ''}
+                GROUP BY page_param""",
+            [community_slug, pages, start] + ([until] if until else [])
+        )
+        if len(rows) == pages:
+            crawls.append((start, max(r['created_at'] for r in rows), [r['id'] for r in rows]))
+        until = start
+    return crawls[::-1]
+
+
+def complete_crawl(community_slug: str) -> tuple[int, int, list[int]] | None:
+    """Neuester kompletter members-Crawl oder None. Läuft gerade ein Crawl, gilt der davor."""
+    crawls = complete_crawls(community_slug)
+    return crawls[-1] if crawls else None
+
+
+def latest_crawl_complete(community_slug: str) -> bool:
+    """Hat der neueste Crawl (ab dem letzten ok-Fetch von Seite 1) alle Seiten? Eine Query."""
+    row = Model.query(
+        """SELECT f.total_pages,
+                  (SELECT COUNT(DISTINCT g.page_param) FROM fetch g
+                   WHERE g.type = 'members' AND g.community_slug = f.community_slug AND g.status = 'ok'
+                   AND g.page_param BETWEEN 1 AND MAX(f.total_pages, 1) AND g.created_at >= f.created_at) AS done
+           FROM fetch f
+           WHERE f.type = 'members' AND f.community_slug = ? AND f.status = 'ok' AND f.page_param = 1
+           ORDER BY f.created_at DESC, f.id DESC LIMIT 1""",
+        [community_slug]
+    )
+    return bool(row) and row[0]['done'] >= max(row[0]['total_pages'] or 0, 1)
+
+
+def _apply(community_slug: str, crawl: tuple[int, int, list[int]]) -> None:
+    """
+    Einen kompletten Crawl übernehmen: wer drin ist, ist Mitglied (left_at = 0); wer schon vor dem Start
+    gesehen wurde und fehlt, ist zum Ende des Crawls gegangen (der früheste solche Crawl zählt).
+    Gesehen = Snapshot aus einem Fetch vor start (ohne Fetch: fetched_at des Snapshots).
+    """
+    start, end, fetch_ids = crawl
+    conn = Model.connect()
+    placeholders = ','.join(['?'] * len(fetch_ids))
+    conn.execute(
+        f"""INSERT OR IGNORE INTO {TABLE} (community_slug, skool_id, first_seen)
+            SELECT u.community_slug, u.skool_id, MIN(u.fetched_at) FROM user u LEFT JOIN fetch f ON f.id = u.fetch_id
+            WHERE u.community_slug = ? AND u.skool_id != ''
+            AND (COALESCE(f.created_at, u.fetched_at) < ? OR u.fetch_id IN ({placeholders}))
+            GROUP BY u.skool_id""",
+        [community_slug, start] + fetch_ids
+    )
+    conn.execute(
+        f"""UPDATE {TABLE} SET last_seen_in_full_crawl = ?, left_at = 0
+            WHERE community_slug = ? AND skool_id IN (SELECT skool_id FROM user WHERE fetch_id IN ({placeholders}))""",
+        [start, community_slug] + fetch_ids
+    )
+    conn.execute(
+        f"""UPDATE {TABLE} SET left_at = ?
+            WHERE community_slug = ? AND left_at = 0 AND last_seen_in_full_crawl < ?""",
+        [end, community_slug, start]
+    )
+
+
+def update(community_slug: str, force: bool = False) -> bool:
+    """
+    Nach einem members-Fetch: ist der neueste Crawl damit komplett und noch nicht übernommen, Status
+    aktualisieren. Solange der Crawl läuft, kostet das nur latest_crawl_complete() (eine Query).
+    Returns True wenn aktualisiert wurde.
+    """
+    if not force and not latest_crawl_complete(community_slug):
+        return False
+    crawl = complete_crawl(community_slug)
+    if crawl is None:
+        return False
+    if not force and Model.connect().execute(
+            f"SELECT 1 FROM {TABLE} WHERE community_slug = ? AND last_seen_in_full_crawl = ? LIMIT 1",
+            [community_slug, crawl[0]]).fetchone():
+        return False
+    _apply(community_slug, crawl)
+    return True
+
+
+def rebuild(commit: bool = True) -> None:
+    """Neu aus dem Verlauf: pro Community alle kompletten Crawls chronologisch übernehmen."""
+    conn = Model.connect()
+    conn.execute(f"DELETE FROM {TABLE}")
+    for r in conn.execute("SELECT DISTINCT community_slug FROM fetch WHERE type = 'members'").fetchall():
+        for crawl in complete_crawls(r['community_slug'], limit=None):
+            _apply(r['community_slug'], crawl)
+    if commit:
+        conn.commit()
@@ -0,0 +1,121 @@
+"""
+Bitmap-Index der Gruppen-Mitgliedschaften (profile_group, src/profile_group.py) für Overlap-Fragen:
+"in welchen Communities sind meine 5000 Members noch, wie stark überschneiden die sich".
+
+Jeder User mit Profil bekommt eine dichte Nummer (Position in der sortierten skool_id-Liste), jede
+Gruppe eine Bitmenge als Python-int (Bit i = User i ist Mitglied). Schnittmengen sind dann a & b,
+Größen int.bit_count() - beides läuft wortweise in C statt über Python-Sets.
+
+    selection_counts(ids)     {slug: (in der Selektion, gesamt)} für alle Gruppen
+    overlap(slugs, ids)       Schnittmengen-Matrix der Gruppen (optional nur innerhalb der Selektion)
+    similar(slug, k, ids)     top-k Gruppen nach Jaccard-Ähnlichkeit zu slug
+
+Der Index wird beim ersten Zugriff nach einer Datenänderung (src/data_version.py) neu aus profile_group
+gebaut; Aufrufer bekommen einen unveränderlichen Snapshot.
+"""
+import heapq
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from model import Model
+from src import data_version
+
+_lock = threading.Lock()
+
+
+class MembershipBitmap:
+    """Unveränderlicher Snapshot: users (dichte Nummer -> skool_id) und bits (slug -> Bitmenge)."""
+
+    def __init__(self, rows: Iterable[dict]):
+        rows = list(rows)
+        self.users: List[str] = sorted({r['skool_id'] for r in rows})
+        self.position: Dict[str, int] = {s: i for i, s in enumerate(self.users)}
+        members: Dict[str, List[int]] = {}
+        for r in rows:
+            members.setdefault(r['group_slug'], []).append(self.position[r['skool_id']])
+        self.bits: Dict[str, int] = {slug: self._mask(positions) for slug, positions in members.items()}
+        self.sizes: Dict[str, int] = {slug: b.bit_count() for slug, b in self.bits.items()}
+
+    @staticmethod
+    def _mask(positions: Iterable[int]) -> int:
+        # über ein bytearray statt 1 << i pro Bit (das wäre quadratisch in der Länge der Menge)
+        positions = list(positions)
+        if not positions:
+            return 0
+        buf = bytearray(max(positions) // 8 + 1)
+        for i in positions:
+            buf[i >> 3] |= 1 << (i & 7)
+        return int.from_bytes(buf, 'little')
+
+    def selection_mask(self, skool_ids: Iterable[str]) -> int:
+        """Bitmenge der skool_ids (User ohne Profil fallen weg)."""
+        return self._mask(self.position[s] for s in skool_ids if s in self.position)
+
+    def selection_counts(self, selection: int) -> Dict[str, Tuple[int, int]]:
+        """{slug: (Mitglieder in der Selektion, Mitglieder gesamt)} für Gruppen mit Treffern in der Selektion."""
+        result = {}
+        for slug, b in self.bits.items():
+            hit = (b & selection).bit_count()
+            if hit:
+                result[slug] = (hit, self.sizes[slug])
+        return result
+
+    def overlap(self, slugs: List[str], selection: Optional[int] = None) -> List[List[int]]:
+        """Symmetrische Matrix |A ∩ B| (Diagonale = |A|), bei selection nur innerhalb der Selektion."""
+        bits = [self.bits.get(s, 0) & selection if selection is not None else self.bits.get(s, 0) for s in slugs]
+        matrix = [[0] * len(slugs) for _ in slugs]
+        for i, a in enumerate(bits):
+            matrix[i][i] = a.bit_count()
+            for j in range(i + 1, len(bits)):
+                matrix[i][j] = matrix[j][i] = (a & bits[j]).bit_count()
+        return matrix
+
+    def similar(self, slug: str, k: int = 10, selection: Optional[int] = None,
+                candidates: Optional[Set[str]] = None) -> List[dict]:
+        """
+        top-k andere Gruppen nach Jaccard |A ∩ B| / |A ∪ B| zu slug (bei selection innerhalb der Selektion),
+        bei candidates nur Gruppen daraus.
+        """
+        a = self.bits.get(slug, 0)
+        if selection is not None:
+            a &= selection
+        size_a = a.bit_count()
+        if not size_a:
+            return []
+        scored = []
+        for other, b in self.bits.items():
+            if other == slug or (candidates is not None and other not in candidates):
+                continue
+            if selection is not None:
+                b &= selection
+            shared = (a & b).bit_count()
+            if shared:
+                union = size_a + b.bit_count() - shared
+                scored.append((shared / union, shared, other))
+        top = heapq.nsmallest(k, scored, key=lambda t: (-t[0], -t[1], t[2]))
+        return [{'slug': other, 'jaccard': round(j, 6), 'shared': shared} for j, shared, other in top]
+
+
+_index: Optional[MembershipBitmap] = None
+_version = -1
+
+
+def index() -> MembershipBitmap:
+    """Index für die aktuelle Daten-Version (bei Bedarf neu gebaut)."""
+    global _index, _version
+    version = data_version.current()
+    with _lock:
+        if _index is not None and _version == version:
+            return _index
+    built = MembershipBitmap(Model.query("SELECT skool_id, group_slug FROM profile_group"))
+    with _lock:
+        # Daten haben sich während des Bauens geändert -> nur diesen Aufruf bedienen
+        if version == data_version.current():
+            _index, _version = built, version
+    return built
+
+
+def reset() -> None:
+    global _index, _version
+    with _lock:
+        _index, _version = None, -1
@@ -1,3 +1,6 @@
+import json
+from datetime import datetime
+
 from model import Model
 
 
@@ -11,3 +14,73 @@ class OtherCommunity(Model):
     name: str = ""              # Community name (if known)
     about_fetched: int = 0      # 1 if about page was fetched
     about_data: str = ""        # JSON string with about page data
+
+    # Aus about_data extrahiert (about_fields), damit CommunityFilter per SQL filtern/sortieren kann
+    about_extracted: int = 0    # 1 wenn die Spalten unten aus about_data stammen
+    description: str = ""
+    total_members: int = 0
+    total_posts: int = 0
+    total_online_members: int = 0
+    total_admins: int = 0
+    num_courses: int = 0
+    privacy: int = 0            # Skool: 0 = public, 1 = private
+    is_paid: int = 0            # 1 wenn die Seite Billing-Produkte für die Mitgliedschaft hat
+    group_created_at: int = 0   # Unix timestamp (currentGroup.createdAt)
+
+
+def _int(value) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def about_fields(data: dict) -> dict:
+    """About-Page-JSON -> Spaltenwerte für OtherCommunity (ohne name/about_data)."""
+    pp = data.get('pageProps', {}) or {}
+    group = pp.get('currentGroup', {}) or {}
+    meta = group.get('metadata', {}) or {}
+    created = group.get('createdAt', '')
+    try:
+        created_at = int(datetime.fromisoformat(created.replace('Z', '+00:00')).timestamp()) if created else 0
+    except ValueError:
+        created_at = 0
+    return {
+        'about_extracted': 1,
+        'description': meta.get('description', '') or '',
+        'total_members': _int(meta.get('totalMembers')),
+        'total_posts': _int(meta.get('totalPosts')),
+        'total_online_members': _int(meta.get('totalOnlineMembers')),
+        'total_admins': _int(meta.get('totalAdmins')),
+        'num_courses': _int(meta.get('numCourses')),
+        'privacy': _int(meta.get('privacy')),
+        'is_paid': int(bool(pp.get('membershipBillingProducts'))),
+        'group_created_at': created_at,
+    }
+
+
+# Spalten aus about_fields(), per Model.update_table ohne DEFAULT nachgerüstet
+ABOUT_COLUMNS = tuple(about_fields({}))
+
+
+def ensure_tables() -> None:
+    """
+    Indexe für CommunityFilter anlegen (nach OtherCommunity.register) und alte about_data einmalig extrahieren.
+    Per ALTER TABLE nachgerüstete Spalten sind in bestehenden Rows NULL -> auf den Default setzen.
+    """
+    conn = Model.connect()
+    for column in ABOUT_COLUMNS:
+        conn.execute(f"UPDATE othercommunity SET {column} = ? WHERE {column} IS NULL",
+                     [getattr(OtherCommunity, column)])
+    for column in ('total_members', 'total_posts', 'total_online_members', 'group_created_at', 'name'):
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_othercommunity_{column} ON othercommunity ({column})")
+    rows = conn.execute("SELECT id, about_data FROM othercommunity "
+                        "WHERE about_fetched = 1 AND about_extracted = 0 AND about_data != ''").fetchall()
+    for r in rows:
+        try:
+            fields = about_fields(json.loads(r['about_data']))
+        except (ValueError, AttributeError):
+            continue
+        conn.execute(f"UPDATE othercommunity SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+                     list(fields.values()) + [r['id']])
+    conn.commit()
@@ -1,4 +1,6 @@
 from model import Model
+from src.posts_filter import PostFilter
+from src.filter_cache import FilterCache
 
 class Post(Model):
     """
@@ -29,3 +31,15 @@ class Post(Model):
     # Eingebettete User-Daten (für schnellen Zugriff)
     user_name: str = ""
     user_metadata: str = ""     # JSON string
+
+    @classmethod
+    def filtered_page(cls, f: PostFilter, limit: int, cursor: str = '') -> tuple[list['Post'], int, str]:
+        """
+        Eine Seite aus post_current per Keyset-Cursor (PostFilter).
+        Returns: (posts, total, next_cursor) - next_cursor '' auf der letzten Seite.
+        Wirft ValueError bei ungültigem Cursor.
+        """
+        rows, next_cursor = f.fetch_page('post_current', limit, cursor)
+        count_sql, count_args = f.to_count_sql('post_current')
+        total = FilterCache.get('post_count', f, lambda: Model.query(count_sql, count_args)[0]['c'])
+        return [cls(r) for r in rows], total, next_cursor
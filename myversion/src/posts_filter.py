@@ -1,2 +1,99 @@
-class PostFilter:
-    endpoints = {}
\ No newline at end of file
+import datetime
+import time
+from typing import Dict, List, Tuple
+
+from src.sql_filter import SqlFilter
+
+
+def _iso(ts: float) -> str:
+    """Unix timestamp -> Format von post.skool_created_at (ISO, UTC), damit der Vergleich als String den Index nutzt."""
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(ts))
+
+
+def _day_after(day: str) -> str:
+    """'YYYY-MM-DD' -> folgender Tag, für das inklusive date_to."""
+    return (datetime.date.fromisoformat(day[:10]) + datetime.timedelta(days=1)).isoformat()
+
+
+class PostFilter(SqlFilter):
+    """
+    Posts filter, übersetzt nach SQL über post_current (gleiches include/exclude-Modell wie MembersFilter).
+
+    Keys: author (user skool_id), created_since / created_before (Tage), date_from / date_to (YYYY-MM-DD, inklusiv),
+    upvotes_min / upvotes_max, comments_min / comments_max, is_toplevel (true = nur Posts, false = nur Kommentare),
+    label (label_id).
+    """
+    DEFAULT_SORT = 'newest'
+    CURRENT_TABLE = 'post_current'
+    FTS_TABLE = 'post_fts'
+    LIKE_COLUMNS = ("user_name",
+                    "CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.title') END",
+                    "CASE WHEN json_valid(metadata) THEN json_extract(metadata, '$.content') END")
+    RELEVANCE_TIEBREAK = 'id DESC'
+
+    SORT_COLUMNS = {
+        'newest': ('skool_created_at', 'DESC'),
+        'oldest': ('skool_created_at', 'ASC'),
+        'upvotes_desc': ('upvotes', 'DESC'),
+        'upvotes_asc': ('upvotes', 'ASC'),
+        'comments_desc': ('comments', 'DESC'),
+        'comments_asc': ('comments', 'ASC'),
+    }
+
+    def _build_conditions(self, filters: Dict, negate: bool = False) -> Tuple[List[str], List]:
+        """Build SQL conditions from filter dict. If negate=True, conditions are inverted."""
+        conditions = []
+        args = []
+        now = int(time.time())
+        day_seconds = 86400
+
+        for key, val in filters.items():
+            if val is None or val == '' or val == -1 or val == '-1':
+                continue
+
+            if key == 'author':
+                authors = val if isinstance(val, list) else [val]
+                if not authors:
+                    continue
+                op = "NOT IN" if negate else "IN"
+                conditions.append(f"user_id {op} ({','.join(['?'] * len(authors))})")
+                args.extend(authors)
+
+            elif key == 'created_since':
+                threshold = _iso(now - int(val) * day_seconds)
+                conditions.append("skool_created_at < ?" if negate else "skool_created_at >= ?")
+                args.append(threshold)
+
+            elif key == 'created_before':
+                threshold = _iso(now - int(val) * day_seconds)
+                conditions.append("skool_created_at >= ?" if negate else "skool_created_at < ?")
+                args.append(threshold)
+
+            elif key == 'date_from':
+                conditions.append("skool_created_at < ?" if negate else "skool_created_at >= ?")
+                args.append(str(val)[:10])
+
+            elif key == 'date_to':
+                conditions.append("skool_created_at >= ?" if negate else "skool_created_at < ?")
+                args.append(_day_after(str(val)))
+
+            elif key in ('upvotes_min', 'comments_min'):
+                column = key[:-len('_min')]
+                conditions.append(f"{column} < ?" if negate else f"{column} >= ?")
+                args.append(int(val))
+
+            elif key in ('upvotes_max', 'comments_max'):
+                column = key[:-len('_max')]
+                conditions.append(f"{column} > ?" if negate else f"{column} <= ?")
+                args.append(int(val))
+
+            elif key == 'is_toplevel':
+                toplevel = val is True or val == 'true' or val == 1 or val == '1'
+                conditions.append("is_toplevel = ?")
+                args.append(int(toplevel != negate))
+
+            elif key == 'label':
+                conditions.append("label_id != ?" if negate else "label_id = ?")
+                args.append(val)
+
+        return conditions, args
@@ -0,0 +1,76 @@
+"""
+Gruppen-Mitgliedschaften aus dem neuesten Profil pro User (profile.groups_member_of, normalisiert).
+
+    profile_group(skool_id, group_slug, display_name, fetched_at)
+        eine Row pro Gruppe im groupsMemberOf des neuesten profile-Snapshots (fetched_at, dann id),
+        display_name = metadata.displayName bzw. der Slug; fetched_at des Profils
+
+Indexiert in beide Richtungen (Primärschlüssel skool_id -> Gruppen, idx_profile_group_slug Gruppe -> User).
+Ersetzt json.loads/json_each über alle Profile in /api/other-communities, /api/communities/by-users,
+/api/user/<id>/profile-communities und den community_about-Tasks: shared_user_count ist ein GROUP BY.
+Die Reihenfolge von groupsMemberOf bleibt über die rowid erhalten (Einfügen in Listen-Reihenfolge).
+"""
+from typing import Iterable
+
+from model import Model
+
+TABLE = 'profile_group'
+CHUNK = 500  # SQLite-Variablenlimit
+
+
+def ensure_tables() -> None:
+    """Legt Tabelle + Indexe an (nach den Model-Tabellen). Neu angelegt -> aus den Profilen füllen."""
+    conn = Model.connect()
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", [TABLE]).fetchone()
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {TABLE} (
+        skool_id TEXT, group_slug TEXT, display_name TEXT DEFAULT '', fetched_at INTEGER DEFAULT 0,
+        PRIMARY KEY (skool_id, group_slug))""")
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{TABLE}_slug ON {TABLE} (group_slug, skool_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_profile_skool_id ON profile (skool_id)")
+    if not exists:
+        rebuild(commit=False)
+    conn.commit()
+
+
+def _insert_latest(where: str, args: list) -> None:
+    """Gruppen der neuesten Profile aller User, deren Profile where erfüllen, einfügen."""
+    Model.connect().execute(
+        f"""INSERT OR IGNORE INTO {TABLE} (skool_id, group_slug, display_name, fetched_at)
+            SELECT p.skool_id, json_extract(g.value, '$.name'),
+                   COALESCE(NULLIF(json_extract(g.value, '$.metadata.displayName'), ''),
+                            json_extract(g.value, '$.name')),
+                   p.fetched_at
+            FROM (SELECT skool_id, fetched_at,
+                         CASE WHEN json_valid(groups_member_of) THEN groups_member_of ELSE '[]' END AS groups_member_of,
+                         ROW_NUMBER() OVER (PARTITION BY skool_id ORDER BY fetched_at DESC, id DESC) AS rn
+                  FROM profile WHERE {where}) p, json_each(p.groups_member_of) g
+            WHERE p.rn = 1 AND COALESCE(json_extract(g.value, '$.name'), '') != ''
+            ORDER BY p.skool_id, g.key""",
+        args
+    )
+
+
+def sync(skool_ids: Iterable[str]) -> None:
+    """Gruppen der User aus ihrem jeweils neuesten Profil neu aufbauen (ohne Commit)."""
+    conn = Model.connect()
+    ids = sorted({s for s in skool_ids if s})
+    for i in range(0, len(ids), CHUNK):
+        batch = ids[i:i + CHUNK]
+        placeholders = ','.join(['?'] * len(batch))
+        conn.execute(f"DELETE FROM {TABLE} WHERE skool_id IN ({placeholders})", batch)
+        _insert_latest(f"skool_id IN ({placeholders})", batch)
+
+
+def sync_ids(first_id: int, last_id: int) -> None:
+    """Nach direkt eingefügten profile-Rows mit id in [first_id, last_id] (Test-/Bulk-Endpoints)."""
+    sync(r['skool_id'] for r in Model.query(
+        "SELECT DISTINCT skool_id FROM profile WHERE id BETWEEN ? AND ?", [first_id, last_id]))
+
+
+def rebuild(commit: bool = True) -> None:
+    """Komplett neu aus profile."""
+    conn = Model.connect()
+    conn.execute(f"DELETE FROM {TABLE}")
+    _insert_latest('1=1', [])
+    if commit:
+        conn.commit()
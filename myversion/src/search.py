@@ -0,0 +1,115 @@
+"""
+Volltextsuche (SQLite FTS5, trigram-Tokenizer) über den aktuellen Stand.
+
+    user_fts: name, first_name, last_name, email, bio          (rowid = user_current.id)
+    post_fts: title, content, user_name                        (rowid = post_current.id)
+
+Gepflegt per Trigger auf user_current/post_current - jedes Upsert des Extractors landet damit
+automatisch im Index. Trigram findet Teilstrings (auch Präfixe) case-insensitive, wie vorher
+LIKE '%term%', aber über den Index. Terme unter 3 Zeichen kann trigram nicht -> LIKE-Fallback;
+kurze Wörter in längeren Termen ("Jo Smith") kommen per short_words()/like_words() als LIKE dazu.
+"""
+from model import Model
+
+MIN_FTS_LENGTH = 3
+
+# fts-Tabelle -> (Quelltabelle, {fts-Spalte: SQL-Ausdruck auf new./old.})
+INDEXES = {
+    'user_fts': ('user_current', {
+        'name': '{r}.name', 'first_name': '{r}.first_name', 'last_name': '{r}.last_name',
+        'email': '{r}.email', 'bio': '{r}.bio',
+    }),
+    'post_fts': ('post_current', {
+        'title': "json_extract({r}.metadata, '$.title')",
+        'content': "json_extract({r}.metadata, '$.content')",
+        'user_name': '{r}.user_name',
+    }),
+}
+
+
+def _values(columns: dict, row: str) -> str:
+    # metadata ist JSON-Text, kaputtes JSON darf das Upsert nicht abbrechen
+    exprs = [e.format(r=row) for e in columns.values()]
+    return ', '.join(f"COALESCE(CASE WHEN json_valid({row}.metadata) THEN {e} END, '')" if 'json_extract' in e
+                     else f"COALESCE({e}, '')" for e in exprs)
+
+
+def ensure_tables() -> None:
+    """FTS-Tabellen + Trigger anlegen (nach current_state.ensure_tables). Neu angelegt -> aus dem aktuellen Stand befüllen."""
+    conn = Model.connect()
+    for fts, (source, columns) in INDEXES.items():
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", [fts]).fetchone()
+        conn.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({', '.join(columns)}, tokenize = 'trigram')")
+        cols = ', '.join(columns)
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {source} BEGIN
+                INSERT INTO {fts} (rowid, {cols}) VALUES (new.id, {_values(columns, 'new')});
+            END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {source} BEGIN
+                DELETE FROM {fts} WHERE rowid = old.id;
+            END""")
+        conn.execute(f"""CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {source} BEGIN
+                DELETE FROM {fts} WHERE rowid = old.id;
+                INSERT INTO {fts} (rowid, {cols}) VALUES (new.id, {_values(columns, 'new')});
+            END""")
+        if not exists:
+            conn.execute(f"INSERT INTO {fts} (rowid, {cols}) SELECT id, {_values(columns, source)} FROM {source}")
+    conn.commit()
+
+
+def use_fts(term: str) -> bool:
+    return len(term.strip()) >= MIN_FTS_LENGTH
+
+
+def match_expr(term: str) -> str:
+    """Suchbegriff -> FTS5-Ausdruck: jedes Wort als Phrase (Teilstring), alle Wörter müssen vorkommen."""
+    words = [w for w in term.split() if len(w) >= MIN_FTS_LENGTH] or [term.strip()]
+    return ' AND '.join('"' + w.replace('"', '""') + '"' for w in words)
+
+
+def short_words(term: str) -> list[str]:
+    """Wörter unter MIN_FTS_LENGTH, die match_expr() weglässt (leer, wenn es den ganzen Term nimmt)."""
+    words = term.split()
+    short = [w for w in words if len(w) < MIN_FTS_LENGTH]
+    return short if len(short) < len(words) else []
+
+
+def like_words(words: list[str], columns) -> tuple[str, list]:
+    """Jedes Wort muss in einer der Spalten vorkommen: (' AND (...) AND (...)', args), leer ohne Wörter."""
+    sql, args = '', []
+    for w in words:
+        sql += " AND (" + " OR ".join(f"{c} LIKE ?" for c in columns) + ")"
+        args.extend([f"%{w}%"] * len(columns))
+    return sql, args
+
+
+def search_posts(term: str, community_slug: str = '', toplevel_only: bool = False, limit: int = 50) -> list[dict]:
+    """Posts/Comments aus post_current, nach Relevanz (bm25) sortiert; kurze Terme per LIKE, neueste zuerst."""
+    term = (term or '').strip()
+    if not term:
+        return []
+    where, args = [], []
+    if community_slug:
+        where.append("p.community_slug = ?")
+        args.append(community_slug)
+    if toplevel_only:
+        where.append("p.is_toplevel = 1")
+    extra = ''.join(f" AND {w}" for w in where)
+    columns = ("p.user_name", "CASE WHEN json_valid(p.metadata) THEN json_extract(p.metadata, '$.title') END",
+               "CASE WHEN json_valid(p.metadata) THEN json_extract(p.metadata, '$.content') END")
+    if use_fts(term):
+        short, short_args = like_words(short_words(term), columns)
+        # snippet() braucht den MATCH-Kontext -> direkt auf post_fts
+        sql = f"""SELECT p.*, f.rank AS rank,
+                         snippet(post_fts, -1, '[', ']', '…', 12) AS snippet
+                  FROM post_fts f
+                  JOIN post_current p ON p.id = f.rowid
+                  WHERE post_fts MATCH ?{short}{extra}
+                  ORDER BY f.rank LIMIT ?"""
+        return Model.query(sql, [match_expr(term)] + short_args + args + [limit])
+    pattern = f"%{term}%"
+    sql = f"""SELECT p.*, 0 AS rank, '' AS snippet FROM post_current p
+              WHERE (p.user_name LIKE ?
+                     OR (json_valid(p.metadata) AND (json_extract(p.metadata, '$.title') LIKE ?
+                                                     OR json_extract(p.metadata, '$.content') LIKE ?))){extra}
+              ORDER BY p.id DESC LIMIT ?"""
+    return Model.query(sql, [pattern, pattern, pattern] + args + [limit])
@@ -0,0 +1,156 @@
+"""
+Server-seitige Selektion: /api/user/filter (mit limit) und POST /api/selection geben ein Handle zurück,
+Folge-Endpoints (/api/post/by-users, /api/communities/by-users, /api/shared-communities,
+/api/activity/members, POST /api/graph/interactions) nehmen {"selection": handle} statt der kompletten
+skool_ids-Liste.
+
+Ein Handle steht für einen normalisierten Filter-Zustand oder eine feste id-Liste. Beim ersten Zugriff
+wird es in die Tabelle selection_member(handle, skool_id) materialisiert, gegen die die Folge-Endpoints in
+einer Query joinen - statt 400er IN (...)-Chunks. Liegt das Filter-Ergebnis schon im FilterCache, wird
+daraus materialisiert statt den Filter nochmal auszuführen.
+selection_member liegt in app.db, nicht in einer Temp-Tabelle: der Server bedient jeden Request in einem
+eigenen Thread mit eigener Connection (Model.connect), eine Temp-Tabelle würde pro Request neu gebaut.
+Nur registrierte Handles (POST /api/selection, /api/user/filter mit limit) werden so materialisiert. Eine
+rohe skool_ids-Liste im Body eines Lese-Endpoints landet dagegen in der Temp-Tabelle selection_ids der
+Request-Connection: die gilt nur für den Request, schreibt nichts in app.db und nimmt keinen Write-Lock.
+
+Filter-Handles werden nur bei register(..., refresh=True) (erste Seite) neu aufgelöst, Folgeseiten und
+Folge-Requests benutzen die materialisierte Menge. Prozessweit, LRU auf MAX_HANDLES
+(älteste fliegen raus -> 410, Client filtert neu); Rows verdrängter Handles werden beim nächsten
+Materialisieren gelöscht, beim Start ist die Tabelle leer (Handles leben nur im Prozess).
+"""
+import hashlib
+import itertools
+import json
+import threading
+from collections import OrderedDict
+
+from model import Model
+from src.members_filter import MembersFilter
+from src.filter_cache import FilterCache
+
+TABLE = 'selection_member'
+TEMP_TABLE = 'selection_ids'  # TEMP, pro Connection: rohe id-Listen (resolve)
+
+_lock = threading.Lock()
+_build_lock = threading.Lock()  # ein Handle wird nur von einem Thread gleichzeitig materialisiert
+
+
+def ensure_tables() -> None:
+    """selection_member anlegen und Reste des letzten Prozesses löschen."""
+    conn = Model.connect()
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {TABLE} (
+        handle TEXT, skool_id TEXT, PRIMARY KEY (handle, skool_id)) WITHOUT ROWID""")
+    conn.execute(f"DELETE FROM {TABLE}")
+    conn.commit()
+
+
+class Selection:
+    MAX_HANDLES = 64
+
+    # handle -> (Generation, Filter-Zustand oder None, skool_ids oder None)
+    _handles: OrderedDict = OrderedDict()
+    _generations = itertools.count(1)
+    _materialized: dict = {}  # handle -> Generation in selection_member
+
+    @classmethod
+    def _put(cls, handle: str, state: dict | None, ids: list[str] | None, refresh: bool) -> str:
+        with _lock:
+            if refresh or handle not in cls._handles:
+                cls._handles[handle] = (next(cls._generations), state, ids)
+            cls._handles.move_to_end(handle)
+            while len(cls._handles) > cls.MAX_HANDLES:
+                cls._handles.popitem(last=False)
+        return handle
+
+    @classmethod
+    def register(cls, f: MembersFilter, refresh: bool = True) -> str:
+        """
+        Handle für den Filter-Zustand; gleicher Filter -> gleiches Handle.
+        refresh=True löst den Filter beim nächsten Zugriff neu auf (neue Daten), False behält die Menge.
+        """
+        state = f.to_state()
+        state.pop('sortBy')  # Sortierung ändert die Menge nicht
+        handle = hashlib.sha1(json.dumps(state, sort_keys=True).encode()).hexdigest()[:16]
+        return cls._put(handle, state, None, refresh)
+
+    @classmethod
+    def register_ids(cls, skool_ids: list[str]) -> str:
+        """Handle für eine feste id-Liste; gleiche Menge -> gleiches Handle (wird nie neu aufgelöst)."""
+        ids = sorted(set(skool_ids))
+        handle = 'i' + hashlib.sha1('\n'.join(ids).encode()).hexdigest()[:15]
+        return cls._put(handle, None, ids, refresh=False)
+
+    @classmethod
+    def table(cls, handle: str) -> str | None:
+        """
+        Tabellen-Ausdruck (Spalte skool_id, eindeutig) mit der Selektion für FROM/JOIN, materialisiert bei Bedarf.
+        None wenn das Handle unbekannt/abgelaufen ist.
+        """
+        with _lock:
+            entry = cls._handles.get(handle)
+            if entry is not None:
+                cls._handles.move_to_end(handle)
+        if entry is None:
+            return None
+        generation, state, ids = entry
+        with _build_lock:
+            if cls._materialized.get(handle) != generation:
+                cls._materialize(handle, state, ids)
+                cls._materialized[handle] = generation
+        # handle ist hex (sha1) -> direkt einsetzbar
+        return f"(SELECT skool_id FROM {TABLE} WHERE handle = '{handle}')"
+
+    @classmethod
+    def _materialize(cls, handle: str, state: dict | None, ids: list[str] | None) -> None:
+        conn = Model.connect()
+        with _lock:
+            live = set(cls._handles)
+        for h in [h for h in cls._materialized if h not in live]:
+            conn.execute(f"DELETE FROM {TABLE} WHERE handle = ?", [h])
+            del cls._materialized[h]
+        conn.execute(f"DELETE FROM {TABLE} WHERE handle = ?", [handle])
+        insert = f"INSERT OR IGNORE INTO {TABLE} (handle, skool_id) VALUES (?, ?)"
+        if ids is not None:
+            conn.executemany(insert, [(handle, i) for i in ids])
+        elif (cached := FilterCache.peek('users', MembersFilter(state))) is not None:
+            conn.executemany(insert, [(handle, u.skool_id) for u in cached])
+        else:
+            sql, args = MembersFilter(state).to_sql('user_current')
+            conn.execute(f"INSERT OR IGNORE INTO {TABLE} (handle, skool_id) SELECT ?, skool_id FROM ({sql})",
+                         [handle] + args)
+        conn.commit()
+
+    @classmethod
+    def _bind_ids(cls, skool_ids: list[str]) -> str:
+        """id-Liste in die Temp-Tabelle der Connection (nur für diesen Request, app.db bleibt unberührt)."""
+        conn = Model.connect()
+        conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {TEMP_TABLE} (skool_id TEXT PRIMARY KEY) WITHOUT ROWID")
+        conn.execute(f"DELETE FROM temp.{TEMP_TABLE}")
+        conn.executemany(f"INSERT OR IGNORE INTO temp.{TEMP_TABLE} (skool_id) VALUES (?)", [(i,) for i in skool_ids])
+        conn.commit()  # nur temp: kein Lock auf app.db, aber keine offene Transaktion auf der Thread-Connection
+        return f"(SELECT skool_id FROM temp.{TEMP_TABLE})"
+
+    @classmethod
+    def resolve(cls, data: dict) -> str | None:
+        """
+        Request-Body -> Tabellen-Ausdruck: 'selection' (Handle) oder 'skool_ids' (Liste, nur für diesen Request).
+        None = Handle abgelaufen.
+        """
+        data = data or {}
+        if data.get('selection'):
+            return cls.table(data['selection'])
+        return cls._bind_ids([i for i in data.get('skool_ids') or [] if i])
+
+    @classmethod
+    def count(cls, table: str) -> int:
+        return Model.query(f"SELECT COUNT(*) AS c FROM {table}")[0]['c']
+
+    @classmethod
+    def reset(cls) -> None:
+        with _build_lock, _lock:
+            cls._handles.clear()
+            cls._materialized.clear()
+        conn = Model.connect()
+        conn.execute(f"DELETE FROM {TABLE}")
+        conn.commit()
@@ -0,0 +1,219 @@
+"""
+Gemeinsame Basis für Filter, die nach SQL übersetzt werden (MembersFilter, PostFilter, CommunityFilter).
+
+Eingabe wie vom Frontend: {sortBy, searchTerm, communitySlug, include: {...}, exclude: {...}}.
+Unterklassen definieren _build_conditions() (Key -> SQL-Bedingung) und über Klassen-Attribute
+Sortierung, Volltextsuche und LIKE-Fallback. Seiten per Keyset-Cursor über (Sortspalte, id).
+Sortspalten, die nicht in der Tabelle stehen, kommen über SORT_EXPRESSIONS (SQL-Ausdruck pro Row).
+"""
+import base64
+import json
+from abc import ABC, abstractmethod
+from typing import Dict, List, Tuple
+
+from model import Model
+from src import search
+
+
+class SqlFilter(ABC):
+    DEFAULT_SORT = 'name_asc'
+    SORT_COLUMNS: Dict[str, Tuple[str, str]] = {}
+    SORT_EXPRESSIONS: Dict[str, str] = {}  # Sortspalte -> Ausdruck ({table} = abgefragte Tabelle), nie NULL
+    CURRENT_TABLE = ''          # Tabelle, die FTS_TABLE indexiert (rowid = id)
+    FTS_TABLE = ''              # leer = Suche nur per LIKE
+    LIKE_COLUMNS: Tuple[str, ...] = ()  # Suche unter MIN_FTS_LENGTH bzw. auf anderen Tabellen
+    RELEVANCE_TIEBREAK = 'name ASC'
+    USE_COMMUNITY = True        # community_slug ist Pflicht (ohne -> leeres Ergebnis)
+
+    sort_by: str = DEFAULT_SORT
+    search_term: str = ''
+    community_slug: str = ''
+    include_by: str = '{}'
+    exclude_by: str = '{}'
+
+    def __init__(self, data: dict = None):
+        self.sort_by = self.DEFAULT_SORT
+        if data:
+            self.sort_by = data.get('sortBy', self.DEFAULT_SORT)
+            self.search_term = data.get('searchTerm', '')
+            self.community_slug = data.get('communitySlug', '')
+            self.include_by = json.dumps(data.get('include', {}))
+            self.exclude_by = json.dumps(data.get('exclude', {}))
+
+    @abstractmethod
+    def _build_conditions(self, filters: Dict, negate: bool = False) -> Tuple[List[str], List]:
+        """Filter-Keys -> (SQL-Bedingungen, Argumente); negate = Exclude (Bedingung trifft nicht zu)."""
+
+    def _get_order_by(self, table: str) -> str:
+        """Convert sortBy value to SQL ORDER BY clause."""
+        column, direction = self._sort_column()
+        return f'{self._sort_expr(table, column)} {direction}'
+
+    def _sort_column(self) -> Tuple[str, str]:
+        return self.SORT_COLUMNS.get(self.sort_by, self.SORT_COLUMNS[self.DEFAULT_SORT])
+
+    def _sort_expr(self, table: str, column: str) -> str:
+        expression = self.SORT_EXPRESSIONS.get(column)
+        return expression.format(table=table) if expression else column
+
+    def _prepare_sort(self) -> None:
+        """Vor dem Sortieren über SORT_EXPRESSIONS: Daten dafür bereitstellen (Unterklassen)."""
+
+    def cache_key(self) -> str:
+        """Key für den FilterCache: normalisierter Zustand, Unterklassen ergänzen Stände ihrer SORT_EXPRESSIONS."""
+        return json.dumps(self.to_state(), sort_keys=True)
+
+    def _uses_fts(self, table: str) -> bool:
+        return bool(self.FTS_TABLE) and table == self.CURRENT_TABLE and search.use_fts(self.search_term)
+
+    def _is_relevance_sort(self, table: str) -> bool:
+        return self.sort_by == 'relevance' and self._uses_fts(table)
+
+    def _base_where(self, table: str) -> Tuple[str, List]:
+        """WHERE-Teil (ohne 'WHERE') nur mit Community und Suche."""
+        sql = "1=1"
+        args = []
+
+        # Community filter (required - no community = no results)
+        if self.USE_COMMUNITY:
+            if self.community_slug:
+                sql += " AND community_slug = ?"
+                args.append(self.community_slug)
+            else:
+                sql += " AND 1=0"  # No community set -> return empty
+
+        # Search term: FTS5 auf der indexierten Tabelle, unter 3 Zeichen bzw. auf anderen Tabellen per LIKE
+        if self.search_term and self._uses_fts(table):
+            sql += f" AND id IN (SELECT rowid FROM {self.FTS_TABLE} WHERE {self.FTS_TABLE} MATCH ?)"
+            args.append(search.match_expr(self.search_term))
+            # Wörter unter 3 Zeichen ("Jo Smith") kann trigram nicht -> per LIKE
+            short, short_args = search.like_words(search.short_words(self.search_term), self.LIKE_COLUMNS)
+            sql += short
+            args.extend(short_args)
+        elif self.search_term:
+            sql += " AND (" + " OR ".join(f"{c} LIKE ?" for c in self.LIKE_COLUMNS) + ")"
+            args.extend([f"%{self.search_term}%"] * len(self.LIKE_COLUMNS))
+
+        return sql, args
+
+    def _where(self, table: str) -> Tuple[str, List]:
+        """WHERE-Teil (ohne 'WHERE') mit Community, Suche, Include und Exclude."""
+        sql, args = self._base_where(table)
+        conds, cond_args = self._conditions()
+        if conds != '1':
+            sql += f" AND {conds}"
+        args.extend(cond_args)
+
+        return sql, args
+
+    def _conditions(self, skip: tuple = ()) -> Tuple[str, List]:
+        """Include- (AND) und Exclude-Bedingungen (AND NOT) als ein Ausdruck, ohne die Keys in skip. '1' wenn leer."""
+        include_filters = json.loads(self.include_by) if self.include_by else {}
+        include_conds, args = self._build_conditions({k: v for k, v in include_filters.items() if k not in skip})
+        exclude_filters = json.loads(self.exclude_by) if self.exclude_by else {}
+        exclude_conds, exclude_args = self._build_conditions(
+            {k: v for k, v in exclude_filters.items() if k not in skip}, negate=True)
+        args.extend(exclude_args)
+        conds = include_conds + exclude_conds
+        return (' AND '.join(f'({c})' for c in conds) if conds else '1'), args
+
+    def to_sql(self, table: str, select: str = '*') -> Tuple[str, List]:
+        """Build complete SQL query with filters, search, and sorting (select = Spaltenliste, default alle)."""
+        where, args = self._where(table)
+        sql = f"SELECT {select} FROM {table} WHERE {where}"
+        self._prepare_sort()
+
+        # Sorting (relevance nur mit FTS-Suche, sonst Default-Sortierung)
+        if self._is_relevance_sort(table):
+            sql += (f" ORDER BY (SELECT rank FROM {self.FTS_TABLE} WHERE {self.FTS_TABLE} MATCH ? "
+                    f"AND rowid = {table}.id), {self.RELEVANCE_TIEBREAK}")
+            args.append(search.match_expr(self.search_term))
+        else:
+            # id als Tiebreak wie in to_page_sql -> Gleichstände in derselben Reihenfolge wie seitenweise
+            sql += f" ORDER BY {self._get_order_by(table)}, id {self._sort_column()[1]}"
+
+        return sql, args
+
+    def to_count_sql(self, table: str) -> Tuple[str, List]:
+        where, args = self._where(table)
+        return f"SELECT COUNT(*) AS c FROM {table} WHERE {where}", args
+
+    def to_page_sql(self, table: str, limit: int, cursor: str = '') -> Tuple[str, List]:
+        """
+        Eine Seite per Keyset: ORDER BY <sort>, id - der Cursor enthält (Sortwert, id) des letzten Rows.
+        Relevanz hat keinen stabilen Sortwert in der Tabelle -> Offset im Cursor.
+        Holt limit + 1 Rows, damit der Aufrufer erkennt, ob es weitergeht.
+        """
+        position = self.decode_cursor(cursor) if cursor else None
+        if self._is_relevance_sort(table):
+            sql, args = self.to_sql(table)
+            return f"{sql}, id ASC LIMIT ? OFFSET ?", args + [limit + 1, position or 0]
+        where, args = self._where(table)
+        column, direction = self._sort_column()
+        expression = self._sort_expr(table, column)
+        # berechnete Sortspalte unter ihrem Namen mitliefern, next_cursor liest sie aus dem letzten Row
+        select = f"*, {expression} AS {column}" if expression != column else "*"
+        self._prepare_sort()
+        if position is not None:
+            condition, position_args = self._after(expression, direction, *position)
+            where += f" AND ({condition})"
+            args.extend(position_args)
+        sql = f"SELECT {select} FROM {table} WHERE {where} ORDER BY {expression} {direction}, id {direction} LIMIT ?"
+        return sql, args + [limit + 1]
+
+    @staticmethod
+    def _after(expression: str, direction: str, value, id: int) -> Tuple[str, List]:
+        """
+        Keyset-Bedingung "Row kommt nach (value, id)" für ORDER BY expression direction, id direction.
+        NULL sortiert in SQLite vor allen Werten (ASC zuerst, DESC zuletzt) - ein Row-Vergleich mit NULL
+        wäre nie wahr, deshalb eigene Zweige.
+        """
+        if direction == 'ASC':
+            if value is None:
+                return f"({expression} IS NULL AND id > ?) OR {expression} IS NOT NULL", [id]
+            return f"({expression}, id) > (?, ?)", [value, id]
+        if value is None:
+            return f"{expression} IS NULL AND id < ?", [id]
+        return f"({expression}, id) < (?, ?) OR {expression} IS NULL", [value, id]
+
+    def next_cursor(self, table: str, last_row: dict, cursor: str, limit: int) -> str:
+        """Cursor für die Seite nach der mit cursor geholten Seite (last_row = letzter Row dieser Seite)."""
+        if self._is_relevance_sort(table):
+            position = (self.decode_cursor(cursor) if cursor else 0) + limit
+        else:
+            column, _ = self._sort_column()
+            position = [last_row[column], last_row['id']]
+        raw = json.dumps({'s': self.sort_by, 'p': position}).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str):
+        """Cursor -> Position. ValueError bei kaputtem Cursor oder anderer Sortierung."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            data = json.loads(raw)
+            position = data['p']
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f'invalid cursor: {e}')
+        if data.get('s') != self.sort_by:
+            raise ValueError('cursor belongs to a different sort order')
+        return position
+
+    def to_state(self) -> dict:
+        """Normalisierter Filter-Zustand (Eingabeformat des Konstruktors)."""
+        return {
+            'sortBy': self.sort_by,
+            'searchTerm': self.search_term,
+            'communitySlug': self.community_slug,
+            'include': json.loads(self.include_by) if self.include_by else {},
+            'exclude': json.loads(self.exclude_by) if self.exclude_by else {},
+        }
+
+    def fetch_page(self, table: str, limit: int, cursor: str = '') -> Tuple[List[dict], str]:
+        """Rows einer Seite + next_cursor ('' auf der letzten Seite). Wirft ValueError bei ungültigem Cursor."""
+        sql, args = self.to_page_sql(table, limit, cursor)
+        rows = Model.query(sql, args)
+        next_cursor = ''
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self.next_cursor(table, rows[-1], cursor, limit)
+        return rows, next_cursor
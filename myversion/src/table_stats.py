@@ -0,0 +1,130 @@
+"""
+Tabellen-Statistik für /api/database/overview ohne COUNT(*) über jede Tabelle.
+
+    table_stat(name, row_count)
+        Zeilenzahl pro Tabelle, gepflegt per AFTER INSERT/DELETE-Trigger (table_stat_<name>_ai/_ad).
+        Einmal gezählt beim Anlegen der Trigger, danach nur noch +1/-1 pro Row - fängt auch
+        executemany/INSERT ... SELECT der abgeleiteten Tabellen ab, die am Model vorbeigehen.
+
+Virtuelle Tabellen (FTS5) und ihre Schatten-Tabellen bekommen keine Trigger; sie werden bei Bedarf
+gezählt und wie die Größen gecacht.
+
+Größen pro Tabelle und Index kommen aus der dbstat-Tabelle (SQLITE_ENABLE_DBSTAT_VTAB, nicht in jedem
+SQLite-Build) - die liest jede Seite der Datei, deshalb nur auf Anfrage (sizes()) und gecacht pro
+Daten-Version und Seitenzahl. Ohne dbstat bleiben die Größen None.
+"""
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from model import Model
+from src import data_version
+
+TABLE = 'table_stat'
+
+_lock = threading.Lock()
+_cache: Dict[str, Tuple[tuple, object]] = {}  # 'sizes' / 'counts' -> (Schlüssel, Ergebnis)
+
+
+def _tables() -> List[dict]:
+    """Alle Tabellen (ohne sqlite_*) mit virtual = FTS/virtuelle Tabelle oder deren Schatten-Tabelle."""
+    rows = Model.query("SELECT name, sql FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")
+    virtual = [r['name'] for r in rows if (r['sql'] or '').upper().startswith('CREATE VIRTUAL TABLE')]
+    return [{'name': r['name'],
+             'virtual': r['name'] in virtual or any(r['name'].startswith(f'{v}_') for v in virtual)}
+            for r in rows]
+
+
+def ensure_tables() -> None:
+    """Legt table_stat an und Trigger für alle Tabellen ohne (nach allen anderen ensure_tables aufrufen)."""
+    conn = Model.connect()
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {TABLE} (
+        name TEXT PRIMARY KEY, row_count INTEGER DEFAULT 0) WITHOUT ROWID""")
+    triggers = {r['name'] for r in Model.query("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    tables = [t['name'] for t in _tables() if not t['virtual'] and t['name'] != TABLE]
+    for name in tables:
+        if f'{TABLE}_{name}_ai' in triggers:
+            continue
+        # Zählen und Trigger in einer Transaktion -> keine Row geht zwischen beidem verloren
+        conn.execute(f"""INSERT INTO {TABLE} (name, row_count) VALUES (?, (SELECT COUNT(*) FROM "{name}"))
+                         ON CONFLICT (name) DO UPDATE SET row_count = excluded.row_count""", [name])
+        conn.execute(f"""CREATE TRIGGER {TABLE}_{name}_ai AFTER INSERT ON "{name}" BEGIN
+                UPDATE {TABLE} SET row_count = row_count + 1 WHERE name = '{name}';
+            END""")
+        conn.execute(f"""CREATE TRIGGER {TABLE}_{name}_ad AFTER DELETE ON "{name}" BEGIN
+                UPDATE {TABLE} SET row_count = row_count - 1 WHERE name = '{name}';
+            END""")
+    conn.execute(f"DELETE FROM {TABLE} WHERE name NOT IN ({','.join(['?'] * len(tables)) or 'NULL'})", tables)
+    conn.commit()
+
+
+def pages() -> dict:
+    """page_size, page_count, freelist_count (Seiten) und Dateigröße in Bytes - nur PRAGMAs, kein Scan."""
+    result = {p: Model.query(f"PRAGMA {p}")[0][p] for p in ('page_size', 'page_count', 'freelist_count')}
+    result['bytes'] = result['page_size'] * result['page_count']
+    return result
+
+
+def _cached(name: str, compute):
+    """Ergebnis von compute() gecacht, solange Daten-Version und Seitenzahl gleich bleiben."""
+    key = (data_version.current(), pages()['page_count'])
+    with _lock:
+        entry = _cache.get(name)
+        if entry and entry[0] == key:
+            return entry[1]
+    result = compute()
+    with _lock:
+        _cache[name] = (key, result)
+    return result
+
+
+def counts() -> Dict[str, int]:
+    """{Tabelle: Zeilen}: aus table_stat, virtuelle/Schatten-Tabellen per COUNT(*) (gecacht)."""
+    result = {r['name']: r['row_count'] for r in Model.query(f"SELECT name, row_count FROM {TABLE}")}
+    untracked = [t['name'] for t in _tables() if t['name'] not in result]
+    if untracked:
+        result.update(_cached('counts', lambda: {
+            name: Model.query(f'SELECT COUNT(*) AS c FROM "{name}"')[0]['c'] for name in untracked}))
+    return result
+
+
+def _dbstat() -> Optional[Dict[str, dict]]:
+    try:
+        rows = Model.query("SELECT name, SUM(pgsize) AS bytes, COUNT(*) AS pages FROM dbstat GROUP BY name")
+    except sqlite3.OperationalError:
+        return None  # SQLite ohne dbstat
+    return {r['name']: {'bytes': r['bytes'], 'pages': r['pages']} for r in rows}
+
+
+def sizes() -> Optional[Dict[str, dict]]:
+    """{Tabelle oder Index: {bytes, pages}} aus dbstat (gecacht), None wenn dbstat fehlt."""
+    return _cached('sizes', _dbstat)
+
+
+def overview(with_sizes: bool = False) -> List[dict]:
+    """
+    [{name, count, stats: {virtual, indexes: [{name, bytes, pages}], bytes, pages}}] nach count absteigend -
+    name/count wie die alte Antwort von /api/database/overview, der Rest unter stats.
+    bytes/pages nur mit with_sizes und nur, wenn dbstat verfügbar ist.
+    """
+    row_counts = counts()
+    size = sizes() if with_sizes else None
+    indexes: Dict[str, List[dict]] = {}
+    for r in Model.query("SELECT name, tbl_name FROM sqlite_master WHERE type = 'index' ORDER BY name"):
+        entry = {'name': r['name']}
+        if size is not None:
+            entry.update(size.get(r['name'], {'bytes': 0, 'pages': 0}))
+        indexes.setdefault(r['tbl_name'], []).append(entry)
+    tables = []
+    for t in _tables():
+        stats = {'virtual': t['virtual'], 'indexes': indexes.get(t['name'], [])}
+        if size is not None:
+            stats.update(size.get(t['name'], {'bytes': 0, 'pages': 0}))
+        tables.append({'name': t['name'], 'count': row_counts.get(t['name'], 0), 'stats': stats})
+    tables.sort(key=lambda x: (-x['count'], x['name']))
+    return tables
+
+
+def reset() -> None:
+    with _lock:
+        _cache.clear()
@@ -1,6 +1,7 @@
 from model import Model
 from src.config_entry import ConfigEntry
 from src.members_filter import MembersFilter
+from src.filter_cache import FilterCache
 
 
 class User(Model):
@@ -51,29 +52,44 @@ class User(Model):
     def filtered(cls, f: MembersFilter) -> list['User']:
         """
         Returns deduplicated users (latest snapshot per skool_id) with filters applied.
+        Liest aus user_current (src/current_state.py) statt den Verlauf per ROW_NUMBER() zu deduplizieren.
+        Ergebnis kommt aus dem FilterCache, solange sich die Daten nicht geändert haben (nicht verändern).
         """
-        filter_sql, filter_args = f.to_sql()
+        sql, args = f.to_sql('user_current')
+        return FilterCache.get('users', f, lambda: cls.get_list(sql, args))
 
-        # Extract WHERE and ORDER BY from filter SQL
-        # filter_sql = "SELECT * FROM user WHERE 1=1 AND ... ORDER BY ..."
-        where_start = filter_sql.find('WHERE')
-        order_start = filter_sql.find('ORDER BY')
-
-        where_clause = filter_sql[where_start + 6:order_start].strip() if order_start > 0 else filter_sql[where_start + 6:].strip()
-        order_clause = filter_sql[order_start + 9:].strip() if order_start > 0 else 'name ASC'
+    @classmethod
+    def filtered_page(cls, f: MembersFilter, limit: int, cursor: str = '') -> tuple[list['User'], int, str]:
+        """
+        Eine Seite aus user_current per Keyset-Cursor.
+        Returns: (users, total, next_cursor) - next_cursor '' auf der letzten Seite.
+        Wirft ValueError bei ungültigem Cursor.
+        """
+        rows, next_cursor = f.fetch_page('user_current', limit, cursor)
+        count_sql, count_args = f.to_count_sql('user_current')
+        users = FilterCache.peek('users', f)
+        total = len(users) if users is not None else \
+            FilterCache.get('count', f, lambda: Model.query(count_sql, count_args)[0]['c'])
+        return [cls(r) for r in rows], total, next_cursor
 
-        sql = f"""
-            SELECT * FROM (
-                SELECT
-                    us.*,
-                    ROW_NUMBER() OVER (
-                        PARTITION BY community_slug, skool_id
-                        ORDER BY fetched_at DESC
-                    ) AS rn
-                FROM {cls.__name__.lower()} us
-                WHERE {where_clause}
-            )
-            WHERE rn = 1
-            ORDER BY {order_clause}
+    @classmethod
+    def facets(cls, f: MembersFilter) -> dict:
+        """
+        Trefferzahlen für die Optionen des Filter-Panels (MembersFilter.to_facets_sql), eine Query.
+        Returns: {total, member_role: {rolle: n}, active_since: {tage: n}, joined_since: {tage: n},
+                  points: [{min, max, count}], is_online: n} - max None = offen.
         """
-        return cls.get_list(sql, filter_args)
+        def compute():
+            sql, args = f.to_facets_sql('user_current')
+            rows = Model.query(sql, args)
+            bounds = MembersFilter.FACET_POINTS
+            return {
+                'total': sum(r['total'] for r in rows),
+                'member_role': {r['member_role'] or '': r['role'] for r in rows if r['role']},
+                'active_since': {str(d): sum(r[f'active_{d}'] for r in rows) for d in MembersFilter.FACET_DAYS},
+                'joined_since': {str(d): sum(r[f'joined_{d}'] for r in rows) for d in MembersFilter.FACET_DAYS},
+                'points': [{'min': low, 'max': bounds[i + 1] - 1 if i + 1 < len(bounds) else None,
+                            'count': sum(r[f'points_{i}'] for r in rows)} for i, low in enumerate(bounds)],
+                'is_online': sum(r['online'] for r in rows),
+            }
+        return FilterCache.get('facets', f, compute)
@@ -226,22 +226,22 @@ def get_communities_with_shared_members(filters: dict) -> list:
 
     members = get_members()
 
-    # Gruppiere Members nach User-ID
-    user_communities = {}
+    # Bitmenge pro Community (Bit = dichte User-Nummer) -> Paar-Schnittmengen per & und bit_count()
+    user_index = {}
+    positions = {cid: [] for cid in community_ids}
     for m in members:
-        uid = m['id']
-        cid = m['community_id']
-        if uid not in user_communities:
-            user_communities[uid] = set()
-        user_communities[uid].add(cid)
+        if m['community_id'] in positions:
+            positions[m['community_id']].append(user_index.setdefault(m['id'], len(user_index)))
+    bits = {}
+    for cid, ids in positions.items():
+        buf = bytearray(len(user_index) // 8 + 1)
+        for i in ids:
+            buf[i >> 3] |= 1 << (i & 7)
+        bits[cid] = int.from_bytes(buf, 'little')
 
-    # Zähle Shared Members zwischen Community-Paaren
     results = []
     for c1, c2 in combinations(community_ids, 2):
-        shared_count = sum(
-            1 for comms in user_communities.values()
-            if c1 in comms and c2 in comms
-        )
+        shared_count = (bits[c1] & bits[c2]).bit_count()
         if shared_count >= min_shared:
             results.append({
                 'id': f"{c1}_{c2}",
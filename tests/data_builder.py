@@ -130,7 +130,8 @@ def generate_post(
         'user_id': user_skool_id,
         'label_id': '',
         'root_id': '',
-        'skool_created_at': str(NOW - (created_days_ago * DAY_SECONDS)),
+        # ISO wie createdAt von Skool (der Extractor übernimmt es unverändert)
+        'skool_created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(NOW - created_days_ago * DAY_SECONDS)),
         'skool_updated_at': '',
         'metadata': json.dumps({
             'title': f'Test Post {index}',
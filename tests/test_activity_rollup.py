@@ -0,0 +1,73 @@
+"""
+Aktivitäts-Rollups (src/activity_rollup.py) hinter /api/activity/community und /api/activity/members.
+"""
+import pytest
+
+from data_builder import generate_user, generate_post, generate_like
+
+COMMUNITY = 'activity-comm'
+
+
+def _community(api, days: int = 30) -> dict:
+    r = api.get(f'/api/activity/community?community={COMMUNITY}&days={days}')
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _heatmap_total(api, skool_ids: list) -> int:
+    r = api.post('/api/activity/members', json={'skool_ids': skool_ids})
+    assert r.status_code == 200, r.text
+    return sum(sum(row) for row in r.json()['activity_matrix'])
+
+
+@pytest.fixture
+def activity(api, clean_db):
+    # 4 User (2 vor 5 Tagen beigetreten, 2 vor 100), 6 Posts vor 2 Tagen + 1 vor 200, 3 Kommentare, Likes
+    api.bulk_users([generate_user(i, COMMUNITY, skool_id=f'a{i}', joined_days_ago=5 if i < 2 else 100)
+                    for i in range(4)])
+    posts = [generate_post(i, COMMUNITY, f'a{i % 4}', f'A{i % 4}', created_days_ago=2) for i in range(6)]
+    posts.append(generate_post(6, COMMUNITY, 'a0', 'A0', created_days_ago=200))
+    for i, p in enumerate(posts):
+        p['skool_id'] = f'p{i}'
+    comments = [generate_post(10 + i, COMMUNITY, 'a3', 'A3', created_days_ago=2) for i in range(3)]
+    for i, c in enumerate(comments):
+        c.update({'skool_id': f'c{i}', 'is_toplevel': 0, 'root_id': 'p0'})
+    api.bulk_posts(posts + comments)
+    # p0 von a1 zweimal (zwei Fetches, ein Paar) und a2 geliked, p6 (außerhalb des Fensters) von a3
+    api.bulk_likes([generate_like('p0', 'a1', 'A1', COMMUNITY), generate_like('p0', 'a1', 'A1', COMMUNITY, fetch_id=2),
+                    generate_like('p0', 'a2', 'A2', COMMUNITY), generate_like('p6', 'a3', 'A3', COMMUNITY)])
+    api.set_community(COMMUNITY)
+
+
+class TestActivityRollup:
+
+    def test_community_days(self, api, activity):
+        data = _community(api)
+        assert len(data['days']) == 30
+        totals = {k: sum(data[k]) for k in ('posts', 'comments', 'new_members', 'likes')}
+        assert totals == {'posts': 6, 'comments': 3, 'new_members': 2, 'likes': 2}
+
+    def test_window(self, api, activity):
+        assert sum(_community(api, days=365)['posts']) == 7
+
+    def test_member_heatmap(self, api, activity):
+        assert _heatmap_total(api, ['a0']) == 3  # p0, p4 und p6
+        assert _heatmap_total(api, ['a3']) == 4  # p3 + 3 Kommentare
+        assert _heatmap_total(api, [f'a{i}' for i in range(4)]) == 10
+
+    def test_updated_incrementally(self, api, activity):
+        late = generate_post(20, COMMUNITY, 'a1', 'A1', created_days_ago=1)
+        late['skool_id'] = 'p20'
+        api.bulk_posts([late])
+        api.bulk_likes([generate_like('p20', 'a2', 'A2', COMMUNITY)])
+        api.bulk_users([generate_user(9, COMMUNITY, skool_id='a9', joined_days_ago=1)])
+        data = _community(api)
+        assert (sum(data['posts']), sum(data['likes']), sum(data['new_members'])) == (7, 3, 3)
+        assert _heatmap_total(api, ['a1']) == 3
+
+    def test_snapshot_not_counted_twice(self, api, activity):
+        again = generate_post(0, COMMUNITY, 'a0', 'A0', fetch_id=2, created_days_ago=2)
+        again['skool_id'] = 'p0'
+        api.bulk_posts([again])
+        assert sum(_community(api)['posts']) == 6
+        assert _heatmap_total(api, ['a0']) == 3
@@ -0,0 +1,67 @@
+"""
+Parquet/Arrow-Export der Analyse-Tabellen (/api/export/columnar/<table>, src/columnar_export.py).
+Braucht pyarrow (optional) - ohne wird übersprungen.
+"""
+import io
+import json
+
+import pytest
+
+from data_builder import generate_post, generate_user
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+COMMUNITY = 'columnar-comm'
+
+
+@pytest.fixture
+def data(api, clean_db):
+    users = [generate_user(i, COMMUNITY, skool_id=f'c{i}') for i in range(5)]
+    users[0]['metadata'] = json.dumps({'bio': 'Bio 0', 'location': 'Berlin', 'linkWebsite': 'https://c0.example'})
+    users[0]['bio'] = 'Bio 0'
+    api.bulk_users(users)
+    api.bulk_posts([generate_post(i, COMMUNITY, 'c0', 'User 0', upvotes=i) for i in range(8)])
+    return users
+
+
+def _get(api, path: str):
+    r = api.get(path)
+    assert r.status_code == 200, r.text
+    return r
+
+
+class TestColumnarExport:
+
+    def test_parquet_types_and_decoded_fields(self, api, data):
+        r = _get(api, '/api/export/columnar/post_current')
+        assert 'filename=post_current.parquet' in r.headers['Content-Disposition']
+        table = pq.read_table(io.BytesIO(r.content))
+        assert table.num_rows == 8
+        assert table.schema.field('upvotes').type == pa.int64()
+        assert table.schema.field('skool_created_at_ts').type == pa.int64()
+        assert 'metadata' not in table.column_names
+        rows = table.to_pylist()
+        assert sorted(row['upvotes'] for row in rows) == list(range(8))
+        assert all(row['title'].startswith('Test Post') for row in rows)
+        assert all(row['skool_created_at_ts'] > 0 for row in rows)
+
+    def test_user_profile_fields_without_raw(self, api, data):
+        table = pq.read_table(io.BytesIO(_get(api, '/api/export/columnar/user_current').content))
+        assert 'metadata' not in table.column_names
+        row = next(r for r in table.to_pylist() if r['skool_id'] == 'c0')
+        assert (row['bio'], row['location'], row['link_website'], row['link_linkedin']) == \
+            ('Bio 0', 'Berlin', 'https://c0.example', None)
+
+    def test_raw_keeps_json(self, api, data):
+        table = pq.read_table(io.BytesIO(_get(api, '/api/export/columnar/user?raw=1').content))
+        assert table.num_rows == 5
+        assert 'metadata' in table.column_names
+
+    def test_arrow_ipc(self, api, data):
+        r = _get(api, '/api/export/columnar/user_current?format=arrow')
+        assert pa.ipc.open_file(io.BytesIO(r.content)).read_all().num_rows == 5
+
+    @pytest.mark.parametrize('path', ['/api/export/columnar/fetch', '/api/export/columnar/user?format=xlsx'])
+    def test_bad_request(self, api, data, path):
+        assert api.get(path).status_code == 400
@@ -0,0 +1,93 @@
+"""
+CommunityFilter über /api/other-communities/filter: Spalten aus der About-Page, Ranges, Suche, Sortierung, Cursor.
+"""
+import json
+
+import pytest
+
+
+def _filter(api, **state) -> dict:
+    r = api.post('/api/other-communities/filter', json=state)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _about_page(total_members: int, description: str, privacy: int = 0, paid: bool = False) -> str:
+    return json.dumps({'pageProps': {
+        'currentGroup': {'name': 'x', 'createdAt': '2025-03-01T00:00:00Z', 'metadata': {
+            'displayName': 'About Name', 'description': description, 'totalMembers': total_members,
+            'totalPosts': total_members // 10, 'totalOnlineMembers': 3, 'numCourses': 2, 'privacy': privacy}},
+        'membershipBillingProducts': [{'id': 'prod'}] if paid else None,
+    }})
+
+
+@pytest.fixture
+def communities(api, clean_db):
+    # i: i*100 Mitglieder, jede 2. privat, jede 3. "crypto"
+    for i in range(10):
+        r = api.post('/api/othercommunity', json={
+            'slug': f'oc{i}', 'name': f'Community {i}', 'about_fetched': 1, 'about_extracted': 1,
+            'total_members': i * 100, 'total_posts': 10 - i, 'privacy': i % 2,
+            'description': 'crypto trading' if i % 3 == 0 else 'fitness'})
+        assert r.status_code == 201, r.text
+    assert api.post('/api/othercommunity', json={'slug': 'fresh', 'name': 'fresh'}).status_code == 201
+
+
+class TestCommunityFilter:
+
+    def test_default_sort_members_desc(self, api, communities):
+        page = _filter(api, limit=3)
+        assert page['total'] == 11
+        assert [c['slug'] for c in page['items']] == ['oc9', 'oc8', 'oc7']
+        assert 'about_data' not in page['items'][0]
+
+    def test_ranges_and_privacy(self, api, communities):
+        page = _filter(api, include={'members_min': 300, 'members_max': 700, 'privacy': 'private'})
+        assert sorted(c['slug'] for c in page['items']) == ['oc3', 'oc5', 'oc7']
+        assert _filter(api, exclude={'about_fetched': True})['total'] == 1
+
+    def test_search(self, api, communities):
+        page = _filter(api, searchTerm='crypto', sortBy='name_asc')
+        assert [c['slug'] for c in page['items']] == ['oc0', 'oc3', 'oc6', 'oc9']
+
+    @pytest.mark.parametrize('sort', ['members_asc', 'posts_desc', 'name_desc'])
+    def test_pages_match_single_query(self, api, communities, sort):
+        single = [c['slug'] for c in _filter(api, sortBy=sort, limit=100)['items']]
+        ids, cursor = [], ''
+        while True:
+            page = _filter(api, sortBy=sort, limit=4, cursor=cursor)
+            ids.extend(c['slug'] for c in page['items'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        assert ids == single
+
+    def test_about_extraction_fills_columns(self, api, communities):
+        fetch_id = api.bulk_fetches([{'type': 'community_about', 'community_slug': 'fresh', 'status': 'ok',
+                                      'raw_data': _about_page(5000, 'brand new', privacy=1, paid=True)}])['ids'][0]
+        assert api.post(f'/api/extract/{fetch_id}').status_code == 200
+        page = _filter(api, include={'is_paid': True, 'members_min': 1000})
+        assert [(c['slug'], c['name'], c['total_members'], c['privacy']) for c in page['items']] == \
+            [('fresh', 'About Name', 5000, 1)]
+
+    @pytest.mark.parametrize('sort', ['members_desc', 'members_asc'])
+    def test_pages_with_null_columns(self, api, clean_db, sort):
+        # Rows aus der Zeit vor den about-Spalten: NULL statt 0
+        for i in range(5):
+            data = {'slug': f'c{i}', 'name': f'c{i}', 'total_members': i * 10 if i in (0, 4) else None}
+            assert api.post('/api/othercommunity', json=data).status_code == 201
+        ids, cursor = [], ''
+        while True:
+            page = _filter(api, sortBy=sort, limit=2, cursor=cursor)
+            assert page['total'] == 5
+            ids.extend(c['slug'] for c in page['items'])
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        assert sorted(ids) == ['c0', 'c1', 'c2', 'c3', 'c4']
+        assert ids == [c['slug'] for c in _filter(api, sortBy=sort, limit=100)['items']]
+
+    def test_non_numeric_limit(self, api, communities):
+        r = api.post('/api/other-communities/filter', json={'limit': 'abc'})
+        assert r.status_code == 400
+        assert 'limit' in r.json()['error']
@@ -0,0 +1,107 @@
+"""
+Current-state tables (user_current, post_current): latest snapshot per user/post, kept up to date on extraction.
+"""
+import pytest
+
+from data_builder import generate_user
+
+COMMUNITY = 'current-comm'
+
+
+def _members(users: list) -> dict:
+    return {'task': {'type': 'members', 'communitySlug': COMMUNITY, 'pageParam': 1},
+            'result': {'ok': True, 'data': {'pageProps': {'total': len(users), 'totalPages': 1, 'users': [
+                {'id': sid, 'name': name, 'firstName': name.title(), 'metadata': {}, 'member': {'role': role}}
+                for sid, name, role in users
+            ]}}}}
+
+
+def _posts(posts: list) -> dict:
+    return {'task': {'type': 'posts', 'communitySlug': COMMUNITY, 'pageParam': 1},
+            'result': {'ok': True, 'data': {'pageProps': {'total': len(posts), 'postTrees': [
+                {'post': {'id': pid, 'name': pid, 'userId': uid, 'metadata': {'upvotes': upvotes}}}
+                for pid, uid, upvotes in posts
+            ]}}}}
+
+
+def _send(api, results: list) -> list:
+    r = api.post('/api/fetch-result', json={'results': results})
+    assert r.status_code == 201, r.text
+    return [f['id'] for f in r.json()['fetches']]
+
+
+class TestUserCurrent:
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, api, clean_db):
+        api.set_community(COMMUNITY)
+
+    def test_filter_returns_latest_snapshot(self, api):
+        """A newer members fetch replaces the user's values, older snapshots stay in the history."""
+        _send(api, [_members([('u1', 'anna', 'member'), ('u2', 'ben', 'member')])])
+        _send(api, [_members([('u1', 'anna', 'admin')])])
+
+        users = {u['skool_id']: u for u in api.filter_users({'communitySlug': COMMUNITY})}
+        assert set(users) == {'u1', 'u2'}
+        assert users['u1']['member_role'] == 'admin'
+        assert len([u for u in api.get('/api/user').json()]) == 2
+        assert len([u for u in api.get('/api/post/latest').json()]) == 0
+
+    def test_filter_matches_latest_snapshot_only(self, api):
+        """Filters apply to the current values, not to an older snapshot."""
+        _send(api, [_members([('u1', 'anna', 'admin')])])
+        _send(api, [_members([('u1', 'anna', 'member')])])
+        admins = api.filter_users({'communitySlug': COMMUNITY, 'include': {'member_role': 'admin'}})
+        assert admins == []
+
+    def test_bulk_users_keep_newest_fetched_at(self, api):
+        """Bulk inserts are synced too; the snapshot with the newest fetched_at wins."""
+        new = generate_user(0, COMMUNITY, skool_id='u1', role='admin')
+        old = dict(new, member_role='member', fetched_at=new['fetched_at'] - 3600)
+        api.bulk_users([new, old])
+        users = api.filter_users({'communitySlug': COMMUNITY})
+        assert [u['member_role'] for u in users] == ['admin']
+
+    def test_reextraction_keeps_current_state(self, api):
+        """Re-extracting the latest fetch replaces its snapshots without losing the user."""
+        fetch_id = _send(api, [_members([('u1', 'anna', 'member')])])[0]
+        assert api.post(f'/api/extract/{fetch_id}').status_code == 200
+        users = api.filter_users({'communitySlug': COMMUNITY})
+        assert [u['skool_id'] for u in users] == ['u1']
+        assert users[0]['fetch_id'] == fetch_id
+
+    def test_leaderboard_points_reach_current_state(self, api):
+        _send(api, [_members([('u1', 'anna', 'member')])])
+        _send(api, [{'task': {'type': 'leaderboard', 'communitySlug': COMMUNITY, 'pageParam': 1},
+                     'result': {'ok': True, 'data': {'pageProps': {'leaderboardsData': {'users': [
+                         {'userId': 'u1', 'rank': 1, 'points': 420}]}}}}}])
+        assert api.filter_users({'communitySlug': COMMUNITY})[0]['points'] == 420
+
+
+class TestPostCurrent:
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, api, clean_db):
+        api.set_community(COMMUNITY)
+
+    def test_latest_post_per_skool_id(self, api):
+        _send(api, [_posts([('p1', 'u1', 1), ('p2', 'u2', 0)])])
+        _send(api, [_posts([('p1', 'u1', 5)])])
+
+        latest = {p['skool_id']: p for p in api.get('/api/post/latest').json()}
+        assert set(latest) == {'p1', 'p2'}
+        assert latest['p1']['upvotes'] == 5
+
+        by_user = api.post('/api/post/by-users', json={'skool_ids': ['u1']}).json()
+        assert [(p['skool_id'], p['upvotes']) for p in by_user] == [('p1', 5)]
+
+    def test_liked_posts_use_latest_snapshot(self, api):
+        _send(api, [_members([('u2', 'ben', 'member')])])
+        _send(api, [_posts([('p1', 'u1', 1)])])
+        _send(api, [_posts([('p1', 'u1', 2)])])
+        _send(api, [{'task': {'type': 'likes', 'communitySlug': COMMUNITY, 'pageParam': 1, 'postSkoolHexId': 'p1'},
+                     'result': {'ok': True, 'data': {'users': [{'id': 'u2', 'name': 'ben'}]}}}])
+
+        user_id = api.filter_users({'communitySlug': COMMUNITY})[0]['id']
+        liked = api.get(f'/api/user/{user_id}/liked-posts').json()
+        assert [(p['skool_id'], p['upvotes']) for p in liked] == [('p1', 2)]
@@ -1,10 +1,16 @@
 """
-CSV export tests.
+CSV export tests (/api/user/export-csv) und Streaming-Export (/api/export/<kind>).
 """
 import pytest
 import csv
+import gzip
 import io
-from data_builder import DataBuilder
+import json
+import socket
+import time
+from urllib.parse import urlparse
+
+from data_builder import DataBuilder, generate_user, generate_post, generate_like
 
 
 class TestExport:
@@ -111,3 +117,82 @@ class TestExport:
         content_disposition = response.headers.get('Content-Disposition', '')
         assert 'attachment' in content_disposition
         assert 'filename=' in content_disposition
+
+
+class TestStreamingExport:
+    """/api/export/<kind>: CSV/NDJSON, gzip, Spaltenauswahl."""
+
+    @pytest.fixture
+    def data(self, api, clean_db):
+        users = [generate_user(i, 'exp-comm', skool_id=f'e{i}', role='admin' if i < 2 else 'member')
+                 for i in range(6)]
+        api.bulk_users(users)
+        posts = [generate_post(i, 'exp-comm', 'e0', 'User 0') for i in range(4)]
+        for i, p in enumerate(posts):
+            p.update({'skool_id': f'ep{i}', 'is_toplevel': int(i < 3), 'root_id': '' if i < 3 else 'ep0'})
+        api.bulk_posts(posts)
+        api.bulk_likes([generate_like('ep0', f'e{i}', f'User {i}', 'exp-comm') for i in (1, 2)])
+        api.set_community('exp-comm')
+
+    def _export(self, api, kind: str, **body):
+        r = api.post(f'/api/export/{kind}', json=body)
+        assert r.status_code == 200, r.text
+        return r
+
+    def test_members_ndjson_columns(self, api, data):
+        r = self._export(api, 'members', format='ndjson', columns=['skool_id', 'member_role'],
+                         include={'member_role': 'admin'})
+        assert 'application/x-ndjson' in r.headers['Content-Type']
+        rows = [json.loads(line) for line in r.text.splitlines()]
+        assert sorted(rows, key=lambda r: r['skool_id']) == [{'skool_id': 'e0', 'member_role': 'admin'},
+                                                             {'skool_id': 'e1', 'member_role': 'admin'}]
+
+    def test_posts_and_comments(self, api, data):
+        posts = list(csv.DictReader(io.StringIO(self._export(api, 'posts').text)))
+        comments = list(csv.DictReader(io.StringIO(self._export(api, 'comments').text)))
+        assert sorted(p['skool_id'] for p in posts) == ['ep0', 'ep1', 'ep2']
+        assert [c['skool_id'] for c in comments] == ['ep3']
+        assert posts[0]['title'].startswith('Test Post')
+
+    def test_likes(self, api, data):
+        rows = list(csv.DictReader(io.StringIO(self._export(api, 'likes').text)))
+        assert sorted(r['user_skool_id'] for r in rows) == ['e1', 'e2']
+
+    def test_gzip(self, api, data):
+        r = self._export(api, 'members', gzip=True)
+        assert 'filename=members.csv.gz' in r.headers['Content-Disposition']
+        rows = list(csv.reader(io.StringIO(gzip.decompress(r.content).decode())))
+        assert len(rows) == 7
+
+    def test_open_stream_does_not_block_writers(self, api, clean_db):
+        """Ein Download, den der Client nicht weiterliest, darf Schreibzugriffe nicht sperren."""
+        users = [generate_user(i, 'exp-big', skool_id=f'b{i}') for i in range(8000)]
+        for u in users:
+            u['bio'] = 'x' * 4000
+        for i in range(0, len(users), 2000):
+            api.bulk_users(users[i:i + 2000])
+        # roher Socket mit kleinem Empfangspuffer: der Server bleibt nach ein paar MB (von ~32) im Senden hängen
+        url = urlparse(api.base_url)
+        body = json.dumps({'communitySlug': 'exp-big', 'columns': ['skool_id', 'bio']}).encode()
+        sock = socket.create_connection((url.hostname, url.port))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        entry_id = None
+        try:
+            sock.sendall(b'POST /api/export/members HTTP/1.1\r\nHost: test\r\nContent-Type: application/json\r\n'
+                         b'Content-Length: %d\r\n\r\n' % len(body) + body)
+            assert sock.recv(1024).startswith(b'HTTP/1.1 200')
+            time.sleep(1)
+            start = time.time()
+            w = api.post('/api/configentry', json={'key': 'export-lock-test', 'value': '1'})
+            assert w.status_code == 201, w.text
+            entry_id = w.json()['id']
+            assert time.time() - start < 2
+        finally:
+            sock.close()
+            if entry_id:
+                api.delete(f'/api/configentry/{entry_id}')
+
+    @pytest.mark.parametrize('kind,body', [('nope', {}), ('members', {'format': 'xml'}),
+                                           ('members', {'columns': ['password']})])
+    def test_bad_request(self, api, data, kind, body):
+        assert api.post(f'/api/export/{kind}', json=body).status_code == 400
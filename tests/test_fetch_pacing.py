@@ -0,0 +1,76 @@
+"""
+Adaptive fetch pacing tests (/api/fetch-pacing, pacing in /api/fetch-result).
+"""
+import pytest
+
+
+def _result(fetch_type: str, ok: bool, error: str = '', latency_ms: int = 500) -> dict:
+    return {
+        'task': {'type': fetch_type, 'communitySlug': 'pace-comm', 'pageParam': 1,
+                 'postSkoolHexId': 'p1', 'userSkoolHexId': ''},
+        'result': {'ok': ok, 'error': error, 'data': {}},
+        'latency_ms': latency_ms,
+    }
+
+
+def _send(api, results: list) -> dict:
+    r = api.post('/api/fetch-result', json={'results': results})
+    assert r.status_code == 201, r.text
+    return r.json()['pacing']
+
+
+class TestFetchPacing:
+    """Token bucket with AIMD back-off, fed by fetch results."""
+
+    def test_initial_recommendation(self, api, clean_db):
+        """Without any results, pacing starts conservative with a single worker."""
+        pacing = api.get('/api/fetch-pacing').json()
+        assert pacing['concurrency'] == 1
+        assert pacing['endpoints'] == {}
+
+    def test_success_increases_rate(self, api, clean_db):
+        """Each successful request raises the rate additively."""
+        first = _send(api, [_result('members', True)])
+        later = _send(api, [_result('members', True) for _ in range(5)])
+        assert later['endpoints']['next_data']['rate'] > first['endpoints']['next_data']['rate']
+        assert later['endpoints']['next_data']['latency_ms'] == pytest.approx(500, abs=1)
+
+    def test_429_backs_off(self, api, clean_db):
+        """HTTP 429 halves the rate and forces a pause before the next request."""
+        before = _send(api, [_result('likes', True) for _ in range(4)])
+        after = _send(api, [_result('likes', False, 'HTTP 429')])
+        api2_before = before['endpoints']['api2']
+        api2_after = after['endpoints']['api2']
+        assert api2_after['rate'] == pytest.approx(api2_before['rate'] / 2, abs=0.001)
+        assert api2_after['throttled'] == 1
+        assert api2_after['concurrency'] == 1
+        assert after['delay_ms'] > 0
+
+    def test_fetch_tasks_carry_pacing(self, api, clean_db):
+        """/api/fetch-tasks reports the current delay and batch size; a 429 raises the delay."""
+        before = api.get('/api/fetch-tasks')
+        assert before.status_code == 200
+        assert isinstance(before.json(), list)
+        assert int(before.headers['X-Fetch-Batch-Size']) >= 1
+        _send(api, [_result('members', False, 'HTTP 429')])
+        after = api.get('/api/fetch-tasks')
+        assert int(after.headers['X-Fetch-Delay-Ms']) > int(before.headers['X-Fetch-Delay-Ms'])
+        assert int(after.headers['X-Fetch-Batch-Size']) == 1
+
+    def test_404_does_not_back_off(self, api, clean_db):
+        """404 is counted as error but says nothing about rate limits."""
+        before = _send(api, [_result('profile', True)])
+        after = _send(api, [_result('profile', False, 'HTTP 404')])
+        ep = after['endpoints']['next_data']
+        assert ep['rate'] == before['endpoints']['next_data']['rate']
+        assert ep['errors'] == 1
+        assert ep['throttled'] == 0
+        assert ep['error_rate'] > 0
+
+    def test_endpoints_are_paced_separately(self, api, clean_db):
+        """A 5xx on api2 does not slow down _next/data, but the overall recommendation follows the slowest."""
+        _send(api, [_result('members', True) for _ in range(3)])
+        pacing = _send(api, [_result('comments', False, 'HTTP 503')])
+        assert pacing['endpoints']['api2']['throttled'] == 1
+        assert pacing['endpoints']['next_data']['throttled'] == 0
+        assert pacing['delay_ms'] == pacing['endpoints']['api2']['delay_ms']
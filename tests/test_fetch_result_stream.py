@@ -0,0 +1,165 @@
+"""
+Streaming ingestion tests (/api/fetch-result/stream, NDJSON + gzip/zstd).
+"""
+import gzip
+import json
+import os
+import threading
+import time
+
+import pytest
+import requests
+
+COMMUNITY = 'stream-comm'
+
+
+def _line(fetch_type: str, data_json: str, ok: bool = True, **task) -> bytes:
+    """One NDJSON record; data is embedded verbatim so raw_data can be compared byte by byte."""
+    task = {'type': fetch_type, 'communitySlug': COMMUNITY, 'pageParam': 1, **task}
+    return (f'{{"task": {json.dumps(task)}, "ok": {json.dumps(ok)}, "error": "", '
+            f'"latency_ms": 300, "data": {data_json}}}\n').encode()
+
+
+def _post_stream(api, body: bytes, encoding: str = None) -> requests.Response:
+    headers = {'Content-Type': 'application/x-ndjson'}
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return requests.post(f'{api.base_url}/api/fetch-result/stream', data=body, headers=headers)
+
+
+LIKES_DATA = '{"users" : [ {"id": "u1", "name": "anna", "first_name": "Anna"},{"id":"u2","name":"ben"} ]}'
+MEMBERS_DATA = json.dumps({'pageProps': {'total': 1, 'totalPages': 1, 'users': [
+    {'id': 'm1', 'name': 'max', 'firstName': 'Max', 'lastName': 'M', 'metadata': {}, 'member': {'role': 'member'}},
+]}})
+
+
+class TestFetchResultStream:
+
+    def test_gzip_ndjson_is_stored_and_extracted(self, api, clean_db):
+        """Each line becomes a Fetch, extraction runs per record."""
+        body = _line('likes', LIKES_DATA, postSkoolHexId='post1') + _line('members', MEMBERS_DATA)
+        r = _post_stream(api, gzip.compress(body), 'gzip')
+        assert r.status_code == 201, r.text
+        result = r.json()
+        assert result['saved'] == 2
+        assert result['rejected'] == []
+        assert result['extracted']['likes'] == 2
+        assert result['extracted']['users'] == 1
+        assert 'pacing' in result
+
+    def test_raw_data_is_stored_verbatim(self, api, clean_db):
+        """No decode/encode round-trip: whitespace and key order survive."""
+        r = _post_stream(api, gzip.compress(_line('likes', LIKES_DATA, postSkoolHexId='post1')), 'gzip')
+        fetch_id = r.json()['fetch_ids'][0]
+        stored = api.get(f'/api/fetch/{fetch_id}').json()
+        assert stored['raw_data'] == LIKES_DATA
+        assert stored['post_skool_id'] == 'post1'
+        assert stored['status'] == 'ok'
+
+    def test_uncompressed_and_error_results(self, api, clean_db):
+        """Plain NDJSON works too; ok=false records are stored as errors without extraction."""
+        body = _line('likes', '{}', ok=False, postSkoolHexId='post1') + b'\n' + _line('likes', LIKES_DATA)
+        r = _post_stream(api, body)
+        assert r.status_code == 201
+        assert r.json()['saved'] == 2
+        assert r.json()['extracted']['likes'] == 2
+        errors = [f for f in api.get('/api/fetch').json() if f['status'] == 'error']
+        assert len(errors) == 1
+
+    def test_broken_line_is_rejected(self, api, clean_db):
+        """A malformed line is reported, the other lines are still ingested."""
+        body = _line('likes', LIKES_DATA) + b'{"task": {"type": "likes"}, "data": {broken\n' + _line('likes', LIKES_DATA)
+        r = _post_stream(api, gzip.compress(body), 'gzip')
+        assert r.status_code == 201
+        result = r.json()
+        assert result['saved'] == 2
+        assert [x['line'] for x in result['rejected']] == [2]
+
+    def test_multi_member_gzip(self, api, clean_db):
+        """Concatenated gzip members (one per batch) are read as one stream."""
+        body = gzip.compress(_line('likes', LIKES_DATA)) + gzip.compress(_line('likes', LIKES_DATA))
+        r = _post_stream(api, body, 'gzip')
+        assert r.json()['saved'] == 2
+
+    def test_unsupported_encoding(self, api, clean_db):
+        r = _post_stream(api, b'', 'br')
+        assert r.status_code == 415
+
+    def test_zstd(self, api, clean_db):
+        zstandard = pytest.importorskip('zstandard')
+        body = zstandard.ZstdCompressor().compress(_line('likes', LIKES_DATA))
+        r = _post_stream(api, body, 'zstd')
+        assert r.status_code == 201, r.text
+        assert r.json()['extracted']['likes'] == 2
+
+    def test_large_line_is_decompressed_in_bounded_chunks(self, api, clean_db):
+        """A line that inflates to many MB (decompressed with max_length) still arrives intact."""
+        data = json.dumps({'users': [], 'blob': os.urandom(200_000).hex() + 'a' * 8_000_000})
+        r = _post_stream(api, gzip.compress(_line('likes', data, postSkoolHexId='post1')), 'gzip')
+        assert r.status_code == 201, r.text
+        assert api.get(f"/api/fetch/{r.json()['fetch_ids'][0]}").json()['raw_data'] == data
+
+    def test_batch_does_not_swallow_other_requests_commits(self, api, clean_db):
+        """While a stream upload is in batch mode, writes from other requests are committed right away."""
+        release = threading.Event()
+        responses = []
+
+        def body():
+            release.wait(10)  # Upload hängt in begin_batch, bis der andere Request durch ist
+            yield _line('likes', LIKES_DATA, postSkoolHexId='post1')
+
+        upload = threading.Thread(target=lambda: responses.append(requests.post(
+            f'{api.base_url}/api/fetch-result/stream', data=body(), headers={'Content-Type': 'application/x-ndjson'})))
+        upload.start()
+        time.sleep(0.3)
+        try:
+            r = api.post('/api/user', json={'skool_id': 'batch-other', 'community_slug': COMMUNITY})
+            assert r.status_code in (200, 201), r.text
+            # anderer Request, anderer Thread: sieht den User nur, wenn er committet wurde
+            assert api.get(f"/api/user/{r.json()['id']}").status_code == 200
+        finally:
+            release.set()
+            upload.join(30)
+        assert responses[0].status_code == 201
+
+    def test_stalled_upload_does_not_hold_write_lock(self, api, clean_db):
+        """Records are committed before waiting on the client: a slow upload doesn't lock other writers."""
+        release = threading.Event()
+        responses = []
+
+        first = _line('likes', LIKES_DATA, postSkoolHexId='post1')
+        # genau ein Lese-Block (CHUNK_SIZE): der Server hat den Record komplett, bevor er auf den Rest wartet
+        first = first[:-2] + b' ' * (64 * 1024 - len(first)) + first[-2:]
+
+        def body():
+            yield first
+            release.wait(10)  # Client stockt nach dem ersten Record
+            yield _line('members', MEMBERS_DATA)
+
+        upload = threading.Thread(target=lambda: responses.append(requests.post(
+            f'{api.base_url}/api/fetch-result/stream', data=body(), headers={'Content-Type': 'application/x-ndjson'})))
+        upload.start()
+        time.sleep(0.5)
+        try:
+            started = time.monotonic()
+            r = api.post('/api/user', json={'skool_id': 'stall-other', 'community_slug': COMMUNITY})
+            assert r.status_code in (200, 201), r.text
+            assert time.monotonic() - started < 2
+        finally:
+            release.set()
+            upload.join(30)
+        assert responses[0].status_code == 201
+        assert responses[0].json()['saved'] == 2
+
+    def test_failing_record_is_rejected_others_are_saved(self, api, clean_db):
+        """A record that fails while storing/extracting is rolled back alone and reported, the stream goes on."""
+        bad = json.dumps({'pageProps': {'total': 1, 'totalPages': 1, 'users': 5}})
+        body = (_line('likes', LIKES_DATA, postSkoolHexId='post1') + _line('members', bad, pageParam=2)
+                + _line('members', MEMBERS_DATA))
+        r = _post_stream(api, gzip.compress(body), 'gzip')
+        assert r.status_code == 201, r.text
+        result = r.json()
+        assert result['saved'] == 2
+        assert [x['line'] for x in result['rejected']] == [2]
+        fetches = [api.get(f'/api/fetch/{i}').json() for i in result['fetch_ids']]
+        assert [f['type'] for f in fetches] == ['likes', 'members']
@@ -0,0 +1,102 @@
+"""
+Cursor-based comment pagination tests (comments tasks + merge by comment id).
+"""
+from datetime import datetime, timezone
+
+import pytest
+
+COMMUNITY = 'cursor-comm'
+NOW_ISO = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _result(fetch_type: str, data: dict, **task) -> dict:
+    return {
+        'task': {'type': fetch_type, 'communitySlug': COMMUNITY, 'pageParam': 1, **task},
+        'result': {'ok': True, 'data': data},
+    }
+
+
+def _phase1() -> list:
+    post = {'post': {
+        'id': 'big-post', 'name': 'big-post', 'postType': 'generic', 'groupId': 'g1',
+        'createdAt': NOW_ISO, 'updatedAt': NOW_ISO,
+        'metadata': {'title': 'Big thread', 'comments': 40, 'upvotes': 0},
+    }}
+    return [
+        _result('members', {'pageProps': {'users': [], 'total': 0, 'totalPages': 1}}),
+        _result('posts', {'pageProps': {'total': 1, 'postTrees': [post]}}),
+        _result('leaderboard', {'pageProps': {'leaderboardsData': {'users': []}}}),
+    ]
+
+
+def _comments_page(ids: list, last=None, cursor: str = '', upvotes: int = 0) -> dict:
+    children = [{'post': {'id': i, 'name': i, 'root_id': 'big-post', 'updated_at': NOW_ISO,
+                          'metadata': {'content': i, 'upvotes': upvotes}}, 'children': []} for i in ids]
+    data = {'post_tree': {'children': children}, 'pinned_post_tree': {}}
+    if last is not None:
+        data['last'] = last
+    return _result('comments', data, postSkoolHexId='big-post', cursor=cursor)
+
+
+def _send(api, results: list) -> dict:
+    r = api.post('/api/fetch-result', json={'results': results})
+    assert r.status_code == 201, r.text
+    return r.json()
+
+
+def _comment_tasks(api) -> list:
+    return [t for t in api.get('/api/fetch-tasks').json() if t['type'] == 'comments']
+
+
+class TestCommentCursor:
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, api, clean_db):
+        api.set_community(COMMUNITY)
+        _send(api, _phase1())
+
+    def test_first_page_has_no_cursor(self, api):
+        tasks = _comment_tasks(api)
+        assert [(t['postSkoolHexId'], t['cursor']) for t in tasks] == [('big-post', '')]
+
+    def test_full_page_continues_with_last_cursor(self, api):
+        """A full page (25 top-level comments) plans the next page with after=last."""
+        _send(api, [_comments_page([f'c{i}' for i in range(25)], last=1700000000)])
+        tasks = _comment_tasks(api)
+        assert [t['cursor'] for t in tasks] == ['1700000000']
+
+    def test_short_page_ends_thread(self, api):
+        """Fewer than 25 comments -> thread complete, nothing planned while fresh."""
+        _send(api, [_comments_page(['c1', 'c2'], last=1700000000)])
+        assert _comment_tasks(api) == []
+
+    def test_pages_are_merged_by_comment_id(self, api):
+        """Comments already stored from an earlier page are not inserted again."""
+        first = _send(api, [_comments_page([f'c{i}' for i in range(25)], last=1700000000)])
+        assert first['extracted']['comments'] == 25
+        second = _send(api, [_comments_page(['c23', 'c24', 'c25', 'c26'], last=1700000500, cursor='1700000000')])
+        assert second['extracted']['comments'] == 2
+
+        comments = [p for p in api.get('/api/post').json() if p['root_id'] == 'big-post']
+        assert len(comments) == 27
+        assert len({c['skool_id'] for c in comments}) == 27
+        assert _comment_tasks(api) == []
+
+    def test_stale_refresh_starts_at_last_page(self, api):
+        """A stale, complete thread is refreshed from the cursor of its last page."""
+        _send(api, [_comments_page([f'c{i}' for i in range(25)], last=1700000000)])
+        _send(api, [_comments_page(['c25'], last=1700000500, cursor='1700000000')])
+        api.post('/api/test/age-fetches', json={'hours': 8 * 24})
+        _send(api, _phase1())
+
+        tasks = _comment_tasks(api)
+        assert [t['cursor'] for t in tasks] == ['1700000000']
+
+    def test_known_comments_refresh_counters(self, api):
+        """Same updated_at -> no new snapshot, but upvotes in the current state follow the latest page."""
+        _send(api, [_comments_page(['c1', 'c2', 'c1'], last=1700000000)])
+        second = _send(api, [_comments_page(['c1', 'c2'], last=1700000000, upvotes=7)])
+        assert second['extracted']['comments'] == 0
+        assert len([p for p in api.get('/api/post').json() if p['root_id'] == 'big-post']) == 2
+        current = {p['skool_id']: p['upvotes'] for p in api.get('/api/post/latest').json()}
+        assert current['c1'] == current['c2'] == 7
@@ -0,0 +1,131 @@
+"""
+Multi-community planning tests (tracked_communities, weights, budgets, /api/fetch-status).
+"""
+import json
+from collections import Counter
+
+import pytest
+
+
+def _set_config(api, key: str, value: str) -> int:
+    r = api.post('/api/configentry', json={'key': key, 'value': value})
+    assert r.status_code == 201
+    return r.json()['id']
+
+
+@pytest.fixture
+def config(api):
+    """Set ConfigEntries for one test, removed afterwards (reset does not clear configentry)."""
+    ids = []
+
+    def _set(key: str, value):
+        ids.append(_set_config(api, key, value if isinstance(value, str) else json.dumps(value)))
+
+    yield _set
+    for config_id in ids:
+        api.delete(f'/api/configentry/{config_id}')
+
+
+def _tasks(api) -> list:
+    r = api.get('/api/fetch-tasks')
+    assert r.status_code == 200
+    return r.json()
+
+
+def _send(api, results: list):
+    r = api.post('/api/fetch-result', json={'results': results})
+    assert r.status_code == 201, r.text
+
+
+def _first_pages(slug: str, members_pages: int = 1, users: int = 0) -> list:
+    def result(fetch_type, data):
+        return {'task': {'type': fetch_type, 'communitySlug': slug, 'pageParam': 1},
+                'result': {'ok': True, 'data': data}}
+    members = [{'id': f'{slug}-u{i}', 'name': f'{slug}-u{i}', 'firstName': 'U', 'lastName': str(i),
+                'metadata': {}, 'member': {'role': 'member'}} for i in range(users)]
+    return [
+        result('members', {'pageProps': {'users': members, 'total': users, 'totalPages': members_pages}}),
+        result('posts', {'pageProps': {'total': 0, 'postTrees': []}}),
+        result('leaderboard', {'pageProps': {'leaderboardsData': {'users': []}}}),
+    ]
+
+
+class TestTrackedCommunities:
+    """The planner covers all tracked communities and interleaves them fairly."""
+
+    def test_falls_back_to_current_community(self, api, clean_db):
+        """Without tracked_communities only current_community is planned."""
+        api.set_community('solo-comm')
+        assert {t['communitySlug'] for t in _tasks(api)} == {'solo-comm'}
+
+    def test_equal_weights_alternate(self, api, clean_db, config):
+        """Two communities with the same weight take turns."""
+        config('tracked_communities', 'comm-a, comm-b')
+        slugs = [t['communitySlug'] for t in _tasks(api)]
+        assert slugs == ['comm-a', 'comm-b'] * 3
+
+    def test_weight_gives_larger_share(self, api, clean_db, config):
+        """Weight 2 gets twice the slots at the front of the queue."""
+        config('tracked_communities', ['comm-a', 'comm-b'])
+        config('community_weights', {'comm-a': 2})
+        _send(api, _first_pages('comm-a', members_pages=7) + _first_pages('comm-b', members_pages=7))
+
+        slugs = [t['communitySlug'] for t in _tasks(api)]
+        assert Counter(slugs[:6]) == {'comm-a': 4, 'comm-b': 2}
+        assert Counter(slugs) == {'comm-a': 6, 'comm-b': 6}
+
+    def test_budget_limits_tasks_per_community(self, api, clean_db, config):
+        """community_task_budget caps each community, as a number or per slug."""
+        config('tracked_communities', ['comm-a', 'comm-b'])
+        config('community_task_budget', {'comm-a': 1, '*': 2})
+        counts = Counter(t['communitySlug'] for t in _tasks(api))
+        assert counts == {'comm-a': 1, 'comm-b': 2}
+
+    def test_large_community_does_not_crowd_out_small_one(self, api, clean_db, config):
+        """Phase 2 is pulled per community in turn and the run stops at fetch_tasks_limit."""
+        config('tracked_communities', ['comm-big', 'comm-small'])
+        config('fetch_tasks_limit', '6')
+        _send(api, _first_pages('comm-big', users=40) + _first_pages('comm-small', users=2))
+
+        tasks = _tasks(api)
+        assert len(tasks) == 6
+        assert [t['communitySlug'] for t in tasks[:4]] == ['comm-big', 'comm-small'] * 2
+        assert {t['type'] for t in tasks} == {'profile'}
+
+    def test_communities_progress_independently(self, api, clean_db, config):
+        """A community in phase 1b does not block another one still in phase 1a."""
+        config('tracked_communities', ['comm-a', 'comm-b'])
+        _send(api, _first_pages('comm-a', members_pages=3))
+
+        tasks = _tasks(api)
+        a_pages = sorted(t['pageParam'] for t in tasks if t['communitySlug'] == 'comm-a')
+        b_types = sorted(t['type'] for t in tasks if t['communitySlug'] == 'comm-b')
+        assert a_pages == [2, 3]
+        assert b_types == ['leaderboard', 'members', 'posts']
+
+
+class TestFetchStatus:
+    """/api/fetch-status reports backlog and freshness per community."""
+
+    def test_status_per_community(self, api, clean_db, config):
+        config('tracked_communities', ['comm-a', 'comm-b'])
+        config('community_task_budget', '1')
+        _send(api, _first_pages('comm-a', members_pages=3))
+
+        r = api.get('/api/fetch-status')
+        assert r.status_code == 200
+        status = {c['slug']: c for c in r.json()['communities']}
+
+        a = status['comm-a']
+        assert a['phase'] == 'pages'
+        assert a['backlog'] == 2
+        assert a['planned'] == 1
+        assert a['by_type'] == {'members': 2}
+        assert a['freshness']['members']['fresh_pages'] == 1
+        assert a['freshness']['members']['total_pages'] == 3
+        assert a['freshness']['members']['age_hours'] < 1
+
+        b = status['comm-b']
+        assert b['phase'] == 'initial'
+        assert b['backlog'] == 3
+        assert b['freshness']['members']['last_fetch_at'] is None
@@ -0,0 +1,108 @@
+"""
+Incremental posts refresh tests (early-stop pagination in /api/fetch-tasks).
+"""
+import pytest
+
+COMMUNITY = 'inc-comm'
+
+
+def _post_tree(skool_id: str, updated_at: str = '2025-01-01T00:00:00Z') -> dict:
+    return {'post': {
+        'id': skool_id, 'name': f'post-{skool_id}', 'postType': 'generic',
+        'createdAt': '2025-01-01T00:00:00Z', 'updatedAt': updated_at,
+        'metadata': {'title': skool_id, 'comments': 0, 'upvotes': 0},
+    }}
+
+
+def _result(fetch_type: str, page: int, data: dict) -> dict:
+    return {
+        'task': {'type': fetch_type, 'communitySlug': COMMUNITY, 'pageParam': page},
+        'result': {'ok': True, 'data': data},
+    }
+
+
+def _posts_page(page: int, post_ids: list, total: int = 60) -> dict:
+    return _result('posts', page, {'pageProps': {'total': total, 'postTrees': [_post_tree(i) for i in post_ids]}})
+
+
+def _members_and_leaderboard() -> list:
+    return [
+        _result('members', 1, {'pageProps': {'users': [], 'total': 0, 'totalPages': 1}}),
+        _result('leaderboard', 1, {'pageProps': {'leaderboardsData': {'users': []}}}),
+    ]
+
+
+def _send(api, results: list):
+    r = api.post('/api/fetch-result', json={'results': results})
+    assert r.status_code == 201, r.text
+
+
+def _posts_pages_in_tasks(api) -> list:
+    r = api.get('/api/fetch-tasks')
+    assert r.status_code == 200
+    return sorted(t['pageParam'] for t in r.json() if t['type'] == 'posts')
+
+
+def _set_config(api, key: str, value: str) -> int:
+    r = api.post('/api/configentry', json={'key': key, 'value': value})
+    assert r.status_code == 201
+    return r.json()['id']
+
+
+class TestIncrementalPostsRefresh:
+    """Posts pages are newest-first, so the planner stops at the first page without changes."""
+
+    def _full_sweep_then_stale(self, api, pages: int = 3):
+        api.set_community(COMMUNITY)
+        results = _members_and_leaderboard()
+        results.append(_posts_page(1, ['p1', 'p2']))
+        if pages >= 2:
+            results.append(_posts_page(2, ['p3', 'p4']))
+        if pages >= 3:
+            results.append(_posts_page(3, ['p5', 'p6']))
+        _send(api, results)
+        # Stale for stale_base (24h), but full sweep is still within 7 days
+        api.post('/api/test/age-fetches', json={'hours': 25})
+
+    def test_unchanged_first_page_stops_pagination(self, api, clean_db):
+        """Page 1 with only known, unchanged posts -> no further posts pages."""
+        self._full_sweep_then_stale(api)
+        _send(api, _members_and_leaderboard() + [_posts_page(1, ['p1', 'p2'])])
+
+        assert _posts_pages_in_tasks(api) == []
+
+    def test_new_post_on_first_page_requests_next_page(self, api, clean_db):
+        """Page 1 with a new post -> only page 2 is planned next."""
+        self._full_sweep_then_stale(api)
+        _send(api, _members_and_leaderboard() + [_posts_page(1, ['p0', 'p1'])])
+
+        assert _posts_pages_in_tasks(api) == [2]
+
+    def test_changed_updated_at_counts_as_change(self, api, clean_db):
+        """An edited post (new updatedAt) keeps pagination going."""
+        self._full_sweep_then_stale(api)
+        page = _posts_page(1, [])
+        page['result']['data']['pageProps']['postTrees'] = [
+            _post_tree('p1', updated_at='2025-02-01T00:00:00Z'), _post_tree('p2')
+        ]
+        _send(api, _members_and_leaderboard() + [page])
+
+        assert _posts_pages_in_tasks(api) == [2]
+
+    def test_without_full_sweep_all_pages_are_planned(self, api, clean_db):
+        """If the last page was never fetched, fall back to a full sweep."""
+        self._full_sweep_then_stale(api, pages=2)
+        _send(api, _members_and_leaderboard() + [_posts_page(1, ['p1', 'p2'])])
+
+        assert _posts_pages_in_tasks(api) == [2, 3]
+
+    def test_incremental_can_be_disabled(self, api, clean_db):
+        """posts_incremental=false restores the full page sweep."""
+        config_id = _set_config(api, 'posts_incremental', 'false')
+        try:
+            self._full_sweep_then_stale(api)
+            _send(api, _members_and_leaderboard() + [_posts_page(1, ['p1', 'p2'])])
+
+            assert _posts_pages_in_tasks(api) == [2, 3]
+        finally:
+            api.delete(f'/api/configentry/{config_id}')
@@ -0,0 +1,58 @@
+"""
+Filter result cache: hits for repeated filter states, invalidation when data changes.
+"""
+from data_builder import generate_user
+
+COMMUNITY = 'cache-comm'
+
+
+def _stats(api) -> dict:
+    r = api.get('/api/user/filter/cache')
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _setup(api, count: int = 6):
+    api.bulk_users([generate_user(i, COMMUNITY, skool_id=f'c{i}', role='admin' if i < 2 else 'member')
+                    for i in range(count)])
+    api.set_community(COMMUNITY)
+
+
+class TestFilterCache:
+
+    def test_repeated_filter_hits(self, api, clean_db):
+        _setup(api)
+        state = {'communitySlug': COMMUNITY, 'include': {'member_role': 'admin'}, 'exclude': {}}
+        first = api.filter_users(state)
+        before = _stats(api)
+        assert api.filter_users(state) == first
+        after = _stats(api)
+        assert after['hits'] == before['hits'] + 1
+        assert after['misses'] == before['misses']
+
+    def test_key_ignores_include_order(self, api, clean_db):
+        _setup(api)
+        api.filter_users({'communitySlug': COMMUNITY, 'include': {'member_role': 'admin', 'points_min': 0}})
+        before = _stats(api)
+        api.filter_users({'communitySlug': COMMUNITY, 'include': {'points_min': 0, 'member_role': 'admin'}})
+        assert _stats(api)['hits'] == before['hits'] + 1
+
+    def test_new_data_invalidates(self, api, clean_db):
+        _setup(api)
+        state = {'communitySlug': COMMUNITY}
+        assert len(api.filter_users(state)) == 6
+        version = _stats(api)['data_version']
+        api.bulk_users([generate_user(99, COMMUNITY, skool_id='c99')])
+        stats = _stats(api)
+        assert stats['data_version'] > version
+        assert stats['entries'] == 0
+        assert len(api.filter_users(state)) == 7
+
+    def test_export_uses_cache(self, api, clean_db):
+        _setup(api)
+        state = {'communitySlug': COMMUNITY}
+        api.filter_users(state)
+        before = _stats(api)
+        r = api.post('/api/user/export-csv', json=state)
+        assert r.status_code == 200
+        assert _stats(api)['hits'] == before['hits'] + 1
@@ -0,0 +1,62 @@
+"""
+Faceted counts for the member filter panel (/api/user/facets).
+"""
+import pytest
+
+from data_builder import generate_user
+
+COMMUNITY = 'facet-comm'
+
+
+def _facets(api, **state) -> dict:
+    r = api.post('/api/user/facets', json={'communitySlug': COMMUNITY, **state})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.fixture
+def members(api, clean_db):
+    # i: Rolle im Wechsel, aktiv vor i*3 Tagen, beigetreten vor 10+i*20 Tagen, i*60 Punkte, jeder 4. online
+    users = [generate_user(i, COMMUNITY, skool_id=f'f{i}', role=['admin', 'member', 'member'][i % 3],
+                           points=i * 60, last_active_days_ago=i * 3, joined_days_ago=10 + i * 20,
+                           is_online=i % 4 == 0)
+             for i in range(18)]
+    api.bulk_users(users)
+    api.set_community(COMMUNITY)
+    return users
+
+
+class TestFilterFacets:
+
+    def test_counts_without_conditions(self, api, members):
+        facets = _facets(api)
+        assert facets['total'] == 18
+        assert facets['member_role'] == {'admin': 6, 'member': 12}
+        assert facets['is_online'] == 5
+        assert sum(b['count'] for b in facets['points']) == 18
+
+    def test_facet_counts_match_filter(self, api, members):
+        for days in ('5', '20', '30'):
+            expected = len(api.filter_users({'communitySlug': COMMUNITY, 'include': {'active_since': int(days)}}))
+            assert _facets(api)['active_since'][days] == expected
+        expected = len(api.filter_users({'communitySlug': COMMUNITY, 'include': {'joined_since': 90}}))
+        assert _facets(api)['joined_since']['90'] == expected
+
+    def test_other_conditions_apply(self, api, members):
+        facets = _facets(api, include={'member_role': 'admin'})
+        admins = [u for u in members if u['member_role'] == 'admin']
+        assert facets['total'] == 6
+        assert facets['is_online'] == sum(u['is_online'] for u in admins)
+        # Die eigene Facette ignoriert die eigene Bedingung -> alle Rollen bleiben sichtbar
+        assert facets['member_role'] == {'admin': 6, 'member': 12}
+
+    def test_exclude_condition_applies(self, api, members):
+        facets = _facets(api, exclude={'is_online': 'true'})
+        assert facets['total'] == 13
+        assert facets['member_role'] == {'admin': 4, 'member': 9}
+        assert facets['is_online'] == 5
+
+    def test_no_community(self, api, clean_db):
+        r = api.post('/api/user/facets', json={'communitySlug': 'none'})
+        assert r.status_code == 200
+        assert r.json()['total'] == 0
@@ -0,0 +1,106 @@
+"""
+Server-side pagination of /api/user/filter (keyset cursors, total, selection handle).
+"""
+import pytest
+
+from data_builder import generate_user, generate_post
+
+COMMUNITY = 'page-comm'
+
+
+def _page(api, limit: int, cursor: str = '', **state) -> dict:
+    r = api.post('/api/user/filter', json={'communitySlug': COMMUNITY, 'limit': limit, 'cursor': cursor, **state})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _all_pages(api, limit: int, **state) -> list:
+    items, cursor = [], ''
+    while True:
+        page = _page(api, limit, cursor, **state)
+        items.extend(page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return items
+
+
+@pytest.fixture
+def members(api, clean_db):
+    # Wenige Punktestände -> viele Gleichstände, die der Cursor per id auflösen muss
+    users = [generate_user(i, COMMUNITY, skool_id=f'u{i}', points=(i % 4) * 100, role='admin' if i < 5 else 'member')
+             for i in range(23)]
+    api.bulk_users(users)
+    api.set_community(COMMUNITY)
+    return users
+
+
+class TestFilterPagination:
+
+    @pytest.mark.parametrize('sort_by', ['name_asc', 'name_desc', 'points_asc', 'points_desc',
+                                         'last_active_desc', 'joined_asc'])
+    def test_pages_cover_full_result_in_order(self, api, members, sort_by):
+        full = api.filter_users({'communitySlug': COMMUNITY, 'sortBy': sort_by})
+        paged = _all_pages(api, 5, sortBy=sort_by)
+        assert len(paged) == len(full) == 23
+        assert len({u['skool_id'] for u in paged}) == 23
+        key = {'name': 'name', 'points': 'points', 'last': 'last_active', 'joined': 'member_created_at'}[sort_by.split('_')[0]]
+        assert [u[key] for u in paged] == [u[key] for u in full]
+        # Gleichstände per id aufgelöst, ohne Seiten genauso
+        assert [u['skool_id'] for u in paged] == [u['skool_id'] for u in full]
+
+    @pytest.mark.parametrize('sort_by', ['points_asc', 'points_desc'])
+    def test_null_sort_values_are_paged(self, api, clean_db, sort_by):
+        users = [generate_user(i, COMMUNITY, skool_id=f'n{i}', points=i * 10) for i in range(11)]
+        for u in users[::3]:
+            u['points'] = None  # z.B. Members aus älteren Fetches ohne Punktestand
+        api.bulk_users(users)
+        full = api.filter_users({'communitySlug': COMMUNITY, 'sortBy': sort_by})
+        for limit in (2, 3, 4):
+            paged = _all_pages(api, limit, sortBy=sort_by)
+            assert [u['skool_id'] for u in paged] == [u['skool_id'] for u in full]
+        assert len(full) == 11 and [u['points'] for u in full].count(None) == 4
+
+    def test_total_and_last_page(self, api, members):
+        first = _page(api, 10, include={'member_role': 'admin'})
+        assert first['total'] == 5
+        assert len(first['items']) == 5
+        assert first['next_cursor'] == ''
+
+    def test_without_limit_returns_plain_list(self, api, members):
+        assert isinstance(api.filter_users({'communitySlug': COMMUNITY}), list)
+
+    def test_invalid_cursor(self, api, members):
+        r = api.post('/api/user/filter', json={'communitySlug': COMMUNITY, 'limit': 5, 'cursor': 'garbage'})
+        assert r.status_code == 400
+
+    def test_non_numeric_limit(self, api, members):
+        r = api.post('/api/user/filter', json={'communitySlug': COMMUNITY, 'limit': 'abc'})
+        assert r.status_code == 400
+        assert 'limit' in r.json()['error']
+
+    def test_cursor_of_other_sort_is_rejected(self, api, members):
+        cursor = _page(api, 5, sortBy='name_asc')['next_cursor']
+        r = api.post('/api/user/filter', json={'communitySlug': COMMUNITY, 'limit': 5, 'cursor': cursor,
+                                               'sortBy': 'points_desc'})
+        assert r.status_code == 400
+
+
+class TestSelectionHandle:
+
+    def test_follow_up_accepts_selection(self, api, members):
+        admins = [u for u in members if u['member_role'] == 'admin']
+        api.bulk_posts([generate_post(i, COMMUNITY, u['skool_id'], u['name']) for i, u in enumerate(members)])
+
+        selection = _page(api, 2, include={'member_role': 'admin'})['selection']
+        r = api.post('/api/post/by-users', json={'selection': selection})
+        assert r.status_code == 200
+        assert {p['user_id'] for p in r.json()} == {u['skool_id'] for u in admins}
+
+    def test_same_filter_same_handle(self, api, members):
+        a = _page(api, 2, include={'member_role': 'admin'}, sortBy='name_asc')['selection']
+        b = _page(api, 2, include={'member_role': 'admin'}, sortBy='points_desc')['selection']
+        assert a == b
+
+    def test_unknown_selection(self, api, members):
+        r = api.post('/api/activity/members', json={'selection': 'doesnotexist'})
+        assert r.status_code == 410
@@ -0,0 +1,68 @@
+"""
+Interaktions-Kanten (interaction_edge) hinter /api/graph/interactions: Likes/Comments zum Post-Autor,
+inkrementell gepflegt, Selektion in SQL gejoint.
+"""
+import pytest
+
+from data_builder import generate_user, generate_post, generate_like
+
+COMMUNITY = 'graph-comm'
+
+
+def _graph(api, **body) -> dict:
+    r = api.post('/api/graph/interactions', json={'community': COMMUNITY, **body})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _edges(result: dict, kind: str) -> dict:
+    return {(e['source'], e['target']): e['weight'] for e in result[f'{kind}_edges']}
+
+
+def _comment(index: int, author: str, root: str) -> dict:
+    c = generate_post(index, COMMUNITY, author, author)
+    c.update({'skool_id': f'c{index}', 'is_toplevel': 0, 'root_id': root})
+    return c
+
+
+@pytest.fixture
+def graph(api, clean_db):
+    # g0 schreibt p0, g1 schreibt p1; g2 liked beide, g3 liked p0 zweimal (zwei Fetches), g0 liked sich selbst
+    api.bulk_users([generate_user(i, COMMUNITY, skool_id=f'g{i}') for i in range(5)])
+    posts = [generate_post(i, COMMUNITY, f'g{i}', f'G{i}') for i in range(2)]
+    for i, p in enumerate(posts):
+        p['skool_id'] = f'p{i}'
+    api.bulk_posts(posts)
+    api.bulk_likes([generate_like('p0', 'g2', 'G2', COMMUNITY), generate_like('p1', 'g2', 'G2', COMMUNITY),
+                    generate_like('p0', 'g3', 'G3', COMMUNITY), generate_like('p0', 'g3', 'G3', COMMUNITY, fetch_id=2),
+                    generate_like('p0', 'g0', 'G0', COMMUNITY)])
+    api.bulk_posts([_comment(0, 'g1', 'p0'), _comment(1, 'g1', 'p0'), _comment(2, 'g4', 'p1')])
+    api.set_community(COMMUNITY)
+
+
+class TestGraphEdges:
+
+    def test_like_and_comment_edges(self, api, graph):
+        result = _graph(api, skool_ids=[f'g{i}' for i in range(5)])
+        assert _edges(result, 'like') == {('g2', 'g0'): 1, ('g2', 'g1'): 1, ('g3', 'g0'): 2}
+        assert _edges(result, 'comment') == {('g1', 'g0'): 2, ('g4', 'g1'): 1}
+
+    def test_selection_limits_edges(self, api, graph):
+        result = _graph(api, skool_ids=['g0', 'g2', 'g4'])
+        assert _edges(result, 'like') == {('g2', 'g0'): 1}
+        assert _edges(result, 'comment') == {}
+
+    def test_get_matches_full_selection(self, api, graph):
+        r = api.get(f'/api/graph/interactions?community={COMMUNITY}')
+        assert r.status_code == 200
+        full = _graph(api, skool_ids=[f'g{i}' for i in range(5)])
+        assert _edges(r.json(), 'like') == _edges(full, 'like')
+        assert _edges(r.json(), 'comment') == _edges(full, 'comment')
+
+    def test_post_arriving_after_likes(self, api, graph):
+        api.bulk_likes([generate_like('p9', 'g4', 'G4', COMMUNITY)])
+        assert ('g4', 'g3') not in _edges(_graph(api, skool_ids=['g3', 'g4']), 'like')
+        late = generate_post(9, COMMUNITY, 'g3', 'G3')
+        late['skool_id'] = 'p9'
+        api.bulk_posts([late])
+        assert _edges(_graph(api, skool_ids=['g3', 'g4']), 'like') == {('g4', 'g3'): 1}
@@ -0,0 +1,85 @@
+"""
+Vorberechnetes Layout und Level of Detail (src/graph_layout.py) in /api/graph/interactions.
+"""
+import pytest
+
+from data_builder import generate_user, generate_post, generate_like
+
+COMMUNITY = 'layout-comm'
+
+
+def _graph(api, **body) -> dict:
+    r = api.post('/api/graph/interactions', json={'community': COMMUNITY, 'skool_ids': [f'l{i}' for i in range(6)],
+                                                  **body})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.fixture
+def graph(api, clean_db):
+    # l0 schreibt p0: l1 liked 3x (drei Fetches), l2..l4 je 1x; l5 ohne Kanten
+    api.bulk_users([generate_user(i, COMMUNITY, skool_id=f'l{i}') for i in range(6)])
+    post = generate_post(0, COMMUNITY, 'l0', 'L0')
+    post['skool_id'] = 'p0'
+    api.bulk_posts([post])
+    api.bulk_likes([generate_like('p0', 'l1', 'L1', COMMUNITY, fetch_id=f) for f in (1, 2, 3)] +
+                   [generate_like('p0', f'l{i}', f'L{i}', COMMUNITY) for i in (2, 3, 4)])
+    api.set_community(COMMUNITY)
+
+
+class TestGraphLayout:
+
+    def test_positions(self, api, graph):
+        nodes = _graph(api, layout=True)['nodes']
+        assert len(nodes) == 6
+        assert all(-1000 <= n['x'] <= 1000 and -1000 <= n['y'] <= 1000 for n in nodes)
+        assert len({(n['x'], n['y']) for n in nodes}) == 6
+        # gecacht bzw. deterministisch: gleiche Positionen beim zweiten Aufruf
+        assert _graph(api, layout=True)['nodes'] == nodes
+
+    def test_without_layout(self, api, graph):
+        result = _graph(api)
+        assert 'x' not in result['nodes'][0] and 'edges_total' not in result
+        assert len(result['like_edges']) == 4
+
+    def test_top_k(self, api, graph):
+        result = _graph(api, top_k=1)
+        # jede Kante ist die stärkste (einzige) ihrer Quelle -> alle bleiben
+        assert len(result['like_edges']) == 4 and result['edges_total'] == 4
+
+    def test_min_weight(self, api, graph):
+        result = _graph(api, min_weight=2)
+        assert [(e['source'], e['target'], e['weight']) for e in result['like_edges']] == [('l1', 'l0', 3)]
+
+    def test_layout_independent_of_detail(self, api, graph):
+        full = {n['id']: (n['x'], n['y']) for n in _graph(api, layout=True)['nodes']}
+        pruned = {n['id']: (n['x'], n['y']) for n in _graph(api, layout=True, min_weight=2)['nodes']}
+        assert pruned == full
+
+    def test_get_query_parameters(self, api, graph):
+        r = api.get(f'/api/graph/interactions?community={COMMUNITY}&layout=1&min_weight=2')
+        assert r.status_code == 200
+        assert 'x' in r.json()['nodes'][0] and len(r.json()['like_edges']) == 1
+
+    def test_invalid_top_k(self, api, graph):
+        r = api.post('/api/graph/interactions', json={'community': COMMUNITY, 'top_k': 'many'})
+        assert r.status_code == 400
+
+    def test_large_graph_attaches_leaves(self, api, clean_db):
+        # Stern mit mehr Blättern als PY_MAX_NODES: nicht alle laufen durchs Force-Layout,
+        # die übrigen hängen am Hub -> Hub in der Mitte, keine Position doppelt
+        n = 400
+        api.bulk_users([generate_user(i, COMMUNITY, skool_id=f'h{i}') for i in range(n)])
+        post = generate_post(0, COMMUNITY, 'h0', 'H0')
+        post['skool_id'] = 'ph'
+        api.bulk_posts([post])
+        api.bulk_likes([generate_like('ph', f'h{i}', f'H{i}', COMMUNITY) for i in range(1, n)])
+        api.set_community(COMMUNITY)
+        r = api.post('/api/graph/interactions', json={'community': COMMUNITY, 'layout': True,
+                                                      'skool_ids': [f'h{i}' for i in range(n)]})
+        assert r.status_code == 200, r.text
+        pos = {n['id']: (n['x'], n['y']) for n in r.json()['nodes']}
+        assert len(pos) == n
+        assert all(-1000 <= x <= 1000 and -1000 <= y <= 1000 for x, y in pos.values())
+        assert len(set(pos.values())) == n
+        assert abs(pos['h0'][0]) < 100 and abs(pos['h0'][1]) < 100
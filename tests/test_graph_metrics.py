@@ -0,0 +1,97 @@
+"""
+Graph-Kennzahlen (src/graph_metrics.py): Knoten-Attribute in /api/graph/interactions und Sortierung im MembersFilter.
+"""
+import time
+
+import pytest
+
+from data_builder import generate_user, generate_post, generate_like
+
+COMMUNITY = 'metrics-comm'
+
+
+@pytest.fixture
+def graph(api, clean_db):
+    # Zwei Gruppen: h0 wird von g1..g3 geliked, h4 von g5/g6, g7 ohne Kanten
+    api.bulk_users([generate_user(i, COMMUNITY, skool_id=sid)
+                    for i, sid in enumerate(['h0', 'g1', 'g2', 'g3', 'h4', 'g5', 'g6', 'g7'])])
+    posts = [generate_post(0, COMMUNITY, 'h0', 'H0'), generate_post(1, COMMUNITY, 'h4', 'H4')]
+    posts[0]['skool_id'], posts[1]['skool_id'] = 'p0', 'p4'
+    api.bulk_posts(posts)
+    api.bulk_likes([generate_like('p0', sid, sid, COMMUNITY) for sid in ('g1', 'g2', 'g3')] +
+                   [generate_like('p4', sid, sid, COMMUNITY) for sid in ('g5', 'g6')])
+    api.set_community(COMMUNITY)
+
+
+def _nodes(api) -> dict:
+    r = api.get(f'/api/graph/interactions?community={COMMUNITY}')
+    assert r.status_code == 200, r.text
+    return {n['id']: n for n in r.json()['nodes']}
+
+
+def _nodes_until(api, check, timeout: float = 10) -> dict:
+    """Der Graph liefert den gespeicherten Stand und rechnet im Hintergrund neu -> warten, bis check() passt."""
+    deadline = time.time() + timeout
+    while True:
+        nodes = _nodes(api)
+        if check(nodes) or time.time() > deadline:
+            return nodes
+        time.sleep(0.1)
+
+
+class TestGraphMetrics:
+
+    def test_node_attributes(self, api, graph):
+        nodes = _nodes(api)
+        assert sum(n['pagerank'] for n in nodes.values()) == pytest.approx(1.0)
+        assert (nodes['h0']['in_degree'], nodes['g3']['out_degree'], nodes['g7']['in_degree']) == (3, 1, 0)
+        assert max(nodes.values(), key=lambda n: n['pagerank'])['id'] == 'h0'
+        assert nodes['g1']['cluster'] == nodes['h0']['cluster'] != nodes['g5']['cluster'] == nodes['h4']['cluster']
+        assert nodes['g7']['cluster'] not in (nodes['h0']['cluster'], nodes['h4']['cluster'])
+
+    def test_sort_by_in_degree(self, api, graph):
+        users = api.filter_users({'communitySlug': COMMUNITY, 'sortBy': 'in_degree_desc'})
+        assert [u['skool_id'] for u in users[:2]] == ['h0', 'h4']
+
+    def test_page_sort_matches_node_attributes(self, api, graph):
+        nodes = _nodes(api)
+        ids, cursor = [], ''
+        while True:
+            r = api.post('/api/user/filter', json={'communitySlug': COMMUNITY, 'sortBy': 'pagerank_desc',
+                                                  'limit': 3, 'cursor': cursor})
+            assert r.status_code == 200, r.text
+            ids.extend(u['skool_id'] for u in r.json()['items'])
+            cursor = r.json()['next_cursor']
+            if not cursor:
+                break
+        assert sorted(ids) == sorted(nodes)
+        ranks = [nodes[i]['pagerank'] for i in ids]
+        assert ranks == sorted(ranks, reverse=True)
+
+    def test_recomputed_after_new_likes(self, api, graph):
+        before = _nodes(api)['h4']['in_degree']
+        api.bulk_likes([generate_like('p4', 'g7', 'g7', COMMUNITY)])
+        assert _nodes_until(api, lambda n: n['h4']['in_degree'] == before + 1)['h4']['in_degree'] == before + 1
+
+    def test_sort_serves_stored_snapshot_until_refresh(self, api, graph):
+        assert [u['skool_id'] for u in api.filter_users({'communitySlug': COMMUNITY, 'sortBy': 'in_degree_desc'})[:1]] \
+            == ['h0']
+        post = generate_post(7, COMMUNITY, 'g7', 'G7')
+        post['skool_id'] = 'p7'
+        api.bulk_posts([post])
+        api.bulk_likes([generate_like('p7', sid, sid, COMMUNITY) for sid in ('g1', 'g2', 'g5', 'g6')])
+        # Sortierung rechnet nicht synchron neu (höchstens alle REFRESH_INTERVAL im Hintergrund) -> alter Stand
+        users = api.filter_users({'communitySlug': COMMUNITY, 'sortBy': 'in_degree_desc'})
+        assert users[0]['skool_id'] == 'h0'
+        # der Graph stößt die Neuberechnung an (im Hintergrund) -> danach sortiert auch die Liste neu
+        assert _nodes_until(api, lambda n: n['g7']['in_degree'] == 4)['g7']['in_degree'] == 4
+        users = api.filter_users({'communitySlug': COMMUNITY, 'sortBy': 'in_degree_desc'})
+        assert users[0]['skool_id'] == 'g7'
+
+    def test_new_metrics_keep_other_cached_filters(self, api, graph):
+        """Ein neuer graph_metric-Stand verwirft nur die Graph-Sortierungen im FilterCache."""
+        api.filter_users({'communitySlug': COMMUNITY, 'sortBy': 'name_asc'})
+        _nodes(api)  # erste Berechnung für die Community -> graph_metric geschrieben
+        hits = api.get('/api/user/filter/cache').json()['hits']
+        api.filter_users({'communitySlug': COMMUNITY, 'sortBy': 'name_asc'})
+        assert api.get('/api/user/filter/cache').json()['hits'] == hits + 1
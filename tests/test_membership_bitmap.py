@@ -0,0 +1,78 @@
+"""
+Bitmap-Index der Gruppen-Mitgliedschaften (src/membership_bitmap.py) hinter /api/communities/by-users,
+/api/communities/overlap und /api/communities/similar.
+"""
+import pytest
+
+from data_builder import generate_user, generate_profile
+
+COMMUNITY = 'mb-comm'
+
+# Gruppen pro User: g-a = m0..m5, g-b = m3..m7, g-c = m0..m1, g-d = m7
+GROUPS = {
+    'm0': ['g-a', 'g-c'], 'm1': ['g-a', 'g-c'], 'm2': ['g-a'], 'm3': ['g-a', 'g-b'],
+    'm4': ['g-a', 'g-b'], 'm5': ['g-a', 'g-b'], 'm6': ['g-b'], 'm7': ['g-b', 'g-d'],
+}
+
+
+@pytest.fixture
+def groups(api, clean_db):
+    users = [generate_user(i, COMMUNITY, skool_id=f'm{i}') for i in range(len(GROUPS))]
+    api.bulk_users(users)
+    api.bulk_profiles([generate_profile(u, [COMMUNITY] + GROUPS[u['skool_id']]) for u in users])
+    for slug in ('g-a', 'g-b', 'g-c', 'g-d'):
+        assert api.post('/api/othercommunity', json={'slug': slug, 'name': slug}).status_code == 201
+    api.set_community(COMMUNITY)
+
+
+class TestMembershipBitmap:
+
+    def test_by_users_counts_and_order(self, api, groups):
+        r = api.post('/api/communities/by-users', json={'skool_ids': ['m0', 'm3', 'm6', 'm7', 'unknown']})
+        assert r.status_code == 200
+        assert [(c['slug'], c['selection_count'], c['shared_user_count']) for c in r.json()] == \
+            [('g-b', 3, 5), ('g-a', 2, 6), ('g-c', 1, 2), ('g-d', 1, 1)]
+
+    def test_by_users_empty_selection(self, api, groups):
+        r = api.post('/api/communities/by-users', json={'skool_ids': []})
+        assert r.status_code == 200
+        assert r.json() == []
+
+    def test_overlap_matrix(self, api, groups):
+        r = api.post('/api/communities/overlap', json={'slugs': ['g-a', 'g-b', 'g-c', 'missing']})
+        assert r.status_code == 200
+        body = r.json()
+        assert body['sizes'] == [6, 5, 2, 0]
+        assert body['overlap'] == [[6, 3, 2, 0], [3, 5, 0, 0], [2, 0, 2, 0], [0, 0, 0, 0]]
+
+    def test_overlap_within_selection(self, api, groups):
+        r = api.post('/api/communities/overlap', json={'slugs': ['g-a', 'g-b'], 'skool_ids': ['m2', 'm3', 'm6']})
+        assert r.json()['overlap'] == [[2, 1], [1, 2]]
+
+    def test_similar_jaccard(self, api, groups):
+        r = api.post('/api/communities/similar', json={'slug': 'g-a', 'k': 2})
+        assert r.status_code == 200
+        # g-b: 3 / 8, g-c: 2 / 6; mb-comm (alle Profile, 6 / 8) ist keine entdeckte Community
+        assert [(c['slug'], c['shared'], c['jaccard'], c['name']) for c in r.json()] == \
+            [('g-b', 3, 0.375, 'g-b'), ('g-c', 2, 0.333333, 'g-c')]
+
+    def test_similar_only_discovered_communities(self, api, groups):
+        r = api.post('/api/communities/similar', json={'slug': 'g-a', 'k': 10})
+        assert [c['slug'] for c in r.json()] == ['g-b', 'g-c']
+        assert all('name' in c and 'id' in c for c in r.json())
+
+    def test_similar_requires_slug(self, api, groups):
+        assert api.post('/api/communities/similar', json={}).status_code == 400
+
+    def test_similar_non_numeric_k(self, api, groups):
+        r = api.post('/api/communities/similar', json={'slug': 'g-a', 'k': 'abc'})
+        assert r.status_code == 400
+        assert 'k' in r.json()['error']
+
+    def test_index_follows_new_profiles(self, api, groups):
+        assert api.post('/api/communities/overlap', json={'slugs': ['g-d']}).json()['sizes'] == [1]
+        user = generate_user(20, COMMUNITY, skool_id='m20')
+        api.bulk_users([user])
+        api.bulk_profiles([generate_profile(user, ['g-d', 'g-c'])])
+        assert api.post('/api/communities/overlap', json={'slugs': ['g-d', 'g-c']}).json()['overlap'] == \
+            [[2, 1], [1, 3]]
@@ -0,0 +1,78 @@
+"""
+Membership status (first_seen / last_seen_in_full_crawl / left_at) from complete members crawls,
+is_former_member / left_since filters and /api/user/left.
+"""
+import pytest
+
+from data_builder import generate_user, generate_fetch
+
+COMMUNITY = 'member-status-comm'
+
+
+def _crawl(api, skool_ids: list, pages: int = 1) -> list:
+    """Kompletter members-Crawl mit pages Seiten, die User reihum auf die Seiten verteilt."""
+    fetches = []
+    for page in range(1, pages + 1):
+        f = generate_fetch('members', COMMUNITY, page)
+        f['total_pages'] = pages
+        fetches.append(f)
+    ids = api.bulk_fetches(fetches)['ids']
+    api.bulk_users([generate_user(i, COMMUNITY, fetch_id=ids[i % pages], skool_id=sid)
+                    for i, sid in enumerate(skool_ids)])
+    return ids
+
+
+def _ids(users: list) -> set:
+    return {u['skool_id'] for u in users}
+
+
+@pytest.fixture
+def two_crawls(api, clean_db):
+    api.set_community(COMMUNITY)
+    _crawl(api, ['m1', 'm2', 'm3', 'm4'], pages=2)
+    api.post('/api/test/age-fetches', json={'hours': 48})
+    _crawl(api, ['m1', 'm2', 'm5'], pages=2)
+
+
+class TestMembershipStatus:
+
+    def test_former_members(self, api, two_crawls):
+        former = api.filter_users({'communitySlug': COMMUNITY, 'include': {'is_former_member': 'true'}})
+        assert _ids(former) == {'m3', 'm4'}
+        current = api.filter_users({'communitySlug': COMMUNITY, 'exclude': {'is_former_member': 'true'}})
+        assert _ids(current) == {'m1', 'm2', 'm5'}
+
+    def test_left_since(self, api, two_crawls):
+        left = api.filter_users({'communitySlug': COMMUNITY, 'include': {'left_since': 5}})
+        assert _ids(left) == {'m3', 'm4'}
+
+    def test_recently_left_endpoint(self, api, two_crawls):
+        r = api.get(f'/api/user/left?community={COMMUNITY}&days=5')
+        assert r.status_code == 200
+        rows = r.json()
+        assert _ids(rows) == {'m3', 'm4'}
+        assert all(row['left_at'] > row['last_seen_in_full_crawl'] > 0 for row in rows)
+
+    def test_incomplete_crawl_keeps_status(self, api, two_crawls):
+        api.post('/api/test/age-fetches', json={'hours': 48})
+        # Nur Seite 1 von 2: Crawl nicht komplett -> m2 gilt nicht als gegangen
+        f = generate_fetch('members', COMMUNITY, 1)
+        f['total_pages'] = 2
+        fetch_id = api.bulk_fetches([f])['ids'][0]
+        api.bulk_users([generate_user(0, COMMUNITY, fetch_id=fetch_id, skool_id='m1')])
+        former = api.filter_users({'communitySlug': COMMUNITY, 'include': {'is_former_member': 'true'}})
+        assert _ids(former) == {'m3', 'm4'}
+
+    def test_rejoin(self, api, two_crawls):
+        api.post('/api/test/age-fetches', json={'hours': 48})
+        _crawl(api, ['m1', 'm2', 'm3', 'm5'], pages=2)
+        former = api.filter_users({'communitySlug': COMMUNITY, 'include': {'is_former_member': 'true'}})
+        assert _ids(former) == {'m4'}
+
+    def test_rebuild_keeps_historical_left_at(self, api, two_crawls):
+        # m3/m4 fehlen seit dem zweiten Crawl (jetzt 4 Tage her), ein dritter Crawl ändert daran nichts
+        api.post('/api/test/age-fetches', json={'hours': 96})
+        _crawl(api, ['m1', 'm2', 'm5'], pages=2)
+        api.post('/api/test/age-fetches', json={'hours': 0})  # Rebuild aus dem Verlauf
+        assert api.get(f'/api/user/left?community={COMMUNITY}&days=2').json() == []
+        assert _ids(api.get(f'/api/user/left?community={COMMUNITY}&days=5').json()) == {'m3', 'm4'}
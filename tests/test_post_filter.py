@@ -0,0 +1,87 @@
+"""
+PostFilter über /api/post/filter: include/exclude, Suche, Sortierung, Seiten per Keyset-Cursor.
+"""
+import pytest
+
+from data_builder import generate_post
+
+COMMUNITY = 'post-filter-comm'
+NAMES = ['alice', 'bob', 'carol']
+
+
+def _filter(api, **state) -> dict:
+    r = api.post('/api/post/filter', json={'communitySlug': COMMUNITY, **state})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def _all_pages(api, limit: int = 4, **state) -> list:
+    """Alle Seiten nacheinander holen -> skool_ids in Reihenfolge."""
+    ids, cursor = [], ''
+    while True:
+        page = _filter(api, limit=limit, cursor=cursor, **state)
+        ids.extend(p['skool_id'] for p in page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            return ids
+
+
+@pytest.fixture
+def posts(api, clean_db):
+    # i: Autor a{i % 3} (NAMES), i Upvotes, 20-i Kommentare, vor i*2 Tagen, jeder 3. ein Kommentar, Label L1/L2
+    posts = []
+    for i in range(20):
+        p = generate_post(i, COMMUNITY, f'a{i % 3}', NAMES[i % 3], upvotes=i, comments=20 - i,
+                          created_days_ago=i * 2)
+        p.update({'skool_id': f'p{i}', 'label_id': 'L1' if i < 5 else 'L2', 'is_toplevel': int(i % 3 != 0),
+                  'root_id': '' if i % 3 else 'p1'})
+        posts.append(p)
+    api.bulk_posts(posts)
+    api.set_community(COMMUNITY)
+    return posts
+
+
+class TestPostFilter:
+
+    def test_default_newest_first(self, api, posts):
+        page = _filter(api)
+        assert page['total'] == 20
+        assert [p['skool_id'] for p in page['items']] == [f'p{i}' for i in range(20)]
+
+    def test_author_include_exclude(self, api, posts):
+        assert _filter(api, include={'author': 'a1'})['total'] == 7
+        assert _filter(api, include={'author': ['a1', 'a2']})['total'] == 13
+        assert _filter(api, exclude={'author': 'a1'})['total'] == 13
+
+    def test_ranges(self, api, posts):
+        page = _filter(api, include={'upvotes_min': 5, 'upvotes_max': 9, 'comments_min': 12})
+        assert sorted(p['upvotes'] for p in page['items']) == [5, 6, 7, 8]
+
+    def test_created_since(self, api, posts):
+        assert _filter(api, include={'created_since': 9})['total'] == 5
+        assert _filter(api, exclude={'created_since': 9})['total'] == 15
+
+    def test_toplevel_and_label(self, api, posts):
+        assert _filter(api, include={'is_toplevel': False})['total'] == 7
+        assert _filter(api, include={'is_toplevel': True, 'label': 'L1'})['total'] == 3
+
+    @pytest.mark.parametrize('term', ['bob', 'bo'])  # FTS bzw. LIKE-Fallback unter 3 Zeichen
+    def test_search(self, api, posts, term):
+        ids = {p['skool_id'] for p in _filter(api, searchTerm=term)['items']}
+        assert ids == {f'p{i}' for i in range(1, 20, 3)}
+
+    @pytest.mark.parametrize('sort', ['newest', 'oldest', 'upvotes_desc', 'comments_asc'])
+    def test_pages_match_single_query(self, api, posts, sort):
+        single = [p['skool_id'] for p in _filter(api, sortBy=sort, limit=100)['items']]
+        assert _all_pages(api, sortBy=sort) == single
+        assert len(single) == 20
+
+    def test_cursor_of_other_sort_rejected(self, api, posts):
+        cursor = _filter(api, sortBy='newest', limit=5)['next_cursor']
+        r = api.post('/api/post/filter', json={'communitySlug': COMMUNITY, 'sortBy': 'oldest', 'cursor': cursor})
+        assert r.status_code == 400
+
+    def test_non_numeric_limit(self, api, posts):
+        r = api.post('/api/post/filter', json={'communitySlug': COMMUNITY, 'limit': 'abc'})
+        assert r.status_code == 400
+        assert 'limit' in r.json()['error']
@@ -0,0 +1,66 @@
+"""
+profile_group (src/profile_group.py): Gruppen aus dem neuesten Profil pro User hinter /api/other-communities,
+/api/communities/by-users und /api/user/<id>/profile-communities.
+"""
+import json
+
+import pytest
+
+from data_builder import generate_user, generate_profile
+
+COMMUNITY = 'pg-comm'
+
+
+@pytest.fixture
+def profiles(api, clean_db):
+    # q0..q3: altes Profil mit other-a, neues (fetch 2) mit other-b; q4 nur ein Profil mit other-a, other-c
+    users = [generate_user(i, COMMUNITY, skool_id=f'q{i}') for i in range(5)]
+    ids = api.bulk_users(users)['ids']
+    old = [generate_profile(u, [COMMUNITY, 'other-a']) for u in users[:4]]
+    new = [generate_profile(u, ['other-b', COMMUNITY], fetch_id=2) for u in users[:4]]
+    for p in new:
+        p['fetched_at'] += 60
+    api.bulk_profiles(old + [generate_profile(users[4], ['other-c', 'other-a'])])
+    api.bulk_profiles(new)
+    for slug in ('other-a', 'other-b', 'other-c'):
+        assert api.post('/api/othercommunity', json={'slug': slug, 'name': slug}).status_code == 201
+    api.set_community(COMMUNITY)
+    return dict(zip([u['skool_id'] for u in users], ids))
+
+
+class TestProfileGroup:
+
+    def test_other_communities_latest_profile(self, api, profiles):
+        r = api.get('/api/other-communities')
+        assert r.status_code == 200
+        counts = {c['slug']: c['shared_user_count'] for c in r.json()}
+        assert counts == {'other-a': 1, 'other-b': 4, 'other-c': 1}
+        assert r.json()[0]['slug'] == 'other-b'
+
+    def test_communities_by_users(self, api, profiles):
+        r = api.post('/api/communities/by-users', json={'skool_ids': ['q0', 'q4']})
+        assert r.status_code == 200
+        counts = {c['slug']: (c['selection_count'], c['shared_user_count']) for c in r.json()}
+        assert counts == {'other-b': (1, 4), 'other-a': (1, 1), 'other-c': (1, 1)}
+
+    def test_profile_communities_in_profile_order(self, api, profiles):
+        r = api.get(f"/api/user/{profiles['q4']}/profile-communities")
+        assert r.status_code == 200
+        assert r.json() == [{'slug': 'other-c', 'name': 'Other C'}, {'slug': 'other-a', 'name': 'Other A'}]
+
+    def test_filter_shared_counts(self, api, profiles):
+        r = api.post('/api/other-communities/filter', json={'sortBy': 'name_asc'})
+        assert r.status_code == 200
+        assert {c['slug']: c['shared_user_count'] for c in r.json()['items']} == \
+            {'other-a': 1, 'other-b': 4, 'other-c': 1}
+
+    def test_profile_extraction(self, api, profiles):
+        raw = {'pageProps': {'currentUser': {'id': 'q4', 'name': 'q4', 'profileData': {
+            'groupsMemberOf': [{'name': 'other-b', 'metadata': {'displayName': 'B Group'}}]}}}}
+        fetch_id = api.bulk_fetches([{'type': 'profile', 'community_slug': COMMUNITY, 'status': 'ok',
+                                      'raw_data': json.dumps(raw)}])['ids'][0]
+        assert api.post(f'/api/extract/{fetch_id}').status_code == 200
+        r = api.get(f"/api/user/{profiles['q4']}/profile-communities")
+        assert r.json() == [{'slug': 'other-b', 'name': 'B Group'}]
+        counts = {c['slug']: c['shared_user_count'] for c in api.get('/api/other-communities').json()}
+        assert counts == {'other-a': 0, 'other-b': 5, 'other-c': 0}
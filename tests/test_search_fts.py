@@ -0,0 +1,106 @@
+"""
+Full-text search tests (FTS5 over user_current/post_current, /api/post/search).
+"""
+import pytest
+
+COMMUNITY = 'fts-comm'
+
+
+def _user(skool_id: str, name: str, bio: str = '', fetched_at: int = 1000, **kwargs) -> dict:
+    return {'fetch_id': 1, 'fetched_at': fetched_at, 'community_slug': COMMUNITY, 'skool_id': skool_id,
+            'name': name, 'first_name': name.title(), 'last_name': 'Test', 'email': f'{name}@test.com',
+            'bio': bio, 'member_role': 'member', **kwargs}
+
+
+def _post(skool_id: str, title: str, content: str = '', user_name: str = 'anna', **kwargs) -> dict:
+    return {'fetch_id': 1, 'fetched_at': 1000, 'community_slug': COMMUNITY, 'skool_id': skool_id,
+            'user_id': 'u1', 'user_name': user_name, 'is_toplevel': 1,
+            'metadata': f'{{"title": "{title}", "content": "{content}"}}', **kwargs}
+
+
+def _search_users(api, term: str, **extra) -> list:
+    return api.filter_users({'communitySlug': COMMUNITY, 'searchTerm': term, **extra})
+
+
+def _search_posts(api, q: str, **params) -> list:
+    query = '&'.join(f'{k}={v}' for k, v in {'q': q, 'community': COMMUNITY, **params}.items())
+    r = api.get(f'/api/post/search?{query}')
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+class TestMemberSearch:
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, api, clean_db):
+        api.set_community(COMMUNITY)
+        api.bulk_users([
+            _user('u1', 'annamueller', bio='Marathon runner and baker'),
+            _user('u2', 'bernd', bio='Loves running'),
+            _user('u3', 'carla', bio='Runner, runner, runner'),
+        ])
+
+    def test_bio_is_searchable(self, api):
+        assert {u['skool_id'] for u in _search_users(api, 'baker')} == {'u1'}
+
+    def test_substring_and_prefix(self, api):
+        assert {u['skool_id'] for u in _search_users(api, 'muell')} == {'u1'}
+        assert {u['skool_id'] for u in _search_users(api, 'runn')} == {'u1', 'u2', 'u3'}
+
+    def test_short_term_falls_back_to_like(self, api):
+        """Terms below the trigram length still match (name/email LIKE)."""
+        assert {u['skool_id'] for u in _search_users(api, 'be')} == {'u2'}
+
+    def test_short_term_matches_bio(self, api):
+        assert {u['skool_id'] for u in _search_users(api, 'ke')} == {'u1'}
+
+    def test_short_word_in_longer_term(self, api):
+        """Short words next to indexable ones still have to match (LIKE), not just the long ones."""
+        assert {u['skool_id'] for u in _search_users(api, 'runn be')} == {'u2'}
+
+    def test_relevance_sort(self, api):
+        users = _search_users(api, 'runner', sortBy='relevance')
+        assert users[0]['skool_id'] == 'u3'
+        assert {u['skool_id'] for u in users} == {'u1', 'u3'}
+
+    def test_index_follows_newer_snapshot(self, api):
+        """A newer snapshot replaces the indexed text of the user."""
+        api.bulk_users([_user('u1', 'annaschmidt', bio='retired', fetched_at=2000)])
+        assert _search_users(api, 'muell') == []
+        assert [u['skool_id'] for u in _search_users(api, 'schmidt')] == ['u1']
+
+    def test_quotes_in_term(self, api):
+        assert _search_users(api, 'ann"a') == []
+
+
+class TestPostSearch:
+
+    @pytest.fixture(autouse=True)
+    def _setup(self, api, clean_db):
+        api.set_community(COMMUNITY)
+        api.bulk_posts([
+            _post('p1', 'Sourdough basics', 'How to feed a starter', user_name='anna'),
+            _post('p2', 'Sourdough check-in', 'Sourdough update: sourdough everywhere', user_name='bernd'),
+            _post('p3', 'Other community post', 'sourdough', community_slug='other-comm'),
+            _post('c1', '', 'Great sourdough tip', user_name='carla', is_toplevel=0, root_id='p1'),
+        ])
+
+    def test_title_content_and_author(self, api):
+        assert {p['skool_id'] for p in _search_posts(api, 'starter')} == {'p1'}
+        assert {p['skool_id'] for p in _search_posts(api, 'bernd')} == {'p2'}
+        assert {p['skool_id'] for p in _search_posts(api, 'sourdough')} == {'p1', 'p2', 'c1'}
+
+    def test_ranked_with_snippet(self, api):
+        results = _search_posts(api, 'sourdough')
+        assert results[0]['skool_id'] == 'p2'
+        assert '[' in results[0]['snippet']
+
+    def test_toplevel_and_all_communities(self, api):
+        assert {p['skool_id'] for p in _search_posts(api, 'sourdough', toplevel=1)} == {'p1', 'p2'}
+        assert 'p3' in {p['skool_id'] for p in _search_posts(api, 'sourdough', community='all')}
+
+    def test_short_term(self, api):
+        assert {p['skool_id'] for p in _search_posts(api, 'ca')} == {'c1'}
+
+    def test_short_word_in_longer_term(self, api):
+        assert {p['skool_id'] for p in _search_posts(api, 'sourdough to')} == {'p1'}
@@ -0,0 +1,89 @@
+"""
+Selection handles: /api/selection, follow-up endpoints join the materialized selection (handle == skool_ids).
+"""
+import pytest
+
+from data_builder import generate_user, generate_post, generate_profile
+
+COMMUNITY = 'sel-comm'
+ENDPOINTS = ['/api/post/by-users', '/api/shared-communities', '/api/communities/by-users',
+             '/api/activity/members', '/api/graph/interactions']
+
+
+def _post(api, path: str, body: dict):
+    r = api.post(path, json=body)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.fixture
+def members(api, clean_db):
+    users = [generate_user(i, COMMUNITY, skool_id=f's{i}', role='admin' if i < 4 else 'member')
+             for i in range(12)]
+    api.bulk_users(users)
+    api.bulk_posts([generate_post(i, COMMUNITY, u['skool_id'], u['name']) for i, u in enumerate(users)])
+    api.bulk_profiles([generate_profile(u, [COMMUNITY, 'other-a'] if i % 2 else [COMMUNITY, 'other-b'])
+                       for i, u in enumerate(users)])
+    for slug in ('other-a', 'other-b'):
+        assert api.post('/api/othercommunity', json={'slug': slug, 'name': slug}).status_code == 201
+    api.set_community(COMMUNITY)
+    return users
+
+
+class TestSelection:
+
+    def test_register_ids(self, api, members):
+        res = _post(api, '/api/selection', {'skool_ids': ['s1', 's2', 's2', 's3']})
+        assert res['count'] == 3
+        assert _post(api, '/api/selection', {'skool_ids': ['s3', 's2', 's1']})['selection'] == res['selection']
+
+    def test_register_filter(self, api, members):
+        res = _post(api, '/api/selection', {'communitySlug': COMMUNITY, 'include': {'member_role': 'admin'}})
+        assert res['count'] == 4
+
+    @pytest.mark.parametrize('path', ENDPOINTS)
+    def test_handle_matches_skool_ids(self, api, members, path):
+        admins = [u['skool_id'] for u in members if u['member_role'] == 'admin']
+        handle = _post(api, '/api/selection', {'communitySlug': COMMUNITY, 'include': {'member_role': 'admin'}})
+        by_ids = _post(api, path, {'skool_ids': admins, 'community': COMMUNITY})
+        by_handle = _post(api, path, {'selection': handle['selection'], 'community': COMMUNITY})
+        assert by_handle == by_ids
+
+    def test_communities_by_users_counts(self, api, members):
+        rows = _post(api, '/api/communities/by-users', {'skool_ids': ['s0', 's1', 's3']})
+        counts = {r['slug']: (r['selection_count'], r['shared_user_count']) for r in rows}
+        assert counts == {'other-a': (2, 6), 'other-b': (1, 6)}
+
+    def test_empty_ids(self, api, members):
+        assert _post(api, '/api/post/by-users', {'skool_ids': []}) == []
+
+    def test_reset_expires_handles(self, api, members):
+        handle = _post(api, '/api/selection', {'skool_ids': ['s1']})['selection']
+        api.reset()
+        assert api.post('/api/post/by-users', json={'selection': handle}).status_code == 410
+
+    def test_materialized_once_across_requests(self, api, members):
+        # Jeder Request läuft in einem eigenen Thread: die Menge wird einmal materialisiert und
+        # bleibt für Folge-Requests stehen, bis der Filter neu registriert wird
+        handle = _post(api, '/api/selection', {'communitySlug': COMMUNITY, 'include': {'member_role': 'admin'}})
+        assert handle['count'] == 4
+        api.bulk_users([generate_user(20, COMMUNITY, skool_id='s20', role='admin')])
+        for _ in range(3):
+            rows = _post(api, '/api/shared-communities', {'selection': handle['selection']})
+            assert rows == [{'community_slug': COMMUNITY, 'user_count': 4}]
+        again = _post(api, '/api/selection', {'communitySlug': COMMUNITY, 'include': {'member_role': 'admin'}})
+        assert again['selection'] == handle['selection'] and again['count'] == 5
+
+    def test_raw_ids_are_not_persisted(self, api, members):
+        """skool_ids im Body eines Lese-Endpoints: nur für den Request, nichts in selection_member."""
+        def persisted():
+            tables = api.get('/api/database/overview').json()
+            return next(t['count'] for t in tables if t['name'] == 'selection_member')
+
+        for path in ENDPOINTS:
+            _post(api, path, {'skool_ids': ['s0', 's1', 's3'], 'community': COMMUNITY})
+        assert persisted() == 0
+        assert _post(api, '/api/shared-communities', {'skool_ids': ['s0', 's1']}) == [
+            {'community_slug': COMMUNITY, 'user_count': 2}]
+        assert _post(api, '/api/selection', {'skool_ids': ['s0', 's1']})['count'] == 2
+        assert persisted() == 2
@@ -0,0 +1,68 @@
+"""
+/api/database/overview: Zeilenzahlen aus table_stat (src/table_stats.py, per Trigger gepflegt),
+Indexe und Größen aus dbstat unter stats; /api/database/pages: Seiten-Statistik.
+"""
+from data_builder import generate_user, generate_post
+
+COMMUNITY = 'ts-comm'
+
+
+def _overview(api, sizes: bool = False) -> list:
+    r = api.get('/api/database/overview' + ('?sizes=1' if sizes else ''))
+    assert r.status_code == 200
+    return r.json()
+
+
+def _pages(api) -> dict:
+    r = api.get('/api/database/pages')
+    assert r.status_code == 200
+    return r.json()
+
+
+def _counts(api) -> dict:
+    return {t['name']: t['count'] for t in _overview(api)}
+
+
+class TestTableStats:
+
+    def test_counts_follow_inserts_and_deletes(self, api, clean_db):
+        counts = _counts(api)
+        assert counts['user'] == 0 and counts['post'] == 0
+        ids = api.bulk_users([generate_user(i, COMMUNITY) for i in range(12)])['ids']
+        api.bulk_posts([generate_post(i, COMMUNITY, 'u1', 'User 1') for i in range(5)])
+        counts = _counts(api)
+        # abgeleitete Tabellen (per INSERT ... SELECT befüllt) zählen mit
+        assert (counts['user'], counts['user_current'], counts['post'], counts['post_current']) == (12, 12, 5, 5)
+        assert api.delete(f'/api/user/{ids[0]}').status_code == 204
+        assert _counts(api)['user'] == 11
+        api.reset()
+        counts = _counts(api)
+        assert counts['user'] == 0 and counts['user_current'] == 0
+
+    def test_response_keeps_name_and_count(self, api, clean_db):
+        """Alte Antwort (Liste aus {name, count}) bleibt, alles Neue steht unter stats."""
+        data = _overview(api)
+        assert isinstance(data, list)
+        assert all(set(t) == {'name', 'count', 'stats'} for t in data)
+
+    def test_page_statistics_and_indexes(self, api, clean_db):
+        pages = _pages(api)
+        assert pages['page_size'] > 0 and pages['page_count'] > 0 and pages['freelist_count'] >= 0
+        assert pages['bytes'] == pages['page_size'] * pages['page_count']
+        data = _overview(api)
+        tables = {t['name']: t['stats'] for t in data}
+        assert 'idx_profile_group_slug' in [i['name'] for i in tables['profile_group']['indexes']]
+        assert tables['user_fts']['virtual'] and not tables['user']['virtual']
+        assert 'bytes' not in tables['user']
+        assert [t['count'] for t in data] == sorted((t['count'] for t in data), reverse=True)
+
+    def test_sizes_from_dbstat(self, api, clean_db):
+        api.bulk_users([generate_user(i, COMMUNITY) for i in range(50)])
+        tables = {t['name']: t['stats'] for t in _overview(api, sizes=True)}
+        if 'bytes' not in tables['user']:
+            assert all('bytes' not in t for t in tables.values())  # SQLite ohne dbstat
+            return
+        pages = _pages(api)
+        assert tables['user']['bytes'] >= pages['page_size'] and tables['user']['pages'] >= 1
+        assert all('bytes' in i for t in tables.values() for i in t['indexes'])
+        assert sum(t['bytes'] + sum(i['bytes'] for i in t['indexes']) for t in tables.values()) <= pages['bytes']
@@ -91,7 +91,9 @@ async function executeTask(tabId, task) {
             } else if (task.type === "comments") {
                 // Comments API (api2.skool.com) - limit 25 (API rejects higher values)
                 if (!task.groupSkoolId) return { error: "groupSkoolId missing for comments" };
-                url = "https://api2.skool.com/posts/" + task.postSkoolHexId + "/comments?group-id=" + task.groupSkoolId + "&limit=25&pinned=true";
+                url = "https://api2.skool.com/posts/" + task.postSkoolHexId + "/comments?group-id=" + task.groupSkoolId + "&limit=25";
+                // Cursor = 'last' der vorherigen Seite; pinned nur auf der ersten Seite
+                url += task.cursor ? "&after=" + encodeURIComponent(task.cursor) : "&pinned=true";
             } else if (task.type === "likes") {
                 // Likes API (api2.skool.com)
                 if (!task.groupSkoolId) return { error: "groupSkoolId missing for likes" };